@@ -45,7 +45,7 @@ def _segment_to_response(seg: SegmentSentiment) -> SentimentSegmentResponse:
         energy=seg.energy,
         energy_score=seg.energy_score,
         excitement=seg.excitement,
-        emotions=SentimentEmotions(**seg.emotions),
+        emotions=SentimentEmotions(**seg.emotions_dict),
         heat_score=seg.heat_score,
         is_heated=seg.is_heated,
         speaker=seg.speaker,
@@ -299,5 +299,5 @@ async def get_heated_moments(job_id: str, limit: int = 10):
     return HeatedMomentsResponse(
         job_id=job_id,
         moments=[_segment_to_response(s) for s in heated],
-        total_heated=len([s for s in result.segments if s.is_heated]),
+        total_heated=result.heated_count,
     )
@@ -1,5 +1,6 @@
 """Storage management API routes."""
 
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
@@ -56,7 +57,7 @@ async def get_storage_stats():
     Returns disk usage information and download directory statistics.
     """
     manager = get_storage_manager()
-    stats = manager.get_stats()
+    stats = await asyncio.to_thread(manager.get_stats)
     return StorageStatsResponse(**stats.to_dict())
 
 
@@ -114,7 +115,8 @@ async def list_files(
         limit: Maximum number of files to return
     """
     manager = get_storage_manager()
-    files = manager.get_files_by_age(min_age_hours=min_age_hours)[:limit]
+    files = await asyncio.to_thread(manager.get_files_by_age, min_age_hours)
+    files = files[:limit]
 
     return {
         "files": [
@@ -237,21 +237,16 @@ async def check_subscription(
     )
 
     # Add new items to database
-    new_items = []
-    for item in items:
-        existing = store.get_item_by_content_id(subscription_id, item.content_id)
-        if not existing:
-            item_id = str(uuid.uuid4())
-            created = store.create_item(
-                item_id=item_id,
-                subscription_id=subscription_id,
-                content_id=item.content_id,
-                content_url=item.content_url,
-                title=item.title,
-                published_at=item.published_at,
-            )
-            if created:
-                new_items.append(created)
+    new_items = store.create_items_bulk(subscription_id, [
+        {
+            "item_id": str(uuid.uuid4()),
+            "content_id": item.content_id,
+            "content_url": item.content_url,
+            "title": item.title,
+            "published_at": item.published_at,
+        }
+        for item in items
+    ])
 
     # Update last checked timestamp
     store.set_last_checked(subscription_id)
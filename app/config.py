@@ -98,7 +98,8 @@ class Settings(BaseSettings):
     # Subscription Worker
     subscription_worker_enabled: bool = True
     subscription_check_interval: int = 3600  # Check every hour (in seconds)
-    subscription_max_concurrent: int = 2  # Max concurrent downloads per check
+    subscription_max_concurrent: int = 2  # Max subscriptions checked at once
+    subscription_item_concurrency: int = 2  # Max concurrent downloads per subscription
     subscription_webhook_url: str | None = None  # Optional webhook for notifications
 
     # Webhooks
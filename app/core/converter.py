@@ -4,6 +4,7 @@ import asyncio
 import logging
 import shutil
 from pathlib import Path
+from typing import AsyncIterator
 
 from .exceptions import FFmpegError
 
@@ -39,6 +40,37 @@ class AudioConverter:
         """Check if FFmpeg is available in system PATH."""
         return shutil.which("ffmpeg") is not None
 
+    def _codec_args(self, output_format: str, quality: str) -> list[str]:
+        """FFmpeg encoder options for an output format and quality preset."""
+        if output_format == "mp3":
+            return [
+                "-c:a", "libmp3lame",
+                "-b:a", self.QUALITY_PRESETS.get(quality, "192k"),
+            ]
+        elif output_format == "mp4":
+            # MP4 container with AAC audio
+            return [
+                "-c:a", "aac",
+                "-b:a", self.QUALITY_PRESETS.get(quality, "192k"),
+            ]
+        elif output_format in ("m4a", "aac"):
+            return [
+                "-c:a", "aac",
+                "-b:a", self.QUALITY_PRESETS.get(quality, "192k"),
+            ]
+        elif output_format == "wav":
+            return ["-c:a", "pcm_s16le"]
+        elif output_format == "ogg":
+            return [
+                "-c:a", "libvorbis",
+                "-q:a", "6",  # Quality 0-10, 6 is ~192kbps
+            ]
+        elif output_format == "flac":
+            return ["-c:a", "flac"]
+        else:
+            # Default: copy codec if possible
+            return ["-c:a", "copy"]
+
     async def convert(
         self,
         input_path: str | Path,
@@ -86,41 +118,7 @@ class AudioConverter:
             "-i", str(input_path),
         ]
 
-        # Add format-specific options
-        if output_format == "mp3":
-            bitrate = self.QUALITY_PRESETS.get(quality, "192k")
-            cmd.extend([
-                "-c:a", "libmp3lame",
-                "-b:a", bitrate,
-            ])
-        elif output_format == "mp4":
-            # MP4 container with AAC audio
-            cmd.extend([
-                "-c:a", "aac",
-                "-b:a", self.QUALITY_PRESETS.get(quality, "192k"),
-            ])
-        elif output_format in ("m4a", "aac"):
-            cmd.extend([
-                "-c:a", "aac",
-                "-b:a", self.QUALITY_PRESETS.get(quality, "192k"),
-            ])
-        elif output_format == "wav":
-            cmd.extend([
-                "-c:a", "pcm_s16le",
-            ])
-        elif output_format == "ogg":
-            cmd.extend([
-                "-c:a", "libvorbis",
-                "-q:a", "6",  # Quality 0-10, 6 is ~192kbps
-            ])
-        elif output_format == "flac":
-            cmd.extend([
-                "-c:a", "flac",
-            ])
-        else:
-            # Default: copy codec if possible
-            cmd.extend(["-c:a", "copy"])
-
+        cmd.extend(self._codec_args(output_format, quality))
         cmd.append(str(output_path))
 
         logger.info(f"Converting {input_path.name} to {output_format}...")
@@ -157,6 +155,86 @@ class AudioConverter:
         except Exception as e:
             raise FFmpegError(f"Failed to convert: {e}")
 
+    async def convert_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        output_path: str | Path,
+        output_format: str = "mp3",
+        quality: str = "high",
+    ) -> Path:
+        """
+        Convert audio read from a byte stream, e.g. an HTTP response body.
+
+        The input is piped to FFmpeg as it arrives, so it is never written
+        to disk. The input must be in a format FFmpeg can read without
+        seeking (MP3, AAC, Ogg, FLAC, WAV; not MP4/M4A).
+
+        Args:
+            chunks: Async iterator over the input bytes
+            output_path: Path for the output file
+            output_format: Target format (mp3, mp4, aac, wav, ogg, flac)
+            quality: Quality preset for lossy formats (low, medium, high, highest)
+
+        Returns:
+            Path to the converted file
+
+        Raises:
+            FFmpegError: If conversion fails
+        """
+        output_path = Path(output_path)
+        cmd = [
+            self._ffmpeg_path,
+            "-y",  # Overwrite output
+            "-nostats", "-loglevel", "error",
+            "-i", "pipe:0",
+            *self._codec_args(output_format, quality),
+            str(output_path),
+        ]
+
+        logger.info(f"Converting stream to {output_format}...")
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Read stderr alongside the writes so FFmpeg never blocks on it
+        stderr_task = asyncio.create_task(process.stderr.read())
+
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # FFmpeg exited early; its error output says why
+            pass
+        except BaseException:
+            process.kill()
+            await process.wait()
+            stderr_task.cancel()
+            # Don't leave a truncated conversion behind
+            output_path.unlink(missing_ok=True)
+            raise
+
+        stderr = await stderr_task
+        await process.wait()
+
+        if process.returncode != 0:
+            error_msg = stderr.decode(errors="replace") if stderr else "Unknown error"
+            logger.error(f"FFmpeg error: {error_msg}")
+            output_path.unlink(missing_ok=True)
+            raise FFmpegError(f"Conversion failed: {error_msg[:500]}")
+
+        if not output_path.exists():
+            raise FFmpegError(f"Output file was not created: {output_path}")
+
+        output_size = output_path.stat().st_size / (1024 * 1024)
+        logger.info(f"Conversion complete: {output_path} ({output_size:.2f} MB)")
+
+        return output_path
+
     async def to_mp3(
         self,
         input_path: str | Path,
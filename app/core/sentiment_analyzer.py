@@ -1,16 +1,46 @@
 """LLM-powered sentiment analysis service for transcripts."""
 
+import heapq
 import json
 import logging
-from dataclasses import dataclass, field
-from typing import Optional
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from operator import attrgetter
+from typing import NamedTuple, Optional
+
+import httpx
+import numpy as np
+from cachetools import TTLCache
 
 from .summarizer import LiteLLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Fixed emotion order used by the array-based aggregation helpers
+EMOTION_NAMES = ("joy", "anger", "fear", "surprise", "sadness")
 
-@dataclass
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_json_response(response: str):
+    """Parse the first JSON array or object in an LLM response.
+
+    Skips an optional markdown code fence and any surrounding prose by
+    decoding in place from the first bracket, rather than splitting the
+    response into intermediate strings.
+    """
+    fence = response.find("```")
+    pos = fence + 3 if fence >= 0 else 0
+    candidates = [i for i in (response.find("[", pos), response.find("{", pos)) if i >= 0]
+    if not candidates:
+        raise json.JSONDecodeError("No JSON value found", response, pos)
+    value, _ = _JSON_DECODER.raw_decode(response, min(candidates))
+    return value
+
+
+@dataclass(slots=True)
 class SegmentSentiment:
     """Sentiment analysis for a single transcript segment."""
 
@@ -23,13 +53,22 @@ class SegmentSentiment:
     energy: str  # "aggressive", "calm", "neutral"
     energy_score: float  # 0.0 to 1.0
     excitement: int  # 0 to 100
-    # Emotion breakdown
-    emotions: dict[str, float]  # joy, anger, fear, surprise, sadness (0-1 each)
+    # Emotion breakdown, scores in EMOTION_NAMES order (0-1 each)
+    emotions: np.ndarray = field(compare=False)
     # Combined metrics
     heat_score: float  # 0.0 to 1.0 - overall intensity
-    is_heated: bool  # True if above threshold
     speaker: Optional[str] = None
 
+    @property
+    def is_heated(self) -> bool:
+        """True if heat_score is at or above the heated threshold."""
+        return self.heat_score >= SentimentAnalyzer.HEAT_THRESHOLD
+
+    @property
+    def emotions_dict(self) -> dict[str, float]:
+        """Emotion scores keyed by name."""
+        return dict(zip(EMOTION_NAMES, self.emotions.tolist()))
+
     def to_dict(self) -> dict:
         """Convert to dictionary."""
         return {
@@ -41,7 +80,7 @@ class SegmentSentiment:
             "energy": self.energy,
             "energy_score": self.energy_score,
             "excitement": self.excitement,
-            "emotions": self.emotions,
+            "emotions": self.emotions_dict,
             "heat_score": self.heat_score,
             "is_heated": self.is_heated,
             "speaker": self.speaker,
@@ -59,14 +98,13 @@ class SegmentSentiment:
             energy=data["energy"],
             energy_score=data["energy_score"],
             excitement=data["excitement"],
-            emotions=data["emotions"],
+            emotions=_emotions_array(data["emotions"]),
             heat_score=data["heat_score"],
-            is_heated=data["is_heated"],
             speaker=data.get("speaker"),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TimeWindowAggregate:
     """Aggregated sentiment for a time window."""
 
@@ -104,7 +142,7 @@ class TimeWindowAggregate:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class EmotionalArc:
     """Overall emotional summary of the content."""
 
@@ -142,6 +180,29 @@ class EmotionalArc:
         )
 
 
+@dataclass(slots=True)
+class SegmentArrays:
+    """Struct-of-arrays view of analyzed segments for vectorized aggregation."""
+
+    starts: np.ndarray
+    ends: np.ndarray
+    polarity: np.ndarray
+    heat: np.ndarray
+    emotions: np.ndarray  # (N, 5) in EMOTION_NAMES order
+
+    @classmethod
+    def from_segments(cls, segments: list[SegmentSentiment]) -> "SegmentArrays":
+        """Build the arrays in one pass per attribute."""
+        count = len(segments)
+        return cls(
+            starts=np.fromiter((s.start for s in segments), dtype=np.float64, count=count),
+            ends=np.fromiter((s.end for s in segments), dtype=np.float64, count=count),
+            polarity=np.fromiter((s.polarity for s in segments), dtype=np.float64, count=count),
+            heat=np.fromiter((s.heat_score for s in segments), dtype=np.float64, count=count),
+            emotions=_emotion_matrix(segments),
+        )
+
+
 @dataclass
 class SentimentAnalysisResult:
     """Complete sentiment analysis result."""
@@ -185,6 +246,151 @@ class SentimentAnalysisResult:
             error=data.get("error"),
         )
 
+    @cached_property
+    def segment_arrays(self) -> SegmentArrays:
+        """Struct-of-arrays view of segments, built once and shared by the aggregations.
+
+        Not invalidated if segments are modified after first access.
+        """
+        return SegmentArrays.from_segments(self.segments)
+
+    @property
+    def heated_count(self) -> int:
+        """Number of segments at or above the heat threshold."""
+        heat = self.segment_arrays.heat
+        return int(np.count_nonzero(heat >= SentimentAnalyzer.HEAT_THRESHOLD))
+
+
+def _safe_float(val, default, min_val=None, max_val=None):
+    """Coerce an LLM value to float, clamped to the given range."""
+    if val is None:
+        return default
+    try:
+        result = float(val)
+        if min_val is not None:
+            result = max(min_val, result)
+        if max_val is not None:
+            result = min(max_val, result)
+        return result
+    except (ValueError, TypeError):
+        return default
+
+
+def _safe_int(val, default, min_val=None, max_val=None):
+    """Coerce an LLM value to int, clamped to the given range."""
+    if val is None:
+        return default
+    try:
+        result = int(val)
+        if min_val is not None:
+            result = max(min_val, result)
+        if max_val is not None:
+            result = min(max_val, result)
+        return result
+    except (ValueError, TypeError):
+        return default
+
+
+def _emotions_array(emotions: dict[str, float]) -> np.ndarray:
+    """Convert an emotion-name mapping into an array in EMOTION_NAMES order."""
+    return np.array([emotions.get(name, 0.0) for name in EMOTION_NAMES], dtype=np.float64)
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> list[int]:
+    """Indices of the k largest values, highest first, earlier index winning ties.
+
+    Matches sorted(..., reverse=True)[:k] ordering but partitions in O(N)
+    instead of sorting every value.
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return []
+    if k < n:
+        kth_largest = np.partition(values, n - k)[n - k]
+        candidates = np.flatnonzero(values >= kth_largest)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order[:k]].tolist()
+
+
+# Shared, read-only emotion scores for segments the LLM did not analyze
+_DEFAULT_EMOTIONS = np.zeros(len(EMOTION_NAMES))
+_DEFAULT_EMOTIONS.flags.writeable = False
+
+
+def _default_segment(seg: dict, segment_index: int) -> SegmentSentiment:
+    """Build a neutral SegmentSentiment for a segment without usable analysis."""
+    return SegmentSentiment(
+        segment_index=segment_index,
+        start=seg["start"],
+        end=seg["end"],
+        text=seg["text"],
+        polarity=0.0,
+        energy="neutral",
+        energy_score=0.5,
+        excitement=50,
+        emotions=_DEFAULT_EMOTIONS,
+        heat_score=0.3,
+        speaker=seg.get("speaker"),
+    )
+
+
+def _emotion_matrix(segments: list[SegmentSentiment]) -> np.ndarray:
+    """Stack segment emotions into an (N, 5) array in EMOTION_NAMES order."""
+    if not segments:
+        return np.zeros((0, len(EMOTION_NAMES)))
+    return np.stack([seg.emotions for seg in segments])
+
+
+def _aggregate_windows(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    polarity: np.ndarray,
+    heat: np.ndarray,
+    emotions: np.ndarray,
+    window_size: float,
+    max_end: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Aggregate per-segment arrays into fixed-size time windows.
+
+    A segment belongs to every window it overlaps. Emotion columns follow
+    EMOTION_NAMES so the returned dominant index maps straight back to a name.
+
+    Returns:
+        Tuple of (avg_polarity, avg_heat, dominant_emotion_idx, segment_count,
+        window_starts, window_ends), one entry per window. Averages are 0 for
+        empty windows.
+    """
+    if max_end <= 0:
+        empty = np.zeros(0)
+        return empty, empty, np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), empty, empty
+
+    n_windows = int(np.ceil(max_end / window_size))
+    window_starts = np.arange(n_windows, dtype=np.float64) * window_size
+    window_ends = np.minimum(window_starts + window_size, max_end)
+
+    # Each segment overlaps a contiguous run of windows: those ending after it
+    # starts and starting before it ends. Expand the runs into (segment, window)
+    # pairs and sum per window, which stays linear in the number of overlaps.
+    first = np.searchsorted(window_ends, starts, side="right")
+    stop = np.maximum(np.searchsorted(window_starts, ends, side="left"), first)
+    lengths = stop - first
+    seg_idx = np.repeat(np.arange(len(starts)), lengths)
+    run_offsets = np.arange(len(seg_idx)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    win_idx = np.repeat(first, lengths) + run_offsets
+
+    counts = np.bincount(win_idx, minlength=n_windows)
+    divisor = np.maximum(counts, 1)
+
+    avg_pol = np.bincount(win_idx, weights=polarity[seg_idx], minlength=n_windows) / divisor
+    avg_heat = np.bincount(win_idx, weights=heat[seg_idx], minlength=n_windows) / divisor
+    emotion_sums = np.zeros((n_windows, emotions.shape[1]))
+    np.add.at(emotion_sums, win_idx, emotions[seg_idx])
+    dominant_idx = np.argmax(emotion_sums, axis=1)
+
+    return avg_pol, avg_heat, dominant_idx, counts, window_starts, window_ends
+
 
 # System prompt for sentiment analysis
 SENTIMENT_SYSTEM_PROMPT = """You are an expert at analyzing emotional tone and sentiment in transcripts.
@@ -205,7 +411,8 @@ For each segment, determine:
 Segments to analyze:
 {segments}
 
-Return a JSON array with one object per segment, in order. Each object must have:
+Return a JSON object with a "segments" array containing one object per segment, in order.
+Each object must have:
 - segment_index (integer matching the input)
 - polarity (float)
 - energy (string)
@@ -214,7 +421,79 @@ Return a JSON array with one object per segment, in order. Each object must have
 - emotions (object with joy, anger, fear, surprise, sadness keys)
 - heat_score (float)
 
-Return ONLY the JSON array, no other text."""
+Return ONLY the JSON object, no other text."""
+
+# Split once so batches are built by concatenation instead of re-scanning the template
+_SEGMENT_PROMPT_PREFIX, _SEGMENT_PROMPT_SUFFIX = SEGMENT_ANALYSIS_PROMPT.split("{segments}")
+
+# Bound formatter for one "[index] (start - end): text" prompt line
+_SEGMENT_LINE = "[{}] ({:.1f}s - {:.1f}s): {}".format
+
+_EMOTIONS_SCHEMA = {
+    "type": "object",
+    "properties": {name: {"type": "number"} for name in EMOTION_NAMES},
+    "required": list(EMOTION_NAMES),
+    "additionalProperties": False,
+}
+
+# Structured-output schemas for providers that support constrained decoding
+SEGMENT_ANALYSIS_SCHEMA = {
+    "name": "segment_sentiment",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "segments": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "segment_index": {"type": "integer"},
+                        "polarity": {"type": "number"},
+                        "energy": {"type": "string", "enum": ["aggressive", "calm", "neutral"]},
+                        "energy_score": {"type": "number"},
+                        "excitement": {"type": "integer"},
+                        "emotions": _EMOTIONS_SCHEMA,
+                        "heat_score": {"type": "number"},
+                    },
+                    "required": [
+                        "segment_index",
+                        "polarity",
+                        "energy",
+                        "energy_score",
+                        "excitement",
+                        "emotions",
+                        "heat_score",
+                    ],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["segments"],
+        "additionalProperties": False,
+    },
+}
+
+EMOTIONAL_ARC_SCHEMA = {
+    "name": "emotional_arc",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "overall_sentiment": {
+                "type": "string",
+                "enum": ["positive", "negative", "neutral", "mixed"],
+            },
+            "emotional_journey": {"type": "string"},
+            "dominant_emotions": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(EMOTION_NAMES)},
+            },
+        },
+        "required": ["overall_sentiment", "emotional_journey", "dominant_emotions"],
+        "additionalProperties": False,
+    },
+}
 
 # Prompt for generating emotional arc summary
 EMOTIONAL_ARC_PROMPT = """Based on the sentiment analysis of a transcript, create an emotional arc summary.
@@ -237,13 +516,59 @@ Create a summary with:
 Return JSON with these three fields only. No other text."""
 
 
+class _EnvProviderSpec(NamedTuple):
+    """How to build a provider from environment settings."""
+
+    api_key_attr: Optional[str]  # Required settings attribute, None if keyless
+    model_attr: str
+    model_prefix: str
+    base_url_attr: Optional[str]
+    provider: str
+
+
+# Environment llm_provider value -> settings layout, looked up instead of an if/elif chain
+_ENV_PROVIDERS = {
+    "ollama": _EnvProviderSpec(None, "ollama_model", "ollama/", "ollama_base_url", "ollama"),
+    "openai": _EnvProviderSpec("openai_api_key", "openai_model", "", "openai_base_url", "openai"),
+    "openai_compatible": _EnvProviderSpec(
+        "openai_api_key", "openai_model", "openai/", "openai_base_url", "custom"
+    ),
+    "anthropic": _EnvProviderSpec("anthropic_api_key", "anthropic_model", "", None, "anthropic"),
+    "groq": _EnvProviderSpec("groq_api_key", "groq_model", "groq/", None, "groq"),
+    "deepseek": _EnvProviderSpec("deepseek_api_key", "deepseek_model", "deepseek/", None, "deepseek"),
+    "gemini": _EnvProviderSpec("gemini_api_key", "gemini_model", "gemini/", None, "gemini"),
+}
+
+# Database provider name -> LiteLLM model prefix
+_MODEL_PREFIXES = {
+    "ollama": "ollama/",
+    "groq": "groq/",
+    "deepseek": "deepseek/",
+    "gemini": "gemini/",
+    "custom": "openai/",
+}
+
+
 class SentimentAnalyzer:
     """Service for analyzing sentiment in transcripts using LLMs."""
 
     # Analysis settings
-    BATCH_SIZE = 20  # Segments per LLM call
+    TARGET_PROMPT_TOKENS = 3500  # Approximate segment tokens per LLM call
+    MAX_BATCH_SIZE = 80  # Hard cap on segments per LLM call
     HEAT_THRESHOLD = 0.6  # Score above this = "heated"
     DEFAULT_WINDOW_SIZE = 30  # Seconds per time window
+    AVAILABILITY_TTL = 15  # Seconds to cache is_available() results
+    PROBE_TIMEOUT = 1.5  # Seconds to wait for the Ollama availability probe
+
+    # Cached availability result and the in-flight probe, if any; is_available()
+    # is called from request threads, so both are guarded by a lock that is
+    # never held across the probe itself
+    _availability_cache: TTLCache = TTLCache(maxsize=1, ttl=AVAILABILITY_TTL)
+    _availability_probe: Optional[Future] = None
+    _availability_lock = threading.Lock()
+    # Shared client for provider probes, with its own lock for its lifetime
+    _probe_client: Optional[httpx.Client] = None
+    _probe_client_lock = threading.Lock()
 
     def __init__(self, provider: Optional[LiteLLMProvider] = None):
         self.provider = provider
@@ -276,78 +601,72 @@ class SentimentAnalyzer:
             logger.debug(f"Could not load AI settings from database: {e}")
 
         # Fall back to environment settings
-        if settings.llm_provider == "ollama":
-            model = f"ollama/{settings.ollama_model}"
-            provider = LiteLLMProvider(
-                model=model,
-                base_url=settings.ollama_base_url,
-                provider="ollama",
-            )
-        elif settings.llm_provider == "openai" and settings.openai_api_key:
-            provider = LiteLLMProvider(
-                model=settings.openai_model,
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_base_url,
-                provider="openai",
-            )
-        elif settings.llm_provider == "openai_compatible" and settings.openai_api_key:
-            model = f"openai/{settings.openai_model}"
-            provider = LiteLLMProvider(
-                model=model,
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_base_url,
-                provider="custom",
-            )
-        elif settings.llm_provider == "anthropic" and settings.anthropic_api_key:
-            provider = LiteLLMProvider(
-                model=settings.anthropic_model,
-                api_key=settings.anthropic_api_key,
-                provider="anthropic",
-            )
-        elif settings.llm_provider == "groq" and settings.groq_api_key:
-            model = f"groq/{settings.groq_model}"
-            provider = LiteLLMProvider(
-                model=model,
-                api_key=settings.groq_api_key,
-                provider="groq",
-            )
-        elif settings.llm_provider == "deepseek" and settings.deepseek_api_key:
-            model = f"deepseek/{settings.deepseek_model}"
-            provider = LiteLLMProvider(
-                model=model,
-                api_key=settings.deepseek_api_key,
-                provider="deepseek",
-            )
-        elif settings.llm_provider == "gemini" and settings.gemini_api_key:
-            model = f"gemini/{settings.gemini_model}"
-            provider = LiteLLMProvider(
-                model=model,
-                api_key=settings.gemini_api_key,
-                provider="gemini",
-            )
+        spec = _ENV_PROVIDERS.get(settings.llm_provider)
+        if spec:
+            api_key = getattr(settings, spec.api_key_attr) if spec.api_key_attr else None
+            if api_key or not spec.api_key_attr:
+                provider = LiteLLMProvider(
+                    model=spec.model_prefix + getattr(settings, spec.model_attr),
+                    api_key=api_key,
+                    base_url=getattr(settings, spec.base_url_attr) if spec.base_url_attr else None,
+                    provider=spec.provider,
+                )
 
         return cls(provider=provider)
 
     @staticmethod
     def _build_litellm_model(provider: str, model: str) -> str:
         """Build the LiteLLM model string from provider and model name."""
-        if provider == "ollama":
-            return f"ollama/{model}"
-        elif provider == "groq":
-            return f"groq/{model}"
-        elif provider == "deepseek":
-            return f"deepseek/{model}"
-        elif provider == "gemini":
-            return f"gemini/{model}"
-        elif provider == "custom":
-            return f"openai/{model}"
-        else:
-            # OpenAI and Anthropic models don't need prefix
-            return model
+        # OpenAI and Anthropic models don't need prefix
+        return _MODEL_PREFIXES.get(provider, "") + model
 
-    @staticmethod
-    def is_available() -> bool:
-        """Check if sentiment analysis is available."""
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check if sentiment analysis is available.
+
+        The result is cached briefly so UI polling does not probe the
+        provider on every request. Concurrent callers wait for one probe
+        rather than each starting their own.
+        """
+        with cls._availability_lock:
+            available = cls._availability_cache.get("available")
+            if available is not None:
+                return available
+            probe = cls._availability_probe
+            if probe is not None:
+                owner = False
+            else:
+                probe = cls._availability_probe = Future()
+                owner = True
+
+        if not owner:
+            return probe.result()
+
+        try:
+            available = cls._check_availability()
+        except BaseException as e:
+            with cls._availability_lock:
+                cls._availability_probe = None
+            probe.set_exception(e)
+            raise
+
+        with cls._availability_lock:
+            cls._availability_cache["available"] = available
+            cls._availability_probe = None
+        probe.set_result(available)
+        return available
+
+    @classmethod
+    def close_probe_client(cls) -> None:
+        """Close the shared availability probe client (called on app shutdown)."""
+        with cls._probe_client_lock:
+            if cls._probe_client is not None:
+                cls._probe_client.close()
+                cls._probe_client = None
+
+    @classmethod
+    def _check_availability(cls) -> bool:
+        """Probe the configured provider without caching."""
         from ..config import get_settings
         from .job_store import get_job_store
 
@@ -360,13 +679,9 @@ class SentimentAnalyzer:
             if ai_settings:
                 provider = ai_settings["provider"]
                 if provider == "ollama":
-                    import httpx
-
                     base_url = ai_settings.get("base_url") or "http://localhost:11434"
-                    with httpx.Client(timeout=5.0) as client:
-                        response = client.get(f"{base_url.rstrip('/')}/api/tags")
-                        if response.status_code == 200:
-                            return True
+                    if cls._ollama_reachable(base_url):
+                        return True
                 else:
                     # Cloud providers with API key
                     return bool(ai_settings.get("api_key"))
@@ -374,29 +689,25 @@ class SentimentAnalyzer:
             pass
 
         # Fall back to environment settings
-        if settings.llm_provider == "ollama":
-            try:
-                import httpx
-
-                with httpx.Client(timeout=5.0) as client:
-                    response = client.get(f"{settings.ollama_base_url}/api/tags")
-                    if response.status_code == 200:
-                        return True
-            except Exception:
-                pass
-
-        if settings.llm_provider in ("openai", "openai_compatible") and settings.openai_api_key:
-            return True
-        if settings.llm_provider == "anthropic" and settings.anthropic_api_key:
-            return True
-        if settings.llm_provider == "groq" and settings.groq_api_key:
-            return True
-        if settings.llm_provider == "deepseek" and settings.deepseek_api_key:
-            return True
-        if settings.llm_provider == "gemini" and settings.gemini_api_key:
+        if settings.llm_provider == "ollama" and cls._ollama_reachable(settings.ollama_base_url):
             return True
 
-        return False
+        # Cloud providers with API key
+        spec = _ENV_PROVIDERS.get(settings.llm_provider)
+        return bool(spec and spec.api_key_attr and getattr(settings, spec.api_key_attr))
+
+    @classmethod
+    def _ollama_reachable(cls, base_url: str) -> bool:
+        """Check that an Ollama server answers on /api/tags."""
+        with cls._probe_client_lock:
+            if cls._probe_client is None:
+                cls._probe_client = httpx.Client(timeout=cls.PROBE_TIMEOUT)
+            client = cls._probe_client
+        try:
+            response = client.get(f"{base_url.rstrip('/')}/api/tags")
+            return response.status_code == 200
+        except Exception:
+            return False
 
     async def analyze_sentiment(
         self,
@@ -435,57 +746,76 @@ class SentimentAnalyzer:
                 error="No segments to analyze",
             )
 
-        logger.info(f"Analyzing sentiment for {len(segments)} segments")
+        # Analyze each distinct text once; repeats ("yeah", "mhm") reuse the result
+        occurrences: dict[str, list[int]] = {}
+        for i, seg in enumerate(segments):
+            occurrences.setdefault(seg["text"].strip(), []).append(i)
+        unique_segments = [segments[indices[0]] for indices in occurrences.values()]
+
+        logger.info(
+            f"Analyzing sentiment for {len(segments)} segments ({len(unique_segments)} unique)"
+        )
         total_tokens = 0
 
         try:
-            # Analyze segments in batches
-            analyzed_segments: list[SegmentSentiment] = []
+            # Analyze unique segments in batches
+            unique_results: list[SegmentSentiment] = []
 
-            for batch_start in range(0, len(segments), self.BATCH_SIZE):
-                batch_end = min(batch_start + self.BATCH_SIZE, len(segments))
-                batch = segments[batch_start:batch_end]
-
-                logger.info(f"Processing batch {batch_start // self.BATCH_SIZE + 1}")
+            for batch_num, (batch_start, batch) in enumerate(
+                self._build_batches(unique_segments), 1
+            ):
+                logger.info(f"Processing batch {batch_num} ({len(batch)} segments)")
 
                 # Format segments for prompt
                 segments_text = "\n".join(
-                    f"[{i + batch_start}] ({seg['start']:.1f}s - {seg['end']:.1f}s): {seg['text']}"
-                    for i, seg in enumerate(batch)
+                    _SEGMENT_LINE(i, seg["start"], seg["end"], seg["text"])
+                    for i, seg in enumerate(batch, batch_start)
                 )
 
-                prompt = SEGMENT_ANALYSIS_PROMPT.format(segments=segments_text)
+                prompt = _SEGMENT_PROMPT_PREFIX + segments_text + _SEGMENT_PROMPT_SUFFIX
                 response, tokens = await self.provider.generate(
-                    prompt, SENTIMENT_SYSTEM_PROMPT
+                    prompt, SENTIMENT_SYSTEM_PROMPT, response_schema=SEGMENT_ANALYSIS_SCHEMA
                 )
                 total_tokens += tokens
 
                 # Parse response
                 batch_results = self._parse_segment_analysis(response, batch, batch_start)
-                analyzed_segments.extend(batch_results)
-
-            # Mark heated segments
-            for seg in analyzed_segments:
-                seg.is_heated = seg.heat_score >= self.HEAT_THRESHOLD
-
-            # Aggregate time windows
-            time_windows = self._aggregate_time_windows(analyzed_segments, window_size)
-
-            # Generate emotional arc
-            emotional_arc = await self._generate_emotional_arc(
-                analyzed_segments, total_tokens
-            )
+                unique_results.extend(batch_results)
+
+            # Broadcast each analysis back to every occurrence of its text
+            analyzed_segments: list[SegmentSentiment] = [None] * len(segments)
+            for analysis, indices in zip(unique_results, occurrences.values()):
+                for i in indices:
+                    seg = segments[i]
+                    analyzed_segments[i] = replace(
+                        analysis,
+                        segment_index=i,
+                        start=seg["start"],
+                        end=seg["end"],
+                        text=seg["text"],
+                        speaker=seg.get("speaker"),
+                    )
 
-            return SentimentAnalysisResult(
+            result = SentimentAnalysisResult(
                 success=True,
                 job_id=job_id,
                 segments=analyzed_segments,
-                time_windows=time_windows,
-                emotional_arc=emotional_arc,
                 model=self.provider.model_name,
                 provider=self.provider.name,
                 tokens_used=total_tokens,
             )
+            # Segment arrays are shared by window aggregation and the arc summary
+            arrays = result.segment_arrays
+
+            # Aggregate time windows
+            result.time_windows = self._aggregate_time_windows(analyzed_segments, window_size, arrays)
+
+            # Generate emotional arc
+            result.emotional_arc = await self._generate_emotional_arc(
+                analyzed_segments, total_tokens, arrays
+            )
+
+            return result
 
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
@@ -497,6 +827,39 @@ class SentimentAnalyzer:
                 provider=self.provider.name if self.provider else None,
             )
 
+    def _build_batches(self, segments: list[dict]) -> list[tuple[int, list[dict]]]:
+        """Group segments into batches sized by an approximate token budget.
+
+        Tokens are estimated as ~4 characters each, plus a small allowance for
+        the index/timestamp prefix. A batch is closed once adding the next
+        segment would exceed TARGET_PROMPT_TOKENS or MAX_BATCH_SIZE segments.
+
+        Returns:
+            List of (batch_start, batch) tuples
+        """
+        batches: list[tuple[int, list[dict]]] = []
+        batch_start = 0
+        batch: list[dict] = []
+        batch_tokens = 0
+
+        for i, seg in enumerate(segments):
+            seg_tokens = len(seg["text"]) // 4 + 8
+            if batch and (
+                batch_tokens + seg_tokens > self.TARGET_PROMPT_TOKENS
+                or len(batch) >= self.MAX_BATCH_SIZE
+            ):
+                batches.append((batch_start, batch))
+                batch_start = i
+                batch = []
+                batch_tokens = 0
+            batch.append(seg)
+            batch_tokens += seg_tokens
+
+        if batch:
+            batches.append((batch_start, batch))
+
+        return batches
+
     def _parse_segment_analysis(
         self, response: str, segments: list[dict], batch_start: int
     ) -> list[SegmentSentiment]:
@@ -505,68 +868,38 @@ class SentimentAnalyzer:
 
         # Try to extract JSON from response
         try:
-            # Handle markdown code blocks
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-
-            parsed = json.loads(response.strip())
+            parsed = _parse_json_response(response)
 
+            # Schema-constrained output wraps the list in {"segments": [...]}
+            if isinstance(parsed, dict) and isinstance(parsed.get("segments"), list):
+                parsed = parsed["segments"]
             if not isinstance(parsed, list):
                 parsed = [parsed]
 
+            # Index results once; the first entry for a segment_index wins
+            by_index: dict = {}
+            for item in parsed:
+                if isinstance(item, dict):
+                    by_index.setdefault(item.get("segment_index"), item)
+
             for i, seg in enumerate(segments):
                 seg_idx = batch_start + i
 
-                # Find matching analysis result
-                analysis = None
-                for item in parsed:
-                    if item.get("segment_index") == seg_idx:
-                        analysis = item
-                        break
-
-                # If no match by index, use position
-                if analysis is None and i < len(parsed):
+                # Find matching analysis result, falling back to position
+                analysis = by_index.get(seg_idx)
+                if analysis is None and i < len(parsed) and isinstance(parsed[i], dict):
                     analysis = parsed[i]
 
                 if analysis:
-                    # Helper to safely get float values with clamping
-                    def safe_float(val, default, min_val=None, max_val=None):
-                        if val is None:
-                            return default
-                        try:
-                            result = float(val)
-                            if min_val is not None:
-                                result = max(min_val, result)
-                            if max_val is not None:
-                                result = min(max_val, result)
-                            return result
-                        except (ValueError, TypeError):
-                            return default
-
-                    def safe_int(val, default, min_val=None, max_val=None):
-                        if val is None:
-                            return default
-                        try:
-                            result = int(val)
-                            if min_val is not None:
-                                result = max(min_val, result)
-                            if max_val is not None:
-                                result = min(max_val, result)
-                            return result
-                        except (ValueError, TypeError):
-                            return default
-
                     # Get emotions with defaults (clamped to 0-1)
                     emotions_raw = analysis.get("emotions") or {}
-                    emotions = {
-                        "joy": safe_float(emotions_raw.get("joy"), 0.0, 0.0, 1.0),
-                        "anger": safe_float(emotions_raw.get("anger"), 0.0, 0.0, 1.0),
-                        "fear": safe_float(emotions_raw.get("fear"), 0.0, 0.0, 1.0),
-                        "surprise": safe_float(emotions_raw.get("surprise"), 0.0, 0.0, 1.0),
-                        "sadness": safe_float(emotions_raw.get("sadness"), 0.0, 0.0, 1.0),
-                    }
+                    emotions = np.array(
+                        [
+                            _safe_float(emotions_raw.get(name), 0.0, 0.0, 1.0)
+                            for name in EMOTION_NAMES
+                        ],
+                        dtype=np.float64,
+                    )
 
                     results.append(
                         SegmentSentiment(
@@ -574,161 +907,126 @@ class SentimentAnalyzer:
                             start=seg["start"],
                             end=seg["end"],
                             text=seg["text"],
-                            polarity=safe_float(analysis.get("polarity"), 0.0, -1.0, 1.0),
+                            polarity=_safe_float(analysis.get("polarity"), 0.0, -1.0, 1.0),
                             energy=analysis.get("energy") or "neutral",
-                            energy_score=safe_float(analysis.get("energy_score"), 0.5, 0.0, 1.0),
-                            excitement=safe_int(analysis.get("excitement"), 50, 0, 100),
+                            energy_score=_safe_float(analysis.get("energy_score"), 0.5, 0.0, 1.0),
+                            excitement=_safe_int(analysis.get("excitement"), 50, 0, 100),
                             emotions=emotions,
-                            heat_score=safe_float(analysis.get("heat_score"), 0.3, 0.0, 1.0),
-                            is_heated=False,  # Set later
+                            heat_score=_safe_float(analysis.get("heat_score"), 0.3, 0.0, 1.0),
                             speaker=seg.get("speaker"),
                         )
                     )
                 else:
-                    # Default values if parsing fails
-                    results.append(
-                        SegmentSentiment(
-                            segment_index=seg_idx,
-                            start=seg["start"],
-                            end=seg["end"],
-                            text=seg["text"],
-                            polarity=0.0,
-                            energy="neutral",
-                            energy_score=0.5,
-                            excitement=50,
-                            emotions={"joy": 0, "anger": 0, "fear": 0, "surprise": 0, "sadness": 0},
-                            heat_score=0.3,
-                            is_heated=False,
-                            speaker=seg.get("speaker"),
-                        )
-                    )
+                    results.append(_default_segment(seg, seg_idx))
 
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             logger.warning(f"Failed to parse segment analysis: {e}")
             # Return default values for all segments
-            for i, seg in enumerate(segments):
-                results.append(
-                    SegmentSentiment(
-                        segment_index=batch_start + i,
-                        start=seg["start"],
-                        end=seg["end"],
-                        text=seg["text"],
-                        polarity=0.0,
-                        energy="neutral",
-                        energy_score=0.5,
-                        excitement=50,
-                        emotions={"joy": 0, "anger": 0, "fear": 0, "surprise": 0, "sadness": 0},
-                        heat_score=0.3,
-                        is_heated=False,
-                        speaker=seg.get("speaker"),
-                    )
-                )
+            results = [_default_segment(seg, idx) for idx, seg in enumerate(segments, batch_start)]
 
         return results
 
     def _aggregate_time_windows(
-        self, segments: list[SegmentSentiment], window_size: int
+        self,
+        segments: list[SegmentSentiment],
+        window_size: int,
+        arrays: Optional[SegmentArrays] = None,
     ) -> list[TimeWindowAggregate]:
-        """Aggregate sentiment data into time windows."""
+        """Aggregate sentiment data into time windows.
+
+        Args:
+            segments: Analyzed segments
+            window_size: Window size in seconds
+            arrays: Precomputed SegmentArrays for segments, built if omitted
+        """
         if not segments:
             return []
 
-        # Find total duration
-        max_end = max(seg.end for seg in segments)
-        windows = []
-        window_idx = 0
-        current_start = 0.0
-
-        while current_start < max_end:
-            current_end = min(current_start + window_size, max_end)
-
-            # Find segments in this window
-            window_segments = [
-                seg
-                for seg in segments
-                if seg.start < current_end and seg.end > current_start
-            ]
+        if arrays is None:
+            arrays = SegmentArrays.from_segments(segments)
+
+        max_end = float(arrays.ends.max())
+        avg_pol, avg_heat, dominant_idx, counts, window_starts, window_ends = _aggregate_windows(
+            arrays.starts,
+            arrays.ends,
+            arrays.polarity,
+            arrays.heat,
+            arrays.emotions,
+            window_size,
+            max_end,
+        )
 
-            if window_segments:
-                # Calculate averages
-                avg_polarity = sum(s.polarity for s in window_segments) / len(window_segments)
-                avg_heat = sum(s.heat_score for s in window_segments) / len(window_segments)
-
-                # Find dominant emotion
-                emotion_totals: dict[str, float] = {}
-                for seg in window_segments:
-                    for emotion, score in seg.emotions.items():
-                        emotion_totals[emotion] = emotion_totals.get(emotion, 0) + score
-
-                dominant_emotion = max(emotion_totals.items(), key=lambda x: x[1])[0] if emotion_totals else "neutral"
-
-                windows.append(
-                    TimeWindowAggregate(
-                        window_index=window_idx,
-                        start=current_start,
-                        end=current_end,
-                        avg_polarity=round(avg_polarity, 3),
-                        avg_heat_score=round(avg_heat, 3),
-                        dominant_emotion=dominant_emotion,
-                        segment_count=len(window_segments),
-                    )
+        windows = []
+        for window_idx in np.flatnonzero(counts):
+            windows.append(
+                TimeWindowAggregate(
+                    window_index=int(window_idx),
+                    start=float(window_starts[window_idx]),
+                    end=float(window_ends[window_idx]),
+                    avg_polarity=round(float(avg_pol[window_idx]), 3),
+                    avg_heat_score=round(float(avg_heat[window_idx]), 3),
+                    dominant_emotion=EMOTION_NAMES[dominant_idx[window_idx]],
+                    segment_count=int(counts[window_idx]),
                 )
-
-            window_idx += 1
-            current_start = current_end
+            )
 
         return windows
 
     async def _generate_emotional_arc(
-        self, segments: list[SegmentSentiment], tokens_so_far: int
+        self,
+        segments: list[SegmentSentiment],
+        tokens_so_far: int,
+        arrays: Optional[SegmentArrays] = None,
     ) -> Optional[EmotionalArc]:
-        """Generate overall emotional arc summary."""
+        """Generate overall emotional arc summary.
+
+        Args:
+            segments: Analyzed segments
+            tokens_so_far: Tokens used by segment analysis
+            arrays: Precomputed SegmentArrays for segments, built if omitted
+        """
         if not segments or not self.provider:
             return None
 
-        try:
-            # Calculate statistics
-            heated_segments = [s for s in segments if s.is_heated]
-            avg_heat = sum(s.heat_score for s in segments) / len(segments)
+        if arrays is None:
+            arrays = SegmentArrays.from_segments(segments)
+        emotion_totals = arrays.emotions.sum(axis=0)
+        # Stable, so ties keep EMOTION_NAMES order
+        emotion_order = np.argsort(-emotion_totals, kind="stable").tolist()
+
+        # Statistics shared by the LLM and fallback paths
+        heat = arrays.heat
+        avg_heat = float(heat.mean())
+        heated_count = int(np.count_nonzero(heat >= self.HEAT_THRESHOLD))
+        top_heated = [segments[i] for i in _top_k_indices(heat, 5)]
+        # Dominant emotions (top 3 by total)
+        top_emotions = [EMOTION_NAMES[i] for i in emotion_order[:3]]
 
-            # Get top heated moments
-            top_heated = sorted(segments, key=lambda s: s.heat_score, reverse=True)[:5]
+        try:
             top_moments_text = "\n".join(
                 f"- {s.start:.1f}s: \"{s.text[:80]}...\" (heat: {s.heat_score:.2f})"
                 for s in top_heated
             )
 
-            # Aggregate emotions
-            emotion_totals: dict[str, float] = {}
-            for seg in segments:
-                for emotion, score in seg.emotions.items():
-                    emotion_totals[emotion] = emotion_totals.get(emotion, 0) + score
-
             emotion_text = "\n".join(
-                f"- {emotion}: {total:.1f}" for emotion, total in sorted(emotion_totals.items(), key=lambda x: -x[1])
+                f"- {EMOTION_NAMES[i]}: {emotion_totals[i]:.1f}" for i in emotion_order
             )
 
             prompt = EMOTIONAL_ARC_PROMPT.format(
                 total_segments=len(segments),
                 avg_heat=f"{avg_heat:.2f}",
-                heated_count=len(heated_segments),
+                heated_count=heated_count,
                 top_moments=top_moments_text,
                 emotion_totals=emotion_text,
             )
 
-            response, _ = await self.provider.generate(prompt, SENTIMENT_SYSTEM_PROMPT)
-
-            # Parse response
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
+            response, _ = await self.provider.generate(
+                prompt, SENTIMENT_SYSTEM_PROMPT, response_schema=EMOTIONAL_ARC_SCHEMA
+            )
 
-            parsed = json.loads(response.strip())
+            parsed = _parse_json_response(response)
 
-            # Get dominant emotions (top 3 by total)
-            sorted_emotions = sorted(emotion_totals.items(), key=lambda x: -x[1])
-            raw_emotions = parsed.get("dominant_emotions", [e[0] for e in sorted_emotions[:3]])
+            raw_emotions = parsed.get("dominant_emotions", top_emotions)
 
             # Handle case where LLM returns objects instead of strings
             dominant_emotions = []
@@ -743,7 +1041,7 @@ class SentimentAnalyzer:
 
             # Fallback to statistics-based emotions if parsing fails
             if not dominant_emotions:
-                dominant_emotions = [e[0] for e in sorted_emotions[:3]]
+                dominant_emotions = top_emotions
 
             # Handle emotional_journey - might be string or object
             journey_raw = parsed.get("emotional_journey", "Unable to determine emotional journey.")
@@ -771,24 +1069,14 @@ class SentimentAnalyzer:
                 peak_moments=peak_moments,
                 dominant_emotions=dominant_emotions[:3],
                 emotional_journey=emotional_journey,
-                total_heated_segments=len(heated_segments),
-                heated_percentage=round(len(heated_segments) / len(segments) * 100, 1),
+                total_heated_segments=heated_count,
+                heated_percentage=round(heated_count / len(segments) * 100, 1),
             )
 
         except Exception as e:
             logger.warning(f"Failed to generate emotional arc: {e}")
             # Return basic arc from statistics
-            heated_segments = [s for s in segments if s.is_heated]
-            avg_heat = sum(s.heat_score for s in segments) / len(segments)
-            avg_polarity = sum(s.polarity for s in segments) / len(segments)
-
-            emotion_totals: dict[str, float] = {}
-            for seg in segments:
-                for emotion, score in seg.emotions.items():
-                    emotion_totals[emotion] = emotion_totals.get(emotion, 0) + score
-
-            sorted_emotions = sorted(emotion_totals.items(), key=lambda x: -x[1])
-            top_heated = sorted(segments, key=lambda s: s.heat_score, reverse=True)[:3]
+            avg_polarity = float(arrays.polarity.mean())
 
             return EmotionalArc(
                 overall_sentiment="positive" if avg_polarity > 0.2 else "negative" if avg_polarity < -0.2 else "neutral",
@@ -799,12 +1087,12 @@ class SentimentAnalyzer:
                         "description": s.text[:100],
                         "heat_score": s.heat_score,
                     }
-                    for s in top_heated
+                    for s in top_heated[:3]
                 ],
-                dominant_emotions=[e[0] for e in sorted_emotions[:3]],
+                dominant_emotions=top_emotions,
                 emotional_journey="Analysis based on statistical aggregation.",
-                total_heated_segments=len(heated_segments),
-                heated_percentage=round(len(heated_segments) / len(segments) * 100, 1),
+                total_heated_segments=heated_count,
+                heated_percentage=round(heated_count / len(segments) * 100, 1),
             )
 
     def get_heated_moments(
@@ -812,4 +1100,4 @@ class SentimentAnalyzer:
     ) -> list[SegmentSentiment]:
         """Get top heated moments from analyzed segments."""
         heated = [s for s in segments if s.is_heated]
-        return sorted(heated, key=lambda s: s.heat_score, reverse=True)[:limit]
+        return heapq.nlargest(limit, heated, key=attrgetter("heat_score"))
@@ -1,16 +1,103 @@
 """Storage management for automatic cleanup and disk space monitoring."""
 
 import asyncio
+import heapq
 import logging
 import os
 import shutil
+import time
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Generator, Iterable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+# Database files in the download directory are never cleanup candidates
+_SKIP_SUFFIXES = (".db", ".db-journal", ".db-wal")
+
+# Walk directories through file descriptors where the platform allows it
+_SCANDIR_FD = os.scandir in os.supports_fd and os.open in os.supports_dir_fd
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+
+
+def _walk_files(
+    root: str | os.PathLike, empty_dirs: Optional[list[Path]] = None
+) -> Iterator[tuple[str, os.DirEntry]]:
+    """Recursively yield (dirpath, entry) for each regular file under root.
+
+    Directories are listed through file descriptors where the platform
+    allows it, so DirEntry.stat() becomes fstatat(dir_fd, name) and the
+    kernel does not re-resolve the full path for every file in deep trees;
+    otherwise paths are used. DirEntry caches the file type from readdir,
+    so files cost no stat call unless the caller asks for one. Symlinks
+    are not followed.
+
+    Args:
+        root: Directory to walk
+        empty_dirs: If given, directories under root whose subtree holds
+            no files are appended to it, deepest first
+    """
+    root = os.fspath(root)
+    root_fd = None
+    if _SCANDIR_FD:
+        try:
+            root_fd = os.open(root, _DIR_OPEN_FLAGS)
+        except OSError:
+            root_fd = None
+    try:
+        yield from _walk_dir(root, root_fd, empty_dirs)
+    finally:
+        if root_fd is not None:
+            os.close(root_fd)
+
+
+def _walk_dir(
+    path: str, dir_fd: Optional[int], empty_dirs: Optional[list[Path]]
+) -> Generator[tuple[str, os.DirEntry], None, bool]:
+    """Walk one directory for _walk_files; return True if its subtree holds no files."""
+    has_content = False
+    try:
+        with os.scandir(path if dir_fd is None else dir_fd) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        child = os.path.join(path, entry.name)
+                        child_fd = None
+                        if dir_fd is not None:
+                            child_fd = os.open(entry.name, _DIR_OPEN_FLAGS, dir_fd=dir_fd)
+                        try:
+                            child_empty = yield from _walk_dir(child, child_fd, empty_dirs)
+                        finally:
+                            if child_fd is not None:
+                                os.close(child_fd)
+                        if not child_empty:
+                            has_content = True
+                        elif empty_dirs is not None:
+                            empty_dirs.append(Path(child))
+                        continue
+                    has_content = True
+                    is_file = entry.is_file(follow_symlinks=False)
+                except OSError:
+                    has_content = True
+                    continue
+                if is_file:
+                    yield path, entry
+    except OSError:
+        return False
+    return not has_content
+
+
+def _iter_oldest(files: list[tuple[str, float, int]]) -> Iterator[tuple[str, float, int]]:
+    """Yield (path, age_hours, size_bytes) tuples oldest first, ordering lazily.
+
+    Heapify is O(n) and each pop O(log n), so callers that stop early never
+    pay for a full sort. Ties keep their original order, as with a stable sort.
+    """
+    heap = [(-age_hours, i) for i, (_, age_hours, _) in enumerate(files)]
+    heapq.heapify(heap)
+    while heap:
+        yield files[heapq.heappop(heap)[1]]
+
 
 @dataclass
 class StorageStats:
@@ -84,6 +171,13 @@ class CleanupResult:
 class StorageManager:
     """Manages storage cleanup and monitoring."""
 
+    # Seconds a get_stats result is reused; deletions invalidate it early
+    STATS_TTL = 5.0
+    # Idle background runs double the interval, up to this multiple of it
+    MAX_IDLE_BACKOFF = 16
+    # Runs that delete files halve it, but not below this many seconds
+    MIN_CLEANUP_INTERVAL = 60
+
     def __init__(self, download_dir: Optional[Path] = None):
         """
         Initialize storage manager.
@@ -99,9 +193,49 @@ class StorageManager:
 
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
+        # Directories that may be empty: found empty by a scan, or parents of
+        # deleted files. Drained by run_cleanup so it needs no extra walk.
+        self._prune_candidates: set[Path] = set()
+        self._scan_count = 0
+        self._stats_cache: Optional[tuple[float, StorageStats]] = None
+
+    def get_stats(self, force: bool = False) -> StorageStats:
+        """
+        Get current storage statistics.
+
+        Results are cached for STATS_TTL seconds so bursts of callers share
+        one tree walk.
+
+        Args:
+            force: Bypass the cache and walk the tree again
+        """
+        if not force:
+            cached = self._cached_stats()
+            if cached is not None:
+                return cached
+
+        # Calculate download directory size
+        download_dir_bytes = 0
+        download_file_count = 0
+
+        for _, entry in _walk_files(self.download_dir):
+            try:
+                download_dir_bytes += entry.stat(follow_symlinks=False).st_size
+                download_file_count += 1
+            except OSError:
+                pass
+
+        return self._store_stats(download_dir_bytes, download_file_count)
 
-    def get_stats(self) -> StorageStats:
-        """Get current storage statistics."""
+    def _cached_stats(self) -> Optional[StorageStats]:
+        """The cached get_stats result, or None if missing or expired."""
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < self.STATS_TTL:
+            return cached[1]
+        return None
+
+    def _store_stats(self, download_dir_bytes: int, download_file_count: int) -> StorageStats:
+        """Cache stats for a freshly measured download directory."""
         # Get disk usage for the volume containing download_dir
         try:
             disk_usage = shutil.disk_usage(self.download_dir)
@@ -111,26 +245,51 @@ class StorageManager:
         except OSError:
             total_bytes = used_bytes = free_bytes = 0
 
-        # Calculate download directory size
-        download_dir_bytes = 0
-        download_file_count = 0
-
-        if self.download_dir.exists():
-            for entry in self.download_dir.rglob("*"):
-                if entry.is_file():
-                    try:
-                        download_dir_bytes += entry.stat().st_size
-                        download_file_count += 1
-                    except OSError:
-                        pass
-
-        return StorageStats(
+        stats = StorageStats(
             total_bytes=total_bytes,
             used_bytes=used_bytes,
             free_bytes=free_bytes,
             download_dir_bytes=download_dir_bytes,
             download_file_count=download_file_count,
         )
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
+
+    def _scan_tree(self) -> tuple[list[tuple[str, float, int]], int, list[Path]]:
+        """
+        Walk the download directory once, collecting everything cleanup needs.
+
+        The directory totals also refresh the get_stats cache.
+
+        Returns:
+            Tuple of (files, total_bytes, empty_dirs) where files are
+            (path, age_hours, size_bytes) cleanup candidates in scan order
+            with str paths (database files excluded), total_bytes is the
+            size of all files, and empty_dirs are directories holding no
+            files, deepest first.
+        """
+        # Wall clock, since it is compared with filesystem mtimes
+        now = time.time()
+        files: list[tuple[str, float, int]] = []
+        empty_dirs: list[Path] = []
+        total_bytes = 0
+        file_count = 0
+
+        for dirpath, entry in _walk_files(self.download_dir, empty_dirs):
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            total_bytes += stat.st_size
+            file_count += 1
+            if not entry.name.endswith(_SKIP_SUFFIXES):
+                age_hours = (now - stat.st_mtime) / 3600
+                files.append((os.path.join(dirpath, entry.name), age_hours, stat.st_size))
+
+        self._prune_candidates.update(empty_dirs)
+        self._scan_count += 1
+        self._store_stats(total_bytes, file_count)
+        return files, total_bytes, empty_dirs
 
     def get_files_by_age(self, min_age_hours: float = 0) -> list[tuple[Path, float, int]]:
         """
@@ -139,52 +298,70 @@ class StorageManager:
         Returns:
             List of (path, age_hours, size_bytes) tuples
         """
-        now = datetime.now()
-        files = []
-
-        if not self.download_dir.exists():
-            return files
+        return [
+            (Path(path), age_hours, size)
+            for path, age_hours, size in self._files_older_than(min_age_hours)
+        ]
 
-        for entry in self.download_dir.rglob("*"):
-            if entry.is_file() and entry.suffix not in [".db", ".db-journal", ".db-wal"]:
-                try:
-                    stat = entry.stat()
-                    mtime = datetime.fromtimestamp(stat.st_mtime)
-                    age_hours = (now - mtime).total_seconds() / 3600
-
-                    if age_hours >= min_age_hours:
-                        files.append((entry, age_hours, stat.st_size))
-                except OSError:
-                    pass
+    def _files_older_than(self, min_age_hours: float) -> list[tuple[str, float, int]]:
+        """Cleanup candidates at least min_age_hours old, oldest first, as str paths."""
+        files, _, _ = self._scan_tree()
+        files = [f for f in files if f[1] >= min_age_hours]
 
         # Sort by age (oldest first)
         files.sort(key=lambda x: x[1], reverse=True)
         return files
 
-    def cleanup_by_age(self, max_age_hours: float) -> CleanupResult:
+    def _delete_files(
+        self,
+        files: Iterable[tuple[str, float, int]],
+        bytes_to_free: Optional[float] = None,
+    ) -> tuple[int, int, list[str]]:
         """
-        Delete files older than specified hours.
+        Delete files in order, optionally stopping once enough space is freed.
 
         Args:
-            max_age_hours: Maximum age in hours before deletion
+            files: (path, age_hours, size_bytes) tuples in deletion order
+            bytes_to_free: Stop after freeing this many bytes. Deletes all if None.
 
         Returns:
-            CleanupResult with statistics
+            Tuple of (files_deleted, bytes_freed, errors)
         """
         files_deleted = 0
         bytes_freed = 0
         errors = []
 
-        files = self.get_files_by_age(min_age_hours=max_age_hours)
-
         for path, age_hours, size in files:
+            if bytes_to_free is not None and bytes_freed >= bytes_to_free:
+                break
+
             try:
-                path.unlink()
+                os.unlink(path)
                 files_deleted += 1
                 bytes_freed += size
-                logger.debug(f"Deleted old file: {path.name} (age: {age_hours:.1f}h)")
+                self._prune_candidates.add(Path(os.path.dirname(path)))
+                logger.debug(f"Deleted file: {os.path.basename(path)} (age: {age_hours:.1f}h)")
             except OSError as e:
-                errors.append(f"Failed to delete {path.name}: {e}")
+                errors.append(f"Failed to delete {os.path.basename(path)}: {e}")
+
+        if files_deleted:
+            # Free space and sizes changed; later policies must not see stale stats
+            self._stats_cache = None
+
+        return files_deleted, bytes_freed, errors
+
+    def cleanup_by_age(self, max_age_hours: float) -> CleanupResult:
+        """
+        Delete files older than specified hours.
+
+        Args:
+            max_age_hours: Maximum age in hours before deletion
+
+        Returns:
+            CleanupResult with statistics
+        """
+        files = self._files_older_than(max_age_hours)
+        files_deleted, bytes_freed, errors = self._delete_files(files)
 
         if files_deleted > 0:
             logger.info(
@@ -208,31 +385,20 @@ class StorageManager:
         Returns:
             CleanupResult with statistics
         """
-        files_deleted = 0
-        bytes_freed = 0
-        errors = []
-
-        stats = self.get_stats()
-        current_size = stats.download_dir_bytes
         max_size_bytes = max_size_gb * (1024**3)
 
+        # Fresh cached stats settle the common within-limit case without a
+        # walk; otherwise a single scan yields both the total and the files
+        stats = self._cached_stats()
+        if stats is not None and stats.download_dir_bytes <= max_size_bytes:
+            return CleanupResult(files_deleted=0, bytes_freed=0, errors=[])
+
+        files, current_size, _ = self._scan_tree()
         if current_size <= max_size_bytes:
             return CleanupResult(files_deleted=0, bytes_freed=0, errors=[])
 
         bytes_to_free = current_size - max_size_bytes
-        files = self.get_files_by_age()
-
-        for path, age_hours, size in files:
-            if bytes_freed >= bytes_to_free:
-                break
-
-            try:
-                path.unlink()
-                files_deleted += 1
-                bytes_freed += size
-                logger.debug(f"Deleted file for size limit: {path.name}")
-            except OSError as e:
-                errors.append(f"Failed to delete {path.name}: {e}")
+        files_deleted, bytes_freed, errors = self._delete_files(_iter_oldest(files), bytes_to_free)
 
         if files_deleted > 0:
             logger.info(
@@ -256,30 +422,19 @@ class StorageManager:
         Returns:
             CleanupResult with statistics
         """
-        files_deleted = 0
-        bytes_freed = 0
-        errors = []
-
-        stats = self.get_stats()
+        # Free space needs only one statvfs call, not a tree walk
+        try:
+            free_bytes = shutil.disk_usage(self.download_dir).free
+        except OSError:
+            free_bytes = 0
         min_free_bytes = min_free_gb * (1024**3)
 
-        if stats.free_bytes >= min_free_bytes:
+        if free_bytes >= min_free_bytes:
             return CleanupResult(files_deleted=0, bytes_freed=0, errors=[])
 
-        bytes_to_free = min_free_bytes - stats.free_bytes
-        files = self.get_files_by_age()
-
-        for path, age_hours, size in files:
-            if bytes_freed >= bytes_to_free:
-                break
-
-            try:
-                path.unlink()
-                files_deleted += 1
-                bytes_freed += size
-                logger.debug(f"Deleted file for free space: {path.name}")
-            except OSError as e:
-                errors.append(f"Failed to delete {path.name}: {e}")
+        bytes_to_free = min_free_bytes - free_bytes
+        files, _, _ = self._scan_tree()
+        files_deleted, bytes_freed, errors = self._delete_files(_iter_oldest(files), bytes_to_free)
 
         if files_deleted > 0:
             logger.info(
@@ -300,22 +455,51 @@ class StorageManager:
         Returns:
             Number of directories removed
         """
+        # Only file types are needed, not stats. Empty directories come
+        # back deepest first, so children are removed before their parents.
+        empty_dirs: list[Path] = []
+        for _ in _walk_files(self.download_dir, empty_dirs):
+            pass
+
         removed = 0
+        for directory in empty_dirs:
+            try:
+                directory.rmdir()
+                removed += 1
+                logger.debug(f"Removed empty directory: {directory}")
+            except OSError:
+                pass
+
+        return removed
+
+    def _prune_dirs(self) -> int:
+        """
+        Remove pending candidate directories that are empty, and their parents.
 
-        if not self.download_dir.exists():
-            return 0
+        rmdir fails on a non-empty directory, so it doubles as the emptiness
+        check. Parents are retried after a child is removed, stopping at the
+        download directory.
 
-        # Walk from bottom up to handle nested empty dirs
-        for entry in sorted(self.download_dir.rglob("*"), reverse=True):
-            if entry.is_dir():
+        Returns:
+            Number of directories removed
+        """
+        candidates, self._prune_candidates = self._prune_candidates, set()
+        removed = 0
+        tried: set[Path] = set()
+
+        # Deepest first, so parents are empty by the time they are reached
+        for directory in sorted(candidates, key=lambda p: len(p.parts), reverse=True):
+            while directory not in tried and directory != self.download_dir:
+                if self.download_dir not in directory.parents:
+                    break
+                tried.add(directory)
                 try:
-                    # Check if directory is empty
-                    if not any(entry.iterdir()):
-                        entry.rmdir()
-                        removed += 1
-                        logger.debug(f"Removed empty directory: {entry}")
+                    directory.rmdir()
                 except OSError:
-                    pass
+                    break
+                removed += 1
+                logger.debug(f"Removed empty directory: {directory}")
+                directory = directory.parent
 
         return removed
 
@@ -328,6 +512,9 @@ class StorageManager:
         """
         Run cleanup with specified policies.
 
+        Tree walks and deletions run in a worker thread so large download
+        directories never block the event loop.
+
         Args:
             max_age_hours: Delete files older than this
             max_size_gb: Keep download dir under this size
@@ -339,28 +526,33 @@ class StorageManager:
         total_files = 0
         total_bytes = 0
         all_errors = []
+        scans_before = self._scan_count
 
         # Apply policies in order of priority
         if min_free_gb is not None:
-            result = self.cleanup_for_free_space(min_free_gb)
+            result = await asyncio.to_thread(self.cleanup_for_free_space, min_free_gb)
             total_files += result.files_deleted
             total_bytes += result.bytes_freed
             all_errors.extend(result.errors)
 
         if max_size_gb is not None:
-            result = self.cleanup_by_size(max_size_gb)
+            result = await asyncio.to_thread(self.cleanup_by_size, max_size_gb)
             total_files += result.files_deleted
             total_bytes += result.bytes_freed
             all_errors.extend(result.errors)
 
         if max_age_hours is not None:
-            result = self.cleanup_by_age(max_age_hours)
+            result = await asyncio.to_thread(self.cleanup_by_age, max_age_hours)
             total_files += result.files_deleted
             total_bytes += result.bytes_freed
             all_errors.extend(result.errors)
 
-        # Clean up empty directories
-        self.cleanup_empty_dirs()
+        # Clean up empty directories. If a policy above already scanned the
+        # tree it recorded the candidates; only walk it again if none did.
+        if self._scan_count == scans_before:
+            await asyncio.to_thread(self.cleanup_empty_dirs)
+        else:
+            await asyncio.to_thread(self._prune_dirs)
 
         return CleanupResult(
             files_deleted=total_files,
@@ -372,10 +564,11 @@ class StorageManager:
         """Background cleanup loop."""
         from ..config import get_settings
         settings = get_settings()
+        sleep_seconds = float(interval_seconds)
 
         while self._running:
             try:
-                await asyncio.sleep(interval_seconds)
+                await asyncio.sleep(sleep_seconds)
 
                 if not self._running:
                     break
@@ -393,6 +586,9 @@ class StorageManager:
                         min_free_gb=min_free_gb,
                     )
 
+                    sleep_seconds = self._next_interval(
+                        sleep_seconds, interval_seconds, result.files_deleted > 0
+                    )
                     if result.files_deleted > 0:
                         logger.info(
                             f"Background cleanup: deleted {result.files_deleted} files, "
@@ -405,6 +601,22 @@ class StorageManager:
                 logger.error(f"Background cleanup error: {e}")
                 await asyncio.sleep(60)  # Wait a bit before retrying
 
+    @classmethod
+    def _next_interval(cls, current: float, interval_seconds: float, threshold_hit: bool) -> float:
+        """
+        Sleep before the next background run.
+
+        An idle run doubles the sleep, up to MAX_IDLE_BACKOFF times the
+        configured interval. A run that hit a policy threshold halves it,
+        starting from the configured interval if it had backed off, so a
+        filling disk is checked more often. It never drops below
+        MIN_CLEANUP_INTERVAL, or the configured interval if that is shorter.
+        """
+        if threshold_hit:
+            floor = min(interval_seconds, cls.MIN_CLEANUP_INTERVAL)
+            return max(min(current, interval_seconds) / 2, floor)
+        return min(current * 2, interval_seconds * cls.MAX_IDLE_BACKOFF)
+
     async def start_background_cleanup(self, interval_seconds: Optional[int] = None):
         """Start background cleanup task."""
         if self._running:
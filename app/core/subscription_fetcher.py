@@ -1,33 +1,405 @@
 """Fetchers for different subscription types."""
 
 import asyncio
+import io
 import json
 import logging
+import queue
 import re
 import shutil
+import threading
+import time
+import xml.etree.ElementTree as ET
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, NamedTuple, Optional
 
 import feedparser
 import httpx
+from cachetools import LRUCache, TTLCache
+from feedparser.datetimes import _parse_date as _feedparser_parse_date
+
+try:
+    from yt_dlp import YoutubeDL
+except ImportError:  # yt-dlp is usually installed as a standalone CLI
+    YoutubeDL = None
 
 logger = logging.getLogger(__name__)
 
+# URL patterns, compiled once
+_APPLE_PODCAST_RE = re.compile(r"podcasts\.apple\.com/(?:\w+/)?podcast/[^/]+/id(\d+)")
+# Accepts /channel/<id>, /@<handle>, /c/<name> and /user/<name> channel URLs
+_YT_CHANNEL_RE = re.compile(r"youtube\.com/(?:channel/|@|c/|user/)([a-zA-Z0-9_-]+)")
+_YT_LIST_RE = re.compile(r"list=([a-zA-Z0-9_-]+)")
+
+# Shared connection pool for feed polls and iTunes lookups, so repeated
+# requests to the same hosts reuse TCP/TLS sessions
+_FEED_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_feed_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_feed_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for subscription fetchers."""
+    global _feed_http_client
+    if _feed_http_client is None or _feed_http_client.is_closed:
+        _feed_http_client = httpx.AsyncClient(
+            limits=_FEED_HTTP_LIMITS,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            follow_redirects=True,
+        )
+    return _feed_http_client
 
-@dataclass
+
+async def close_feed_http_client() -> None:
+    """Close the shared feed HTTP client (called on app shutdown)."""
+    global _feed_http_client
+    if _feed_http_client is not None:
+        await _feed_http_client.aclose()
+        _feed_http_client = None
+
+
+@dataclass(slots=True, frozen=True)
 class FetchedItem:
-    """Represents a fetched item from a subscription source."""
+    """Represents a fetched item from a subscription source.
+
+    Immutable, so items can be hashed and shared between cached polls.
+    """
     content_id: str
     content_url: str
     title: Optional[str] = None
     published_at: Optional[str] = None  # ISO format
 
 
+class _CachedFeed(NamedTuple):
+    """Validators and parsed items from the last successful poll of a feed."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    limit: int
+    items: list[FetchedItem]
+
+
+# Feeds are re-polled with If-None-Match / If-Modified-Since; a 304 reuses
+# the items parsed last time instead of downloading and parsing again
+_feed_cache: LRUCache = LRUCache(maxsize=1000)
+
+
+# Apple Podcasts ID -> (feed URL, podcast name); feed URLs rarely change
+_ITUNES_CACHE_TTL = 7 * 24 * 3600
+_itunes_cache: TTLCache = TTLCache(maxsize=1024, ttl=_ITUNES_CACHE_TTL)
+
+
+def _parse_feed(content: bytes) -> feedparser.FeedParserDict:
+    """Parse a downloaded feed body.
+
+    feedparser is given a stream over the raw bytes rather than decoded text:
+    it does its own encoding detection from the XML prolog and headers, and a
+    str argument would first be tried as a local filename and then re-encoded
+    to UTF-8, copying the whole feed again. BytesIO over an existing bytes
+    object shares its buffer, so the body is held only once.
+    """
+    return feedparser.parse(io.BytesIO(content))
+
+
+# Namespaces whose elements carry entry fields (RSS 2.0 has none)
+_FEED_NAMESPACES = frozenset((
+    "",
+    "http://www.w3.org/2005/Atom",
+    "http://purl.org/atom/ns#",
+    "http://purl.org/rss/1.0/",
+))
+
+
+def _feed_tag(tag: str) -> Optional[str]:
+    """Local name of a feed element, or None if it belongs to an extension namespace."""
+    if tag[0] != "{":
+        return tag
+    namespace, _, name = tag[1:].partition("}")
+    return name if namespace in _FEED_NAMESPACES else None
+
+
+# Bytes fetched to read a feed's title when validating it
+_FEED_PREFIX_BYTES = 16384
+
+# Root element of an RSS 2.0, Atom or RSS 1.0 (RDF) document
+_FEED_ROOT_RE = re.compile(rb"<(rss|feed|(?:[\w.-]+:)?RDF)\b")
+_FEED_SNIFF_BYTES = 1024
+
+
+def _sniff_feed(prefix: bytes) -> Optional[str]:
+    """
+    Identify a feed from the first bytes of the document.
+
+    Returns:
+        "rss", "feed" or "RDF" for the root element found, "" when the
+        document is not in an ASCII-compatible encoding and cannot be sniffed
+        bytewise (UTF-16/32), or None when no feed root appears in the first
+        _FEED_SNIFF_BYTES (e.g. an HTML page, or a feed with a long prolog)
+    """
+    head = prefix[:_FEED_SNIFF_BYTES]
+    if b"\x00" in head[:4]:
+        return ""
+    match = _FEED_ROOT_RE.search(head)
+    if match is None:
+        return None
+    return match.group(1).rpartition(b":")[2].decode()
+
+
+def _fast_feed_title(prefix: bytes) -> Optional[str]:
+    """
+    Read the channel title from the start of an RSS or Atom document.
+
+    Parsing stops at the title, so a truncated prefix of the feed is enough.
+    Returns None when the prefix is not a recognisable feed, the title is
+    missing or marked up, or the XML is not well-formed; callers then fall
+    back to parsing the whole feed with feedparser.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    path: list[Optional[str]] = []
+    try:
+        parser.feed(prefix)
+        for event, elem in parser.read_events():
+            name = _feed_tag(elem.tag)
+            if event == "start":
+                if not path and name not in ("rss", "feed", "RDF"):
+                    return None
+                if name in ("item", "entry"):
+                    return None
+                path.append(name)
+                continue
+            if name == "title" and path in (
+                ["rss", "channel", "title"], ["RDF", "channel", "title"], ["feed", "title"]
+            ):
+                if elem.get("type") in ("html", "xhtml") or len(elem):
+                    return None
+                return (elem.text or "").strip() or None
+            path.pop()
+    except ET.ParseError:
+        return None
+    return None
+
+
+def _parse_published(value: str, rfc822: bool) -> Optional[time.struct_time]:
+    """Parse an entry date into a UTC struct_time, like feedparser's published_parsed."""
+    try:
+        dt = parsedate_to_datetime(value) if rfc822 else datetime.fromisoformat(value)
+    except (TypeError, ValueError, IndexError):
+        # Unusual formats: defer to feedparser's much broader date parser
+        return _feedparser_parse_date(value)
+    return dt.utctimetuple()
+
+
+def _entry_from_element(elem: ET.Element) -> dict:
+    """Build a feedparser-shaped entry dict from an RSS <item> or Atom <entry>."""
+    entry: dict = {"enclosures": [], "links": []}
+    for child in elem:
+        name = _feed_tag(child.tag)
+        if name is None:
+            continue
+        text = (child.text or "").strip() or None
+
+        if name in ("guid", "id"):
+            entry.setdefault("id", text)
+        elif name == "title":
+            entry.setdefault("title", text)
+        elif name == "enclosure":
+            entry["enclosures"].append({"type": child.get("type", ""), "href": child.get("url")})
+        elif name == "link":
+            href = child.get("href")
+            if href is None:
+                # RSS <link>text</link>
+                entry.setdefault("link", text)
+                continue
+            link = {"type": child.get("type", ""), "href": href}
+            rel = child.get("rel", "alternate")
+            if rel == "enclosure":
+                entry["enclosures"].append(link)
+            else:
+                entry["links"].append(link)
+                if rel == "alternate":
+                    entry.setdefault("link", href)
+        elif name in ("pubDate", "published", "issued") and text and "published_parsed" not in entry:
+            entry["published_parsed"] = _parse_published(text, rfc822=name == "pubDate")
+    return entry
+
+
+def _fast_feed_entries(content: bytes, limit: int) -> Optional[list[dict]]:
+    """
+    Extract the first `limit` entries of an RSS or Atom feed with the C XML parser.
+
+    Only the fields subscriptions use are read, and parsing stops once
+    `limit` entries have been seen, so large feeds are neither fully parsed
+    nor HTML-sanitized as feedparser would. Returns None when the document is
+    not well-formed XML or has no entries; callers then fall back to
+    feedparser, which tolerates broken feeds.
+    """
+    root = _sniff_feed(content)
+    if not root:
+        return None
+    entry_tag = "entry" if root == "feed" else "item"
+
+    entries = []
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(content), events=("end",)):
+            if _feed_tag(elem.tag) != entry_tag:
+                continue
+            entries.append(_entry_from_element(elem))
+            elem.clear()
+            if len(entries) >= limit:
+                break
+    except ET.ParseError:
+        return None
+    return entries or None
+
+
+# yt-dlp CLI, looked up on PATH once per process
+_YT_DLP_PATH = shutil.which("yt-dlp")
+# Stream buffer limit for one yt-dlp JSON line (asyncio's default is 64 KiB)
+_YT_DLP_LINE_LIMIT = 1024 * 1024
+# Bytes of yt-dlp stderr kept for the error log; the rest is discarded
+_YT_DLP_STDERR_KEEP = 500
+
+
+async def _drain_head(stream: asyncio.StreamReader, size: int) -> bytes:
+    """Read a stream to EOF, keeping only its first `size` bytes."""
+    head = b""
+    while chunk := await stream.read(65536):
+        if len(head) < size:
+            head += chunk[:size - len(head)]
+    return head
+
+
+# YoutubeDL instances kept for in-process listings, one per concurrent
+# fetch allowed by the YouTube fetchers (MAX_CONCURRENT_FETCHES)
+_YOUTUBE_DL_POOL_SIZE = 4
+
+
+class _YoutubeDLPool:
+    """
+    A bounded pool of YoutubeDL instances for flat listings.
+
+    Building a YoutubeDL loads and compiles every extractor, so instances are
+    reused across listings. One is not thread-safe, and per-call options are
+    set on its params, so each is lent to a single thread at a time; callers
+    beyond `size` wait for one to be returned.
+    """
+
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+
+    @contextmanager
+    def borrow(self) -> Iterator["YoutubeDL"]:
+        """Lend an idle instance, building one if none is free."""
+        with self._slots:
+            try:
+                ydl = self._idle.get_nowait()
+            except queue.Empty:
+                ydl = YoutubeDL({
+                    "extract_flat": True,
+                    "quiet": True,
+                    "no_warnings": True,
+                    "skip_download": True,
+                })
+            try:
+                yield ydl
+            finally:
+                self._idle.put(ydl)
+
+
+@lru_cache(maxsize=1)
+def _youtube_dl_pool() -> _YoutubeDLPool:
+    """The process-wide YoutubeDL pool."""
+    return _YoutubeDLPool(_YOUTUBE_DL_POOL_SIZE)
+
+
+def _extract_flat(url: str, limit: int) -> tuple[dict, list[dict]]:
+    """
+    List up to `limit` entries of a channel or playlist with yt-dlp's Python API.
+
+    Returns:
+        Tuple of (playlist info, entry dicts)
+    """
+    with _youtube_dl_pool().borrow() as ydl:
+        ydl.params["playlistend"] = limit
+        info = ydl.extract_info(url, download=False) or {}
+        entries = [e for e in islice(info.get("entries") or (), limit) if isinstance(e, dict)]
+    return info, entries
+
+
+async def _list_playlist_entries(
+    yt_dlp_path: Optional[str], url: str, limit: int
+) -> Optional[list[dict]]:
+    """
+    Flat-list up to `limit` entries of a YouTube channel or playlist.
+
+    Runs yt-dlp in-process on a worker thread when the package is importable,
+    which avoids interpreter startup and a JSON round trip through a pipe per
+    call, and falls back to the yt-dlp CLI otherwise.
+
+    Returns:
+        Entry dicts, or None if the CLI failed
+    """
+    if YoutubeDL is not None:
+        _, entries = await asyncio.to_thread(_extract_flat, url, limit)
+        return entries
+
+    cmd = [
+        yt_dlp_path,
+        "--flat-playlist",
+        "--print-json",
+        "--playlist-end", str(limit),
+        url,
+    ]
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=_YT_DLP_LINE_LIMIT,
+    )
+
+    # Parse entries as yt-dlp emits them instead of buffering all output;
+    # stderr is drained concurrently so a chatty run cannot fill its pipe,
+    # and only its head is kept for the error log
+    stderr_task = asyncio.create_task(_drain_head(process.stderr, _YT_DLP_STDERR_KEEP))
+    entries = []
+    try:
+        async for line in process.stdout:
+            # Each entry is one JSON object; skip anything else without
+            # paying for a failed parse
+            if not line.startswith(b"{"):
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        stderr = await stderr_task
+        await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            stderr_task.cancel()
+            # Reap the killed child so it doesn't linger as a zombie
+            await process.wait()
+
+    if process.returncode != 0:
+        logger.error("yt-dlp error: %s", stderr.decode(errors="replace"))
+        return None
+
+    return entries
+
+
 class BaseFetcher(ABC):
     """Base class for subscription fetchers."""
 
+    # Upper bound on sources fetched at once by fetch_items_batch
+    MAX_CONCURRENT_FETCHES = 64
+
     @abstractmethod
     async def fetch_items(
         self,
@@ -48,11 +420,44 @@ class BaseFetcher(ABC):
         """
         pass
 
+    async def fetch_items_batch(
+        self,
+        sources: list[tuple[str, Optional[str], int]],
+    ) -> list[list[FetchedItem]]:
+        """
+        Fetch items from several sources concurrently.
+
+        Args:
+            sources: (source_url, source_id, limit) for each source
+
+        Returns:
+            Items for each source, in input order. A source that fails yields [].
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+
+        async def fetch_one(source_url: str, source_id: Optional[str], limit: int) -> list[FetchedItem]:
+            async with semaphore:
+                return await self.fetch_items(source_url, source_id=source_id, limit=limit)
+
+        results = await asyncio.gather(
+            *(fetch_one(*source) for source in sources), return_exceptions=True
+        )
+
+        batch = []
+        for (source_url, _, _), result in zip(sources, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to fetch %s: %s", source_url, result)
+                result = []
+            batch.append(result)
+        return batch
+
 
 class RSSFetcher(BaseFetcher):
     """Fetches items from RSS/Atom feeds (podcasts)."""
 
     ITUNES_LOOKUP_API = "https://itunes.apple.com/lookup"
+    # Podcast IDs resolved per iTunes lookup request
+    ITUNES_LOOKUP_BATCH = 100
 
     async def fetch_items(
         self,
@@ -61,37 +466,44 @@ class RSSFetcher(BaseFetcher):
         limit: int = 50,
     ) -> list[FetchedItem]:
         """Fetch episodes from an RSS feed."""
-        logger.info(f"Fetching RSS feed: {source_url}")
+        logger.info("Fetching RSS feed: %s", source_url)
 
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    source_url,
-                    timeout=60.0,
-                    follow_redirects=True,
-                )
-                resp.raise_for_status()
-                feed = feedparser.parse(resp.text)
+            headers = {}
+            cached = _feed_cache.get(source_url)
+            if cached is not None and cached.limit == limit:
+                if cached.etag:
+                    headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    headers["If-Modified-Since"] = cached.last_modified
+
+            client = get_feed_http_client()
+            resp = await client.get(source_url, headers=headers, timeout=60.0)
+            if resp.status_code == 304 and headers:
+                logger.info("RSS feed not modified, reusing %s items", len(cached.items))
+                return list(cached.items)
+            resp.raise_for_status()
+            entries = _fast_feed_entries(resp.content, limit)
+            if entries is None:
+                entries = _parse_feed(resp.content).entries[:limit]
 
             items = []
-            for entry in feed.entries[:limit]:
+            for entry in entries:
                 # Extract content ID (GUID or link)
                 content_id = entry.get("id") or entry.get("guid") or entry.get("link", "")
 
                 # Get audio URL from enclosures
                 content_url = self._get_audio_url(entry)
                 if not content_url:
-                    logger.debug(f"No audio URL found for entry: {entry.get('title', 'Unknown')}")
+                    logger.debug("No audio URL found for entry: %s", entry.get("title", "Unknown"))
                     continue
 
                 # Parse published date
                 published_at = None
-                if entry.get("published_parsed"):
-                    try:
-                        dt = datetime(*entry.published_parsed[:6])
-                        published_at = dt.isoformat()
-                    except Exception:
-                        pass
+                published_parsed = entry.get("published_parsed")
+                if published_parsed:
+                    # Same text as datetime(...).isoformat(), without building a datetime
+                    published_at = "%04d-%02d-%02dT%02d:%02d:%02d" % tuple(published_parsed[:6])
 
                 items.append(FetchedItem(
                     content_id=content_id,
@@ -100,11 +512,18 @@ class RSSFetcher(BaseFetcher):
                     published_at=published_at,
                 ))
 
-            logger.info(f"Found {len(items)} items in RSS feed")
-            return items
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if etag or last_modified:
+                _feed_cache[source_url] = _CachedFeed(etag, last_modified, limit, items)
+            else:
+                _feed_cache.pop(source_url, None)
+
+            logger.info("Found %s items in RSS feed", len(items))
+            return list(items)
 
         except Exception as e:
-            logger.error(f"Failed to fetch RSS feed: {e}")
+            logger.error("Failed to fetch RSS feed: %s", e)
             return []
 
     async def validate_source(self, source_url: str) -> tuple[bool, Optional[str], Optional[str]]:
@@ -118,81 +537,139 @@ class RSSFetcher(BaseFetcher):
 
         # Try to fetch and parse the RSS feed directly
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    source_url,
-                    timeout=30.0,
-                    follow_redirects=True,
-                )
+            client = get_feed_http_client()
+
+            # The title is near the top: read only a prefix of the feed
+            prefix = bytearray()
+            complete = True
+            async with client.stream(
+                "GET",
+                source_url,
+                headers={"Range": f"bytes=0-{_FEED_PREFIX_BYTES - 1}"},
+                timeout=30.0,
+            ) as resp:
                 resp.raise_for_status()
-                feed = feedparser.parse(resp.text)
+                async for chunk in resp.aiter_bytes():
+                    prefix += chunk
+                    if len(prefix) >= _FEED_PREFIX_BYTES:
+                        complete = False
+                        break
+                if resp.status_code == 206:
+                    # The range holds the whole feed if Content-Range says so,
+                    # or, without a total, if it ended short of the request
+                    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                    if total.isdigit():
+                        complete = int(total) <= len(prefix)
+                    else:
+                        complete = len(prefix) < _FEED_PREFIX_BYTES
+
+            # Without a feed root near the top (e.g. behind a long prolog),
+            # leave the decision to the full parse below
+            root = _sniff_feed(prefix)
+            feed_title = _fast_feed_title(bytes(prefix)) if root else None
+            if feed_title is not None:
+                return True, source_url, feed_title
+
+            # Fall back to parsing the whole feed
+            if complete:
+                content = bytes(prefix)
+            else:
+                resp = await client.get(source_url, timeout=30.0)
+                resp.raise_for_status()
+                content = resp.content
+            feed = _parse_feed(content)
 
-            if feed.bozo and not feed.entries:
-                logger.warning(f"Invalid RSS feed: {source_url}")
+            # feedparser reads HTML pages without complaint; when the sniff
+            # found no feed root, it must at least recognise a feed format
+            if (feed.bozo and not feed.entries) or (root is None and not feed.version):
+                logger.warning("Invalid RSS feed: %s", source_url)
                 return False, None, None
 
             feed_title = feed.feed.get("title", "Unknown Feed")
             return True, source_url, feed_title
 
         except Exception as e:
-            logger.error(f"Failed to validate RSS feed: {e}")
+            logger.error("Failed to validate RSS feed: %s", e)
             return False, None, None
 
     async def _apple_podcasts_to_rss(
         self, url: str
     ) -> tuple[Optional[str], Optional[str]]:
         """Convert Apple Podcasts URL to RSS feed URL."""
-        # Extract podcast ID
-        pattern = r"podcasts\.apple\.com/(?:\w+/)?podcast/[^/]+/id(\d+)"
-        match = re.search(pattern, url)
-        if not match:
-            return None, None
+        return (await self._apple_podcasts_to_rss_batch([url]))[0]
 
-        podcast_id = match.group(1)
+    async def _apple_podcasts_to_rss_batch(
+        self, urls: list[str]
+    ) -> list[tuple[Optional[str], Optional[str]]]:
+        """
+        Convert several Apple Podcasts URLs to RSS feed URLs.
 
-        try:
-            async with httpx.AsyncClient() as client:
+        Podcasts not already cached are resolved together, with one iTunes
+        lookup per ITUNES_LOOKUP_BATCH IDs.
+
+        Returns:
+            (feed_url, podcast_name) for each URL, in input order
+        """
+        # Extract podcast IDs
+        podcast_ids = []
+        for url in urls:
+            match = _APPLE_PODCAST_RE.search(url)
+            podcast_ids.append(match.group(1) if match else None)
+
+        missing = list(dict.fromkeys(
+            pid for pid in podcast_ids if pid and pid not in _itunes_cache
+        ))
+        found: dict[str, tuple[Optional[str], Optional[str]]] = {}
+
+        for i in range(0, len(missing), self.ITUNES_LOOKUP_BATCH):
+            batch = missing[i:i + self.ITUNES_LOOKUP_BATCH]
+            try:
+                client = get_feed_http_client()
                 resp = await client.get(
                     self.ITUNES_LOOKUP_API,
-                    params={"id": podcast_id, "entity": "podcast"},
+                    params={"id": ",".join(batch), "entity": "podcast"},
                     timeout=30.0,
                 )
                 resp.raise_for_status()
                 data = resp.json()
-
-            if data.get("resultCount", 0) == 0:
-                return None, None
-
-            result = data["results"][0]
-            feed_url = result.get("feedUrl")
-            podcast_name = result.get("collectionName", "Unknown Podcast")
-
-            return feed_url, podcast_name
-
-        except Exception as e:
-            logger.error(f"Failed to get RSS from Apple Podcasts: {e}")
-            return None, None
+            except Exception as e:
+                logger.error("Failed to get RSS from Apple Podcasts: %s", e)
+                continue
+
+            for result in data.get("results", []):
+                podcast_id = str(result.get("collectionId"))
+                feed_url = result.get("feedUrl")
+                podcast_name = result.get("collectionName", "Unknown Podcast")
+                found[podcast_id] = (feed_url, podcast_name)
+                if feed_url:
+                    _itunes_cache[podcast_id] = (feed_url, podcast_name)
+
+        return [
+            _itunes_cache.get(pid) or found.get(pid, (None, None)) if pid else (None, None)
+            for pid in podcast_ids
+        ]
 
     def _get_audio_url(self, entry: dict) -> Optional[str]:
         """Extract audio URL from feed entry."""
         # Check enclosures first
-        for enclosure in entry.get("enclosures", []):
-            if enclosure.get("type", "").startswith("audio/"):
-                return enclosure.get("href") or enclosure.get("url")
+        enclosures = entry.get("enclosures") or ()
+        audio = next((e for e in enclosures if e.get("type", "")[:6] == "audio/"), None)
+        if audio is not None:
+            return audio.get("href") or audio.get("url")
 
         # Check links
-        for link in entry.get("links", []):
-            if link.get("type", "").startswith("audio/"):
-                return link.get("href")
-
-        return None
+        links = entry.get("links") or ()
+        return next((link.get("href") for link in links if link.get("type", "")[:6] == "audio/"), None)
 
 
 class YouTubeChannelFetcher(BaseFetcher):
     """Fetches videos from a YouTube channel."""
 
+    # Each fetch runs a full yt-dlp extraction
+    MAX_CONCURRENT_FETCHES = 4
+
     def __init__(self):
-        self._yt_dlp_path = shutil.which("yt-dlp")
+        self._yt_dlp_path = _YT_DLP_PATH
 
     async def fetch_items(
         self,
@@ -201,7 +678,7 @@ class YouTubeChannelFetcher(BaseFetcher):
         limit: int = 50,
     ) -> list[FetchedItem]:
         """Fetch videos from a YouTube channel."""
-        if not self._yt_dlp_path:
+        if not self._yt_dlp_path and YoutubeDL is None:
             logger.error("yt-dlp not found")
             return []
 
@@ -216,85 +693,59 @@ class YouTubeChannelFetcher(BaseFetcher):
             else:
                 channel_url += "/videos"
 
-        logger.info(f"Fetching YouTube channel: {channel_url}")
+        logger.info("Fetching YouTube channel: %s", channel_url)
 
         try:
-            cmd = [
-                self._yt_dlp_path,
-                "--flat-playlist",
-                "--print-json",
-                "--playlist-end", str(limit),
-                channel_url,
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                logger.error(f"yt-dlp error: {stderr.decode()[:500]}")
+            entries = await _list_playlist_entries(self._yt_dlp_path, channel_url, limit)
+            if entries is None:
                 return []
 
             items = []
-            for line in stdout.decode().strip().split("\n"):
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    video_id = data.get("id")
-                    if not video_id:
-                        continue
-
-                    # Parse upload date
-                    published_at = None
-                    upload_date = data.get("upload_date")
-                    if upload_date and len(upload_date) == 8:
-                        try:
-                            dt = datetime.strptime(upload_date, "%Y%m%d")
-                            published_at = dt.isoformat()
-                        except ValueError:
-                            pass
-
-                    items.append(FetchedItem(
-                        content_id=video_id,
-                        content_url=f"https://www.youtube.com/watch?v={video_id}",
-                        title=data.get("title"),
-                        published_at=published_at,
-                    ))
-                except json.JSONDecodeError:
+            for data in entries:
+                video_id = data.get("id")
+                if not video_id:
                     continue
 
-            logger.info(f"Found {len(items)} videos in channel")
+                # Parse upload date
+                published_at = None
+                upload_date = data.get("upload_date")
+                if upload_date and len(upload_date) == 8 and upload_date.isdigit():
+                    # YYYYMMDD -> YYYY-MM-DDT00:00:00 by slicing, without strptime
+                    published_at = (
+                        f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}T00:00:00"
+                    )
+
+                items.append(FetchedItem(
+                    content_id=video_id,
+                    content_url=f"https://www.youtube.com/watch?v={video_id}",
+                    title=data.get("title"),
+                    published_at=published_at,
+                ))
+
+            logger.info("Found %s videos in channel", len(items))
             return items
 
         except Exception as e:
-            logger.error(f"Failed to fetch YouTube channel: {e}")
+            logger.error("Failed to fetch YouTube channel: %s", e)
             return []
 
     async def validate_source(self, source_url: str) -> tuple[bool, Optional[str], Optional[str]]:
         """Validate YouTube channel URL."""
-        if not self._yt_dlp_path:
+        if not self._yt_dlp_path and YoutubeDL is None:
             return False, None, None
 
         # Accept various YouTube channel URL formats
-        patterns = [
-            r"youtube\.com/channel/([a-zA-Z0-9_-]+)",
-            r"youtube\.com/@([a-zA-Z0-9_-]+)",
-            r"youtube\.com/c/([a-zA-Z0-9_-]+)",
-            r"youtube\.com/user/([a-zA-Z0-9_-]+)",
-        ]
-
-        for pattern in patterns:
-            if re.search(pattern, source_url):
-                break
-        else:
+        if not _YT_CHANNEL_RE.search(source_url):
             return False, None, None
 
         try:
+            if YoutubeDL is not None:
+                info, entries = await asyncio.to_thread(_extract_flat, source_url, 1)
+                channel_name = info.get("channel") or info.get("uploader")
+                if not channel_name and entries:
+                    channel_name = entries[0].get("channel")
+                return True, source_url, channel_name or "YouTube Channel"
+
             cmd = [
                 self._yt_dlp_path,
                 "--flat-playlist",
@@ -303,13 +754,14 @@ class YouTubeChannelFetcher(BaseFetcher):
                 source_url,
             ]
 
+            # Only the printed name is used, so stderr is not captured
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
 
-            stdout, stderr = await process.communicate()
+            stdout, _ = await process.communicate()
 
             if process.returncode != 0:
                 return False, None, None
@@ -318,15 +770,18 @@ class YouTubeChannelFetcher(BaseFetcher):
             return True, source_url, channel_name or "YouTube Channel"
 
         except Exception as e:
-            logger.error(f"Failed to validate YouTube channel: {e}")
+            logger.error("Failed to validate YouTube channel: %s", e)
             return False, None, None
 
 
 class YouTubePlaylistFetcher(BaseFetcher):
     """Fetches videos from a YouTube playlist."""
 
+    # Each fetch runs a full yt-dlp extraction
+    MAX_CONCURRENT_FETCHES = 4
+
     def __init__(self):
-        self._yt_dlp_path = shutil.which("yt-dlp")
+        self._yt_dlp_path = _YT_DLP_PATH
 
     async def fetch_items(
         self,
@@ -335,7 +790,7 @@ class YouTubePlaylistFetcher(BaseFetcher):
         limit: int = 50,
     ) -> list[FetchedItem]:
         """Fetch videos from a YouTube playlist."""
-        if not self._yt_dlp_path:
+        if not self._yt_dlp_path and YoutubeDL is None:
             logger.error("yt-dlp not found")
             return []
 
@@ -343,58 +798,36 @@ class YouTubePlaylistFetcher(BaseFetcher):
         if source_id:
             playlist_url = f"https://www.youtube.com/playlist?list={source_id}"
 
-        logger.info(f"Fetching YouTube playlist: {playlist_url}")
+        logger.info("Fetching YouTube playlist: %s", playlist_url)
 
         try:
-            cmd = [
-                self._yt_dlp_path,
-                "--flat-playlist",
-                "--print-json",
-                "--playlist-end", str(limit),
-                playlist_url,
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                logger.error(f"yt-dlp error: {stderr.decode()[:500]}")
+            entries = await _list_playlist_entries(self._yt_dlp_path, playlist_url, limit)
+            if entries is None:
                 return []
 
             items = []
-            for line in stdout.decode().strip().split("\n"):
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    video_id = data.get("id")
-                    if not video_id:
-                        continue
-
-                    items.append(FetchedItem(
-                        content_id=video_id,
-                        content_url=f"https://www.youtube.com/watch?v={video_id}",
-                        title=data.get("title"),
-                        published_at=None,  # Playlists don't always have dates
-                    ))
-                except json.JSONDecodeError:
+            for data in entries:
+                video_id = data.get("id")
+                if not video_id:
                     continue
 
-            logger.info(f"Found {len(items)} videos in playlist")
+                items.append(FetchedItem(
+                    content_id=video_id,
+                    content_url=f"https://www.youtube.com/watch?v={video_id}",
+                    title=data.get("title"),
+                    published_at=None,  # Playlists don't always have dates
+                ))
+
+            logger.info("Found %s videos in playlist", len(items))
             return items
 
         except Exception as e:
-            logger.error(f"Failed to fetch YouTube playlist: {e}")
+            logger.error("Failed to fetch YouTube playlist: %s", e)
             return []
 
     async def validate_source(self, source_url: str) -> tuple[bool, Optional[str], Optional[str]]:
         """Validate YouTube playlist URL."""
-        if not self._yt_dlp_path:
+        if not self._yt_dlp_path and YoutubeDL is None:
             return False, None, None
 
         # Check URL pattern
@@ -402,13 +835,17 @@ class YouTubePlaylistFetcher(BaseFetcher):
             return False, None, None
 
         # Extract playlist ID
-        match = re.search(r"list=([a-zA-Z0-9_-]+)", source_url)
+        match = _YT_LIST_RE.search(source_url)
         if not match:
             return False, None, None
 
         playlist_id = match.group(1)
 
         try:
+            if YoutubeDL is not None:
+                info, _ = await asyncio.to_thread(_extract_flat, source_url, 1)
+                return True, playlist_id, info.get("title") or "YouTube Playlist"
+
             cmd = [
                 self._yt_dlp_path,
                 "--flat-playlist",
@@ -417,13 +854,14 @@ class YouTubePlaylistFetcher(BaseFetcher):
                 source_url,
             ]
 
+            # Only the printed name is used, so stderr is not captured
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
 
-            stdout, stderr = await process.communicate()
+            stdout, _ = await process.communicate()
 
             if process.returncode != 0:
                 return False, None, None
@@ -432,12 +870,13 @@ class YouTubePlaylistFetcher(BaseFetcher):
             return True, playlist_id, playlist_title or "YouTube Playlist"
 
         except Exception as e:
-            logger.error(f"Failed to validate YouTube playlist: {e}")
+            logger.error("Failed to validate YouTube playlist: %s", e)
             return False, None, None
 
 
+@lru_cache(maxsize=None)
 def get_fetcher(subscription_type: str) -> BaseFetcher:
-    """Get the appropriate fetcher for a subscription type."""
+    """Get the shared fetcher for a subscription type (fetchers are stateless)."""
     fetchers = {
         "rss": RSSFetcher,
         "youtube_channel": YouTubeChannelFetcher,
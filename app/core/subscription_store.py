@@ -3,13 +3,74 @@
 import json
 import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
+# Executed SQL, logged at DEBUG when this logger is enabled at connect time
+sql_logger = logging.getLogger(f"{__name__}.sql")
+
+# Settings applied to every connection (none of these persist in the file).
+# In WAL mode, synchronous=NORMAL only syncs at checkpoints: the database
+# cannot be corrupted, but a power loss may roll back the last commits.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA journal_size_limit = 67108864",
+    "PRAGMA wal_autocheckpoint = 1000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+)
+_CONNECTION_SCRIPT = ";\n".join(_CONNECTION_PRAGMAS) + ";"
+
+# list_subscriptions queries keyed by (enabled_only, platform filtered)
+_LIST_SUBSCRIPTIONS = {
+    (False, False): "SELECT * FROM subscriptions ORDER BY created_at DESC",
+    (True, False): "SELECT * FROM subscriptions WHERE enabled = 1 ORDER BY created_at DESC",
+    (False, True): "SELECT * FROM subscriptions WHERE platform = ? ORDER BY created_at DESC",
+    (True, True): (
+        "SELECT * FROM subscriptions WHERE enabled = 1 AND platform = ?"
+        " ORDER BY created_at DESC"
+    ),
+}
+
+# Fixed item queries, built once rather than per call
+_LIST_ITEMS_ALL = (
+    "SELECT * FROM subscription_items WHERE subscription_id = ?"
+    " ORDER BY published_at DESC, discovered_at DESC LIMIT ? OFFSET ?"
+)
+_LIST_ITEMS_BY_STATUS = (
+    "SELECT * FROM subscription_items WHERE subscription_id = ? AND status = ?"
+    " ORDER BY published_at DESC, discovered_at DESC LIMIT ? OFFSET ?"
+)
+# The worker only needs these columns from pending items; together with
+# status they are all in idx_items_pending_covering, so the read never
+# touches the table
+_LIST_PENDING_ITEMS = (
+    "SELECT id, subscription_id, content_id, content_url, title, published_at"
+    " FROM subscription_items WHERE subscription_id = ? AND status = 'pending'"
+    " ORDER BY published_at DESC, discovered_at DESC LIMIT ?"
+)
+_COUNT_ITEMS_ALL = "SELECT COUNT(*) FROM subscription_items WHERE subscription_id = ?"
+_COUNT_ITEMS_BY_STATUS = (
+    "SELECT COUNT(*) FROM subscription_items WHERE subscription_id = ? AND status = ?"
+)
+
+
+def _now_iso() -> str:
+    """Current UTC time as a naive ISO-8601 string, the format of all stored timestamps."""
+    return datetime.utcnow().isoformat()
+
+
+# UPDATE/INSERT ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 class SubscriptionType(str, Enum):
@@ -35,7 +96,15 @@ class SubscriptionItemStatus(str, Enum):
 
 
 class SubscriptionStore:
-    """SQLite-based persistent subscription storage."""
+    """SQLite-based persistent subscription storage.
+
+    Subscriptions by ID and items by (subscription_id, content_id) are cached
+    in memory and kept current by this store's own writes. Changes made to
+    the database file by other processes are not seen until evicted.
+    """
+
+    SUBSCRIPTION_CACHE_SIZE = 1024
+    ITEM_CACHE_SIZE = 4096
 
     def __init__(self, db_path: Optional[Path] = None):
         if db_path:
@@ -45,20 +114,78 @@ class SubscriptionStore:
             settings = get_settings()
             self.db_path = Path(settings.download_dir) / "subscriptions.db"
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0  # Nesting of _get_conn blocks on the lock-holding thread
+        self._subscription_cache: LRUCache = LRUCache(maxsize=self.SUBSCRIPTION_CACHE_SIZE)
+        self._item_cache: LRUCache = LRUCache(maxsize=self.ITEM_CACHE_SIZE)
+        self._conn = self._connect()
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the store's connection, shared by all threads under its lock."""
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # Write-ahead logging persists in the file; readers then no longer
+        # block on the poller's and downloader's writes
+        conn.executescript("PRAGMA journal_mode = WAL;\n" + _CONNECTION_SCRIPT)
+        # Tracing costs a callback per statement, so it is only installed
+        # when SQL debug logging is on
+        if sql_logger.isEnabledFor(logging.DEBUG):
+            conn.set_trace_callback(lambda sql: sql_logger.debug("%s", sql))
+        return conn
+
     @contextmanager
     def _get_conn(self):
-        """Get database connection with context manager."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        # Enable foreign keys
-        conn.execute("PRAGMA foreign_keys = ON")
-        try:
-            yield conn
-            conn.commit()
-        finally:
-            conn.close()
+        """
+        Use the shared connection; commits on success, rolls back on error.
+
+        Nested blocks join the outermost one, which alone commits or rolls back.
+        """
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if not self._depth:
+                    self._conn.rollback()
+                    # Writes in the block may have been cached already
+                    self._subscription_cache.clear()
+                    self._item_cache.clear()
+                raise
+            self._depth -= 1
+            if not self._depth:
+                self._conn.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SubscriptionStore"]:
+        """
+        Group several store calls into one transaction and one commit.
+
+        Other threads wait on the store until the block ends, so keep it
+        short; in async code, do not await inside it.
+        """
+        with self._get_conn():
+            yield self
+
+    def checkpoint(self) -> bool:
+        """
+        Copy the write-ahead log into the database and truncate it.
+
+        Meant for idle moments such as the end of a poll cycle, so the WAL
+        file does not grow between automatic checkpoints.
+
+        Returns:
+            True if the checkpoint completed, False if readers blocked it
+        """
+        with self._get_conn() as conn:
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return busy == 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
 
     def _init_db(self):
         """Initialize database schema."""
@@ -122,6 +249,34 @@ class SubscriptionStore:
                 "CREATE INDEX IF NOT EXISTS idx_items_status "
                 "ON subscription_items(status)"
             )
+            # Stamp updated_at on updates that don't set it themselves, in
+            # the same microsecond ISO format as _now_iso() (%f is SS.SSS)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_subscriptions_updated_at
+                AFTER UPDATE ON subscriptions
+                FOR EACH ROW WHEN OLD.updated_at IS NEW.updated_at
+                BEGIN
+                    UPDATE subscriptions
+                    SET updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now') || '000'
+                    WHERE id = NEW.id;
+                END
+            """)
+
+            # Partial indexes matching the scheduler's pending-items query and
+            # completed-item pruning, including their ORDER BY. The pending
+            # index also carries every column _LIST_PENDING_ITEMS reads.
+            conn.execute("DROP INDEX IF EXISTS idx_items_pending")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_items_pending_covering "
+                "ON subscription_items(subscription_id, published_at DESC, discovered_at DESC, "
+                "id, content_id, content_url, title, status) "
+                "WHERE status = 'pending'"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_items_completed "
+                "ON subscription_items(subscription_id, downloaded_at) "
+                "WHERE status = 'completed'"
+            )
 
     # ============ Subscription CRUD ============
 
@@ -142,10 +297,10 @@ class SubscriptionStore:
         output_dir: Optional[str] = None,
     ) -> dict:
         """Create a new subscription."""
-        now = datetime.utcnow().isoformat()
+        now = _now_iso()
 
         with self._get_conn() as conn:
-            conn.execute("""
+            row = self._write_returning(conn, "subscriptions", """
                 INSERT INTO subscriptions (
                     id, name, subscription_type, source_url, source_id, platform,
                     enabled, auto_transcribe, transcribe_model, transcribe_language,
@@ -153,25 +308,30 @@ class SubscriptionStore:
                     created_at, updated_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                subscription_id, name, subscription_type.value, source_url, source_id,
-                platform.value, 1, int(auto_transcribe), transcribe_model,
+                subscription_id, name, subscription_type, source_url, source_id,
+                platform, 1, auto_transcribe, transcribe_model,
                 transcribe_language, download_limit, output_format, quality,
                 output_dir, now, now
-            ))
+            ), subscription_id)
+            sub = self._row_to_subscription_dict(row)
+            self._subscription_cache[subscription_id] = sub
 
-        logger.info(f"Created subscription {subscription_id} ({name})")
-        return self.get_subscription(subscription_id)
+        logger.info("Created subscription %s (%s)", subscription_id, name)
+        return dict(sub)
 
     def get_subscription(self, subscription_id: str) -> Optional[dict]:
         """Get subscription by ID."""
         with self._get_conn() as conn:
-            row = conn.execute(
-                "SELECT * FROM subscriptions WHERE id = ?", (subscription_id,)
-            ).fetchone()
-
-            if row:
-                return self._row_to_subscription_dict(row)
-        return None
+            sub = self._subscription_cache.get(subscription_id)
+            if sub is None:
+                row = conn.execute(
+                    "SELECT * FROM subscriptions WHERE id = ?", (subscription_id,)
+                ).fetchone()
+                if not row:
+                    return None
+                sub = self._row_to_subscription_dict(row)
+                self._subscription_cache[subscription_id] = sub
+            return dict(sub)
 
     def list_subscriptions(
         self,
@@ -179,47 +339,34 @@ class SubscriptionStore:
         platform: Optional[SubscriptionPlatform] = None,
     ) -> list[dict]:
         """List all subscriptions with optional filtering."""
-        query = "SELECT * FROM subscriptions WHERE 1=1"
-        params = []
-
-        if enabled_only:
-            query += " AND enabled = 1"
-
-        if platform:
-            query += " AND platform = ?"
-            params.append(platform.value)
-
-        query += " ORDER BY created_at DESC"
+        query = _LIST_SUBSCRIPTIONS[bool(enabled_only), bool(platform)]
+        params = (platform,) if platform else ()
 
         with self._get_conn() as conn:
-            rows = conn.execute(query, params).fetchall()
-            return [self._row_to_subscription_dict(row) for row in rows]
+            return [self._row_to_subscription_dict(row) for row in conn.execute(query, params)]
 
     def update_subscription(self, subscription_id: str, **kwargs) -> Optional[dict]:
         """Update subscription fields."""
-        kwargs["updated_at"] = datetime.utcnow().isoformat()
-
-        # Convert boolean fields to int
-        for bool_field in ["enabled", "auto_transcribe"]:
-            if bool_field in kwargs:
-                kwargs[bool_field] = int(kwargs[bool_field])
-
-        # Convert enum fields to value
-        if "subscription_type" in kwargs and isinstance(kwargs["subscription_type"], SubscriptionType):
-            kwargs["subscription_type"] = kwargs["subscription_type"].value
-        if "platform" in kwargs and isinstance(kwargs["platform"], SubscriptionPlatform):
-            kwargs["platform"] = kwargs["platform"].value
+        # Set here rather than by the trigger so RETURNING reports it
+        kwargs["updated_at"] = _now_iso()
 
+        # No conversions needed: sqlite3 binds bools as integers and the
+        # str-based enums as their text values
         set_clause = ", ".join(f"{k} = ?" for k in kwargs.keys())
         values = list(kwargs.values()) + [subscription_id]
 
         with self._get_conn() as conn:
-            conn.execute(
+            row = self._write_returning(
+                conn, "subscriptions",
                 f"UPDATE subscriptions SET {set_clause} WHERE id = ?",
-                values
+                values, subscription_id,
             )
+            if not row:
+                return None
+            sub = self._row_to_subscription_dict(row)
+            self._subscription_cache[subscription_id] = sub
 
-        return self.get_subscription(subscription_id)
+        return dict(sub)
 
     def delete_subscription(self, subscription_id: str) -> bool:
         """Delete a subscription and all its items."""
@@ -227,37 +374,41 @@ class SubscriptionStore:
             cursor = conn.execute(
                 "DELETE FROM subscriptions WHERE id = ?", (subscription_id,)
             )
+            # Items were removed by the cascade as well
+            self._subscription_cache.pop(subscription_id, None)
+            for key in [k for k in self._item_cache if k[0] == subscription_id]:
+                del self._item_cache[key]
             deleted = cursor.rowcount > 0
             if deleted:
-                logger.info(f"Deleted subscription {subscription_id}")
+                logger.info("Deleted subscription %s", subscription_id)
             return deleted
 
     def set_last_checked(self, subscription_id: str) -> None:
         """Update last_checked_at timestamp."""
-        now = datetime.utcnow().isoformat()
         with self._get_conn() as conn:
             conn.execute(
-                "UPDATE subscriptions SET last_checked_at = ?, updated_at = ? WHERE id = ?",
-                (now, now, subscription_id)
+                "UPDATE subscriptions SET last_checked_at = ? WHERE id = ?",
+                (_now_iso(), subscription_id)
             )
+            self._subscription_cache.pop(subscription_id, None)
 
     def set_last_new_content(self, subscription_id: str) -> None:
         """Update last_new_content_at timestamp."""
-        now = datetime.utcnow().isoformat()
         with self._get_conn() as conn:
             conn.execute(
-                "UPDATE subscriptions SET last_new_content_at = ?, updated_at = ? WHERE id = ?",
-                (now, now, subscription_id)
+                "UPDATE subscriptions SET last_new_content_at = ? WHERE id = ?",
+                (_now_iso(), subscription_id)
             )
+            self._subscription_cache.pop(subscription_id, None)
 
     def increment_total_downloaded(self, subscription_id: str) -> None:
         """Increment total_downloaded counter."""
-        now = datetime.utcnow().isoformat()
         with self._get_conn() as conn:
             conn.execute(
-                "UPDATE subscriptions SET total_downloaded = total_downloaded + 1, updated_at = ? WHERE id = ?",
-                (now, subscription_id)
+                "UPDATE subscriptions SET total_downloaded = total_downloaded + 1 WHERE id = ?",
+                (subscription_id,)
             )
+            self._subscription_cache.pop(subscription_id, None)
 
     # ============ Subscription Item CRUD ============
 
@@ -271,49 +422,116 @@ class SubscriptionStore:
         published_at: Optional[str] = None,
     ) -> Optional[dict]:
         """Create a new subscription item."""
-        now = datetime.utcnow().isoformat()
-
-        try:
-            with self._get_conn() as conn:
-                conn.execute("""
-                    INSERT INTO subscription_items (
-                        id, subscription_id, content_id, content_url, title,
-                        published_at, status, discovered_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    item_id, subscription_id, content_id, content_url, title,
-                    published_at, SubscriptionItemStatus.PENDING.value, now
-                ))
-            return self.get_item(item_id)
-        except sqlite3.IntegrityError:
-            # Duplicate item (subscription_id, content_id)
-            logger.debug(f"Item already exists: {subscription_id}/{content_id}")
-            return None
+        now = _now_iso()
+
+        with self._get_conn() as conn:
+            # A known (subscription_id, content_id) is skipped rather than
+            # raising, so re-polled items cost no failed transaction
+            row = self._write_returning(conn, "subscription_items", """
+                INSERT OR IGNORE INTO subscription_items (
+                    id, subscription_id, content_id, content_url, title,
+                    published_at, status, discovered_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                item_id, subscription_id, content_id, content_url, title,
+                published_at, SubscriptionItemStatus.PENDING, now
+            ), item_id)
+            if row is None:
+                logger.debug("Item already exists: %s/%s", subscription_id, content_id)
+                return None
+            item = self._row_to_item_dict(row)
+            self._item_cache[(subscription_id, content_id)] = item
+        return dict(item)
+
+    def create_items_bulk(self, subscription_id: str, items: list[dict]) -> list[dict]:
+        """
+        Create many subscription items in one transaction.
+
+        Args:
+            subscription_id: Subscription the items belong to
+            items: Dicts with item_id, content_id, content_url and optional
+                title and published_at, as for create_item
+
+        Returns:
+            The items that were created, in input order; items whose content
+            ID already exists for the subscription are skipped
+        """
+        if not items:
+            return []
+
+        now = _now_iso()
+        rows = [
+            (
+                item["item_id"], subscription_id, item["content_id"], item["content_url"],
+                item.get("title"), item.get("published_at"),
+                SubscriptionItemStatus.PENDING, now,
+            )
+            for item in items
+        ]
+        item_ids = [row[0] for row in rows]
+
+        with self._get_conn() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO subscription_items (
+                    id, subscription_id, content_id, content_url, title,
+                    published_at, status, discovered_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            created = {
+                row["id"]: self._row_to_item_dict(row)
+                for row in conn.execute(
+                    f"SELECT * FROM subscription_items WHERE id IN ({', '.join('?' * len(item_ids))})",
+                    item_ids,
+                )
+            }
+            for item in created.values():
+                self._item_cache[(subscription_id, item["content_id"])] = item
+
+        return [dict(created[item_id]) for item_id in item_ids if item_id in created]
+
+    def get_existing_content_ids(self, subscription_id: str, content_ids: list[str]) -> set[str]:
+        """Return which of the given content IDs already have items for a subscription."""
+        if not content_ids:
+            return set()
+
+        with self._get_conn() as conn:
+            return {
+                row[0] for row in conn.execute(
+                    "SELECT content_id FROM subscription_items "
+                    f"WHERE subscription_id = ? AND content_id IN ({', '.join('?' * len(content_ids))})",
+                    [subscription_id, *content_ids],
+                )
+            }
 
     def get_item(self, item_id: str) -> Optional[dict]:
         """Get item by ID."""
+        row = self._get_item_row(item_id)
+        return self._row_to_item_dict(row) if row else None
+
+    def _get_item_row(self, item_id: str) -> Optional[sqlite3.Row]:
+        """Get the raw row of an item, for internal reads of a few columns."""
         with self._get_conn() as conn:
-            row = conn.execute(
+            return conn.execute(
                 "SELECT * FROM subscription_items WHERE id = ?", (item_id,)
             ).fetchone()
 
-            if row:
-                return self._row_to_item_dict(row)
-        return None
-
     def get_item_by_content_id(
         self, subscription_id: str, content_id: str
     ) -> Optional[dict]:
         """Get item by subscription and content ID."""
+        key = (subscription_id, content_id)
         with self._get_conn() as conn:
-            row = conn.execute(
-                "SELECT * FROM subscription_items WHERE subscription_id = ? AND content_id = ?",
-                (subscription_id, content_id)
-            ).fetchone()
-
-            if row:
-                return self._row_to_item_dict(row)
-        return None
+            item = self._item_cache.get(key)
+            if item is None:
+                row = conn.execute(
+                    "SELECT * FROM subscription_items WHERE subscription_id = ? AND content_id = ?",
+                    key
+                ).fetchone()
+                if not row:
+                    return None
+                item = self._row_to_item_dict(row)
+                self._item_cache[key] = item
+            return dict(item)
 
     def list_items(
         self,
@@ -323,44 +541,45 @@ class SubscriptionStore:
         offset: int = 0,
     ) -> list[dict]:
         """List items for a subscription."""
-        query = "SELECT * FROM subscription_items WHERE subscription_id = ?"
-        params = [subscription_id]
-
         if status:
-            query += " AND status = ?"
-            params.append(status.value)
-
-        query += " ORDER BY published_at DESC, discovered_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+            query = _LIST_ITEMS_BY_STATUS
+            params = (subscription_id, status, limit, offset)
+        else:
+            query = _LIST_ITEMS_ALL
+            params = (subscription_id, limit, offset)
 
         with self._get_conn() as conn:
-            rows = conn.execute(query, params).fetchall()
-            return [self._row_to_item_dict(row) for row in rows]
+            return [self._row_to_item_dict(row) for row in conn.execute(query, params)]
 
     def get_pending_items(self, subscription_id: str, limit: int = 10) -> list[dict]:
-        """Get pending items for a subscription, ordered by publish date."""
-        return self.list_items(
-            subscription_id,
-            status=SubscriptionItemStatus.PENDING,
-            limit=limit,
-        )
+        """Get pending items for a subscription, ordered by publish date.
+
+        Only id, subscription_id, content_id, content_url, title and
+        published_at are returned; use get_item for the full row.
+        """
+        with self._get_conn() as conn:
+            return [dict(row) for row in conn.execute(_LIST_PENDING_ITEMS, (subscription_id, limit))]
 
     def update_item(self, item_id: str, **kwargs) -> Optional[dict]:
         """Update item fields."""
-        # Convert enum fields to value
-        if "status" in kwargs and isinstance(kwargs["status"], SubscriptionItemStatus):
-            kwargs["status"] = kwargs["status"].value
-
         set_clause = ", ".join(f"{k} = ?" for k in kwargs.keys())
         values = list(kwargs.values()) + [item_id]
 
         with self._get_conn() as conn:
-            conn.execute(
+            row = self._write_returning(
+                conn, "subscription_items",
                 f"UPDATE subscription_items SET {set_clause} WHERE id = ?",
-                values
+                values, item_id,
             )
+            if not row:
+                return None
+            if "subscription_id" in kwargs or "content_id" in kwargs:
+                # The old cache key is unknown; start over
+                self._item_cache.clear()
+            item = self._row_to_item_dict(row)
+            self._item_cache[(item["subscription_id"], item["content_id"])] = item
 
-        return self.get_item(item_id)
+        return dict(item)
 
     def set_item_status(
         self,
@@ -372,7 +591,7 @@ class SubscriptionStore:
         transcription_path: Optional[str] = None,
     ) -> Optional[dict]:
         """Update item status."""
-        updates = {"status": status.value}
+        updates = {"status": status}
 
         if error is not None:
             updates["error"] = error
@@ -383,17 +602,63 @@ class SubscriptionStore:
         if transcription_path is not None:
             updates["transcription_path"] = transcription_path
         if status == SubscriptionItemStatus.COMPLETED:
-            updates["downloaded_at"] = datetime.utcnow().isoformat()
+            updates["downloaded_at"] = _now_iso()
 
         return self.update_item(item_id, **updates)
 
+    def mark_item_completed(
+        self,
+        item_id: str,
+        file_path: Optional[str] = None,
+        transcription_path: Optional[str] = None,
+        job_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Mark an item completed and bump its subscription's download count.
+
+        Both updates share one transaction, so a completed item is never
+        left uncounted.
+        """
+        updates = {"status": SubscriptionItemStatus.COMPLETED, "downloaded_at": _now_iso()}
+        if file_path is not None:
+            updates["file_path"] = file_path
+        if transcription_path is not None:
+            updates["transcription_path"] = transcription_path
+        if job_id is not None:
+            updates["job_id"] = job_id
+
+        set_clause = ", ".join(f"{k} = ?" for k in updates)
+        values = list(updates.values()) + [item_id]
+
+        with self._get_conn() as conn:
+            row = self._write_returning(
+                conn, "subscription_items",
+                f"UPDATE subscription_items SET {set_clause} WHERE id = ?",
+                values, item_id,
+            )
+            if not row:
+                return None
+            item = self._row_to_item_dict(row)
+            conn.execute(
+                "UPDATE subscriptions SET total_downloaded = total_downloaded + 1 WHERE id = ?",
+                (item["subscription_id"],)
+            )
+            self._subscription_cache.pop(item["subscription_id"], None)
+            self._item_cache[(item["subscription_id"], item["content_id"])] = item
+
+        return dict(item)
+
     def delete_item(self, item_id: str) -> bool:
         """Delete an item."""
         with self._get_conn() as conn:
-            cursor = conn.execute(
-                "DELETE FROM subscription_items WHERE id = ?", (item_id,)
-            )
-            return cursor.rowcount > 0
+            row = conn.execute(
+                "SELECT subscription_id, content_id FROM subscription_items WHERE id = ?",
+                (item_id,)
+            ).fetchone()
+            if not row:
+                return False
+            conn.execute("DELETE FROM subscription_items WHERE id = ?", (item_id,))
+            self._item_cache.pop(tuple(row), None)
+            return True
 
     def count_items(
         self,
@@ -401,35 +666,61 @@ class SubscriptionStore:
         status: Optional[SubscriptionItemStatus] = None,
     ) -> int:
         """Count items for a subscription."""
-        query = "SELECT COUNT(*) FROM subscription_items WHERE subscription_id = ?"
-        params = [subscription_id]
-
         if status:
-            query += " AND status = ?"
-            params.append(status.value)
+            query = _COUNT_ITEMS_BY_STATUS
+            params = (subscription_id, status)
+        else:
+            query = _COUNT_ITEMS_ALL
+            params = (subscription_id,)
 
         with self._get_conn() as conn:
             return conn.execute(query, params).fetchone()[0]
 
-    def get_oldest_completed_items(
-        self, subscription_id: str, limit: int
-    ) -> list[dict]:
-        """Get oldest completed items (for cleanup when limit exceeded)."""
-        query = """
-            SELECT * FROM subscription_items
+    def prune_completed_items(self, subscription_id: str, keep_last: int) -> list[dict]:
+        """
+        Delete all but the `keep_last` most recently downloaded completed items.
+
+        Returns:
+            The deleted items, so callers can remove their files
+        """
+        select = """
+            SELECT id FROM subscription_items
             WHERE subscription_id = ? AND status = ?
-            ORDER BY downloaded_at ASC
-            LIMIT ?
+            ORDER BY downloaded_at DESC
+            LIMIT -1 OFFSET ?
         """
+        params = (subscription_id, SubscriptionItemStatus.COMPLETED, max(keep_last, 0))
+
         with self._get_conn() as conn:
-            rows = conn.execute(
-                query,
-                (subscription_id, SubscriptionItemStatus.COMPLETED.value, limit)
-            ).fetchall()
-            return [self._row_to_item_dict(row) for row in rows]
+            if _HAS_RETURNING:
+                rows = conn.execute(
+                    f"DELETE FROM subscription_items WHERE id IN ({select}) RETURNING *", params
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT * FROM subscription_items WHERE id IN ({select})", params
+                ).fetchall()
+                conn.executemany(
+                    "DELETE FROM subscription_items WHERE id = ?", [(row["id"],) for row in rows]
+                )
+            for row in rows:
+                self._item_cache.pop((subscription_id, row["content_id"]), None)
+
+        return [self._row_to_item_dict(row) for row in rows]
 
     # ============ Helper Methods ============
 
+    def _write_returning(
+        self, conn: sqlite3.Connection, table: str, sql: str, params, row_id: str
+    ) -> Optional[sqlite3.Row]:
+        """Run an INSERT or UPDATE of one row and return the row as written."""
+        if _HAS_RETURNING:
+            rows = conn.execute(f"{sql} RETURNING *", params).fetchall()
+            return rows[0] if rows else None
+        if conn.execute(sql, params).rowcount == 0:
+            return None
+        return conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,)).fetchone()
+
     def _row_to_subscription_dict(self, row: sqlite3.Row) -> dict:
         """Convert database row to subscription dictionary."""
         d = dict(row)
@@ -445,11 +736,26 @@ class SubscriptionStore:
 
 # Global instance
 _subscription_store: Optional[SubscriptionStore] = None
+_subscription_store_lock = threading.Lock()
 
 
 def get_subscription_store() -> SubscriptionStore:
     """Get or create the global subscription store instance."""
     global _subscription_store
-    if _subscription_store is None:
-        _subscription_store = SubscriptionStore()
-    return _subscription_store
+    store = _subscription_store
+    if store is None:
+        # Threads racing on first use must not each open a store
+        with _subscription_store_lock:
+            if _subscription_store is None:
+                _subscription_store = SubscriptionStore()
+            store = _subscription_store
+    return store
+
+
+def close_subscription_store() -> None:
+    """Close the global subscription store (called on app shutdown)."""
+    global _subscription_store
+    with _subscription_store_lock:
+        if _subscription_store is not None:
+            _subscription_store.close()
+            _subscription_store = None
@@ -2,15 +2,19 @@
 
 import asyncio
 import logging
+import os
+import re
+import shutil
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import httpx
-import re
 
 from ..config import get_settings
+from .converter import AudioConverter
+from .exceptions import FFmpegError
 from .subscription_store import (
     get_subscription_store,
     SubscriptionStore,
@@ -18,20 +22,68 @@ from .subscription_store import (
 )
 from .subscription_fetcher import get_fetcher
 from .downloader import DownloaderFactory
+from .transcriber import AudioTranscriber
+
+logger = logging.getLogger(__name__)
+
+# Shared by episode downloads and webhook notifications, so repeated
+# requests to the same CDN or webhook host reuse pooled connections.
+# Idle connections are kept as long as nginx-style CDNs keep them (75s).
+_DOWNLOAD_HTTP_LIMITS = httpx.Limits(
+    max_connections=128, max_keepalive_connections=64, keepalive_expiry=75.0
+)
+_DOWNLOAD_HTTP_TIMEOUT = httpx.Timeout(connect=10.0, read=300.0, write=30.0, pool=10.0)
+_download_http_client: Optional[httpx.AsyncClient] = None
+# Episodes run to hundreds of MB; large chunks keep the number of
+# awaits and file writes per download low
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def get_download_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for subscription downloads."""
+    global _download_http_client
+    if _download_http_client is None or _download_http_client.is_closed:
+        _download_http_client = httpx.AsyncClient(
+            # Retries cover connection failures such as CDN resets
+            transport=httpx.AsyncHTTPTransport(retries=2, limits=_DOWNLOAD_HTTP_LIMITS),
+            timeout=_DOWNLOAD_HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _download_http_client
+
+
+async def close_download_http_client() -> None:
+    """Close the shared download HTTP client (called when the worker stops)."""
+    global _download_http_client
+    if _download_http_client is not None:
+        await _download_http_client.aclose()
+        _download_http_client = None
+
+
+_AUDIO_EXTENSIONS = frozenset({'.mp3', '.m4a', '.aac', '.ogg', '.wav', '.flac', '.opus'})
+# Inputs FFmpeg can decode from a pipe; MP4/M4A may need to seek to the index
+_PIPEABLE_EXTENSIONS = frozenset({'.mp3', '.aac', '.ogg', '.opus', '.flac', '.wav'})
+_UNSAFE_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_EXTENSION = re.compile(r'\.[^.]+$')
+
+
+def _audio_extension(url: str) -> Optional[str]:
+    """Get the audio file extension of a URL's path, if it has one."""
+    path = url.partition('?')[0]
+    ext = path[path.rfind('.'):].lower()
+    return ext if ext in _AUDIO_EXTENSIONS else None
 
 
 def _is_direct_audio_url(url: str) -> bool:
     """Check if URL is a direct audio file link."""
-    audio_extensions = ('.mp3', '.m4a', '.aac', '.ogg', '.wav', '.flac', '.opus')
-    # Check URL path for audio extension
-    path = url.split('?')[0].lower()
-    return any(path.endswith(ext) for ext in audio_extensions)
+    return _audio_extension(url) is not None
 
 
 def _sanitize_filename(name: str) -> str:
     """Sanitize a string for use as a filename."""
-    sanitized = re.sub(r'[<>:"/\\|?*]', '', name)
-    sanitized = re.sub(r'\s+', '_', sanitized)
+    sanitized = _UNSAFE_FILENAME_CHARS.sub('', name)
+    sanitized = _WHITESPACE.sub('_', sanitized)
     return sanitized[:100]
 
 
@@ -40,8 +92,9 @@ async def _download_direct_audio(
     output_dir: Path,
     title: Optional[str] = None,
     output_format: str = "m4a",
+    item_id: Optional[str] = None,
 ) -> Optional[Path]:
-    """Download audio directly from URL."""
+    """Download audio directly from URL, naming the file after item_id if given."""
     try:
         # Determine filename
         if title:
@@ -49,27 +102,20 @@ async def _download_direct_audio(
         else:
             # Extract from URL
             base_name = url.split('/')[-1].split('?')[0]
-            base_name = re.sub(r'\.[^.]+$', '', base_name)  # Remove extension
+            base_name = _TRAILING_EXTENSION.sub('', base_name)  # Remove extension
+
+        if item_id:
+            # Items download concurrently and may share a title or URL
+            # basename; keep their files (and conversions) apart
+            base_name = f"{base_name}_{item_id[:8]}"
 
         # Get extension from URL
-        url_path = url.split('?')[0].lower()
-        ext = '.mp3'  # Default
-        for e in ['.mp3', '.m4a', '.aac', '.ogg', '.wav', '.flac', '.opus']:
-            if url_path.endswith(e):
-                ext = e
-                break
+        ext = _audio_extension(url) or '.mp3'  # Default
 
         output_path = output_dir / f"{base_name}{ext}"
 
         logger.info(f"Direct downloading: {url[:80]}...")
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream("GET", url, timeout=300.0, follow_redirects=True) as resp:
-                resp.raise_for_status()
-                with open(output_path, "wb") as f:
-                    async for chunk in resp.aiter_bytes(chunk_size=8192):
-                        f.write(chunk)
-
         # Convert format if needed (but skip mp3->m4a as it requires re-encoding)
         # MP3 and M4A are both widely compatible, so we keep the original format
         needs_conversion = (
@@ -79,21 +125,62 @@ async def _download_direct_audio(
             and not (ext == '.m4a' and output_format == 'mp3')  # Skip m4a->mp3 remux
         )
 
-        if needs_conversion:
-            from .converter import AudioConverter
-            converter = AudioConverter()
-            if converter.is_ffmpeg_available():
-                logger.info(f"Converting to {output_format}...")
-                try:
-                    converted_path = await converter.convert(
-                        input_path=output_path,
-                        output_format=output_format,
-                        quality="high",
-                        keep_original=False,
-                    )
-                    output_path = converted_path
-                except Exception as e:
-                    logger.warning(f"Conversion failed, keeping original: {e}")
+        can_convert = needs_conversion and AudioConverter.is_ffmpeg_available()
+        client = get_download_http_client()
+
+        if can_convert and ext in _PIPEABLE_EXTENSIONS:
+            # Transcode while downloading instead of reading the file back
+            # afterwards. The original is saved alongside, so a failed
+            # conversion needs no second download.
+            converted_path = output_path.with_suffix(f".{output_format}")
+            async with client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                chunks = resp.aiter_bytes(chunk_size=_DOWNLOAD_CHUNK_SIZE)
+                with open(output_path, "wb") as f:
+
+                    async def tee():
+                        async for chunk in chunks:
+                            await asyncio.to_thread(f.write, chunk)
+                            yield chunk
+
+                    try:
+                        await AudioConverter().convert_stream(
+                            tee(),
+                            converted_path,
+                            output_format=output_format,
+                            quality="high",
+                        )
+                    except FFmpegError as e:
+                        logger.warning(f"Streaming conversion failed, keeping original: {e}")
+                        # Save whatever FFmpeg had not read yet
+                        async for chunk in chunks:
+                            await asyncio.to_thread(f.write, chunk)
+                        logger.info(f"Direct download complete: {output_path}")
+                        return output_path
+
+            await asyncio.to_thread(output_path.unlink, missing_ok=True)
+            logger.info(f"Direct download complete: {converted_path}")
+            return converted_path
+
+        async with client.stream("GET", url) as resp:
+            resp.raise_for_status()
+            with open(output_path, "wb") as f:
+                # A slow disk stalls the writing thread, not the event loop
+                async for chunk in resp.aiter_bytes(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+
+        if can_convert:
+            logger.info(f"Converting to {output_format}...")
+            try:
+                converted_path = await AudioConverter().convert(
+                    input_path=output_path,
+                    output_format=output_format,
+                    quality="high",
+                    keep_original=False,
+                )
+                output_path = converted_path
+            except Exception as e:
+                logger.warning(f"Conversion failed, keeping original: {e}")
 
         logger.info(f"Direct download complete: {output_path}")
         return output_path
@@ -102,7 +189,6 @@ async def _download_direct_audio(
         logger.error(f"Direct download failed: {e}")
         return None
 
-logger = logging.getLogger(__name__)
 
 # Global worker instance
 _worker: Optional["SubscriptionWorker"] = None
@@ -171,51 +257,103 @@ class SubscriptionWorker:
 
         logger.info(f"Checking {len(subscriptions)} subscriptions")
 
-        for sub in subscriptions:
-            if not self._running:
-                break
+        # Poll every source concurrently, then record and process up to
+        # max_concurrent subscriptions at a time
+        fetched = await self._fetch_all(subscriptions)
+
+        await asyncio.gather(*(
+            self._bounded_check(sub, store, fetched.get(sub["id"]))
+            for sub in subscriptions
+        ))
 
+        # Writes are done until the next cycle; fold the WAL back into the database
+        try:
+            store.checkpoint()
+        except Exception as e:
+            logger.warning(f"Subscription database checkpoint failed: {e}")
+
+    async def _bounded_check(
+        self, sub: dict, store: SubscriptionStore, items: Optional[list] = None
+    ):
+        """Check a subscription once a concurrency slot is free."""
+        async with self._semaphore:
+            if not self._running:
+                return
             try:
-                await self._check_subscription(sub, store)
+                await self._check_subscription(sub, store, items)
             except Exception as e:
                 logger.error(f"Error checking subscription {sub['id']}: {e}")
 
-    async def _check_subscription(self, sub: dict, store: SubscriptionStore):
-        """Check a single subscription for new content."""
+    async def _fetch_all(self, subscriptions: list[dict]) -> dict[str, list]:
+        """Fetch items for all subscriptions, batched per subscription type."""
+        by_type: dict[str, list[dict]] = {}
+        for sub in subscriptions:
+            by_type.setdefault(sub["subscription_type"], []).append(sub)
+
+        async def fetch_type(subscription_type: str, subs: list[dict]) -> dict[str, list]:
+            try:
+                fetcher = get_fetcher(subscription_type)
+            except ValueError as e:
+                logger.error(str(e))
+                return {}
+            results = await fetcher.fetch_items_batch([
+                (sub["source_url"], sub.get("source_id"), sub.get("download_limit", 10) * 2)
+                for sub in subs
+            ])
+            return {sub["id"]: items for sub, items in zip(subs, results)}
+
+        fetched: dict[str, list] = {}
+        for result in await asyncio.gather(*(fetch_type(t, subs) for t, subs in by_type.items())):
+            fetched.update(result)
+        return fetched
+
+    async def _check_subscription(
+        self, sub: dict, store: SubscriptionStore, items: Optional[list] = None
+    ):
+        """Check a single subscription for new content.
+
+        Args:
+            sub: Subscription row
+            store: Subscription store
+            items: Items already fetched for this subscription; fetched here if None
+        """
         subscription_id = sub["id"]
         logger.debug(f"Checking subscription: {sub['name']} ({subscription_id})")
 
         try:
             # Fetch items from source
-            fetcher = get_fetcher(sub["subscription_type"])
-            items = await fetcher.fetch_items(
-                source_url=sub["source_url"],
-                source_id=sub.get("source_id"),
-                limit=sub.get("download_limit", 10) * 2,
-            )
+            if items is None:
+                fetcher = get_fetcher(sub["subscription_type"])
+                items = await fetcher.fetch_items(
+                    source_url=sub["source_url"],
+                    source_id=sub.get("source_id"),
+                    limit=sub.get("download_limit", 10) * 2,
+                )
 
-            # Add new items to database
-            new_items = []
-            for item in items:
-                existing = store.get_item_by_content_id(subscription_id, item.content_id)
-                if not existing:
-                    item_id = str(uuid.uuid4())
-                    created = store.create_item(
-                        item_id=item_id,
-                        subscription_id=subscription_id,
-                        content_id=item.content_id,
-                        content_url=item.content_url,
-                        title=item.title,
-                        published_at=item.published_at,
-                    )
-                    if created:
-                        new_items.append(created)
-
-            # Update timestamps
-            store.set_last_checked(subscription_id)
+            # Record new items and the check in one transaction. Usually
+            # every item is already known and nothing is inserted.
+            with store.transaction():
+                existing = store.get_existing_content_ids(
+                    subscription_id, [item.content_id for item in items]
+                )
+                new_items = store.create_items_bulk(subscription_id, [
+                    {
+                        "item_id": str(uuid.uuid4()),
+                        "content_id": item.content_id,
+                        "content_url": item.content_url,
+                        "title": item.title,
+                        "published_at": item.published_at,
+                    }
+                    for item in items
+                    if item.content_id not in existing
+                ])
+
+                # Update timestamps
+                store.set_last_checked(subscription_id)
+                if new_items:
+                    store.set_last_new_content(subscription_id)
 
             if new_items:
-                store.set_last_new_content(subscription_id)
                 logger.info(
                     f"Found {len(new_items)} new items for subscription: {sub['name']}"
                 )
@@ -224,6 +362,7 @@ class SubscriptionWorker:
                 await process_subscription_items(
                     subscription_id,
                     limit=sub.get("download_limit", 10),
+                    sub=sub,
                 )
 
         except Exception as e:
@@ -233,10 +372,18 @@ class SubscriptionWorker:
 async def process_subscription_items(
     subscription_id: str,
     limit: int = 10,
+    sub: Optional[dict] = None,
 ):
-    """Process pending items for a subscription."""
+    """Process pending items for a subscription.
+
+    Args:
+        subscription_id: Subscription to process
+        limit: Maximum number of pending items to download
+        sub: Subscription row, if the caller already has it
+    """
     store = get_subscription_store()
-    sub = store.get_subscription(subscription_id)
+    if sub is None:
+        sub = store.get_subscription(subscription_id)
 
     if not sub:
         logger.error(f"Subscription not found: {subscription_id}")
@@ -251,24 +398,47 @@ async def process_subscription_items(
 
     logger.info(f"Processing {len(pending_items)} items for subscription: {sub['name']}")
 
-    # Process items
-    for item in pending_items:
-        try:
-            await process_single_item(subscription_id, item["id"])
-        except Exception as e:
-            logger.error(f"Error processing item {item['id']}: {e}")
+    # Process items, up to subscription_item_concurrency at a time; the worker
+    # already runs subscription_max_concurrent of these checks side by side
+    semaphore = asyncio.Semaphore(get_settings().subscription_item_concurrency)
+
+    async def process(item: dict):
+        async with semaphore:
+            await process_single_item(subscription_id, item["id"], sub=sub, item=item)
+
+    results = await asyncio.gather(
+        *(process(item) for item in pending_items), return_exceptions=True
+    )
+    for item, result in zip(pending_items, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error processing item {item['id']}: {result}")
 
     # Cleanup old items if over limit
     await _cleanup_old_items(subscription_id, limit=sub.get("download_limit", 10))
 
 
-async def process_single_item(subscription_id: str, item_id: str):
-    """Process a single subscription item."""
+async def process_single_item(
+    subscription_id: str,
+    item_id: str,
+    sub: Optional[dict] = None,
+    item: Optional[dict] = None,
+):
+    """Process a single subscription item.
+
+    Args:
+        subscription_id: Subscription the item belongs to
+        item_id: Item to download
+        sub: Subscription row, if the caller already has it
+        item: Item row (at least id, content_id, content_url and title),
+            if the caller already has it
+    """
     store = get_subscription_store()
     settings = get_settings()
 
-    sub = store.get_subscription(subscription_id)
-    item = store.get_item(item_id)
+    if sub is None:
+        sub = store.get_subscription(subscription_id)
+    if item is None:
+        item = store.get_item(item_id)
 
     if not sub or not item:
         logger.error(f"Subscription or item not found: {subscription_id}/{item_id}")
@@ -300,6 +470,7 @@ async def process_single_item(subscription_id: str, item_id: str):
                 output_dir=download_dir,
                 title=item.get("title"),
                 output_format=sub.get("output_format", "m4a"),
+                item_id=item_id,
             )
             if not file_path:
                 store.set_item_status(
@@ -341,9 +512,13 @@ async def process_single_item(subscription_id: str, item_id: str):
 
             # Move file to subscription output directory if different
             if file_path and file_path.parent != download_dir:
-                import shutil
                 new_path = download_dir / file_path.name
-                shutil.move(str(file_path), str(new_path))
+                try:
+                    # A rename when both directories are on one filesystem
+                    os.replace(file_path, new_path)
+                except OSError:
+                    # Copies across filesystems; keep that off the event loop
+                    await asyncio.to_thread(shutil.move, str(file_path), str(new_path))
                 file_path = new_path
 
         # Auto-transcribe if enabled
@@ -355,17 +530,13 @@ async def process_single_item(subscription_id: str, item_id: str):
                 language=sub.get("transcribe_language"),
             )
 
-        # Update item status
-        store.set_item_status(
+        # Update item status and download counter
+        store.mark_item_completed(
             item_id,
-            SubscriptionItemStatus.COMPLETED,
             file_path=str(file_path) if file_path else None,
             transcription_path=str(transcription_path) if transcription_path else None,
         )
 
-        # Increment download counter
-        store.increment_total_downloaded(subscription_id)
-
         logger.info(f"Successfully processed item: {item.get('title', item['content_id'])}")
 
         # Send notification if webhook configured
@@ -387,8 +558,6 @@ async def _transcribe_item(
 ) -> Optional[Path]:
     """Transcribe an audio file."""
     try:
-        from .transcriber import AudioTranscriber
-
         if not AudioTranscriber.is_available():
             logger.warning("Transcriber not available, skipping auto-transcription")
             return None
@@ -403,7 +572,7 @@ async def _transcribe_item(
         if result.success and result.text:
             # Save transcription to file
             transcript_path = audio_path.with_suffix(".txt")
-            transcript_path.write_text(result.text, encoding="utf-8")
+            await asyncio.to_thread(transcript_path.write_text, result.text, encoding="utf-8")
             logger.info(f"Transcription saved to: {transcript_path}")
             return transcript_path
 
@@ -418,26 +587,25 @@ async def _cleanup_old_items(subscription_id: str, limit: int):
     """Remove oldest completed items if over the download limit."""
     store = get_subscription_store()
 
-    completed_count = store.count_items(subscription_id, SubscriptionItemStatus.COMPLETED)
-
-    if completed_count <= limit:
-        return
-
-    # Get items to delete (oldest first)
-    excess = completed_count - limit
-    old_items = store.get_oldest_completed_items(subscription_id, excess)
+    # Delete excess items from the database, then their files
+    old_items = store.prune_completed_items(subscription_id, keep_last=limit)
+
+    # Delete files in worker threads, all at once
+    paths = [
+        Path(item[path_field])
+        for item in old_items
+        for path_field in ("file_path", "transcription_path")
+        if item.get(path_field)
+    ]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(path.unlink, missing_ok=True) for path in paths),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to delete file: {result}")
 
     for item in old_items:
-        # Delete files
-        for path_field in ["file_path", "transcription_path"]:
-            if item.get(path_field):
-                try:
-                    Path(item[path_field]).unlink(missing_ok=True)
-                except Exception as e:
-                    logger.warning(f"Failed to delete file: {e}")
-
-        # Delete item from database
-        store.delete_item(item["id"])
         logger.info(f"Cleaned up old item: {item.get('title', item['content_id'])}")
 
 
@@ -455,8 +623,6 @@ async def _send_notification(
         return
 
     try:
-        import httpx
-
         payload = {
             "event": "subscription_item_completed",
             "subscription_id": sub["id"],
@@ -466,13 +632,13 @@ async def _send_notification(
             "content_url": item["content_url"],
             "file_path": str(file_path) if file_path else None,
             "transcription_path": str(transcription_path) if transcription_path else None,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         }
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(webhook_url, json=payload, timeout=10.0)
-            if resp.status_code >= 400:
-                logger.warning(f"Webhook returned status {resp.status_code}")
+        client = get_download_http_client()
+        resp = await client.post(webhook_url, json=payload, timeout=10.0)
+        if resp.status_code >= 400:
+            logger.warning(f"Webhook returned status {resp.status_code}")
 
     except Exception as e:
         logger.error(f"Failed to send webhook notification: {e}")
@@ -507,3 +673,4 @@ async def stop_subscription_worker():
     if _worker:
         await _worker.stop()
         _worker = None
+    await close_download_http_client()
@@ -5,10 +5,38 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+import httpx
+import litellm
 from litellm import acompletion
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pool for LLM API calls, so batched requests reuse TCP/TLS sessions
+_LLM_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+_llm_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client and register it with LiteLLM."""
+    global _llm_http_client
+    if _llm_http_client is None or _llm_http_client.is_closed:
+        _llm_http_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=2, limits=_LLM_HTTP_LIMITS),
+            timeout=httpx.Timeout(600.0),
+        )
+        litellm.aclient_session = _llm_http_client
+    return _llm_http_client
+
+
+async def close_llm_http_client() -> None:
+    """Close the shared LLM HTTP client (called on app shutdown)."""
+    global _llm_http_client
+    if _llm_http_client is not None:
+        if litellm.aclient_session is _llm_http_client:
+            litellm.aclient_session = None
+        await _llm_http_client.aclose()
+        _llm_http_client = None
+
 
 class SummaryType(str, Enum):
     """Types of summaries that can be generated."""
@@ -53,10 +81,33 @@ class LiteLLMProvider:
         self.base_url = base_url
         self._provider = provider
         self._available: Optional[bool] = None
+        self._supports_schema: Optional[bool] = None
 
-    async def generate(self, prompt: str, system_prompt: str = "") -> tuple[str, int]:
+    @property
+    def supports_response_schema(self) -> bool:
+        """Whether the model supports JSON-schema constrained output."""
+        if self._supports_schema is None:
+            try:
+                self._supports_schema = litellm.supports_response_schema(model=self.model)
+            except Exception:
+                self._supports_schema = False
+        return self._supports_schema
+
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        response_schema: Optional[dict] = None,
+    ) -> tuple[str, int]:
         """Generate a response from the LLM using LiteLLM.
 
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            response_schema: Optional {"name", "schema", "strict"} JSON schema. Applied
+                as response_format only when the model supports it, so callers must
+                still tolerate free-form output.
+
         Returns:
             Tuple of (response_text, tokens_used)
         """
@@ -74,7 +125,10 @@ class LiteLLMProvider:
             kwargs["api_key"] = self.api_key
         if self.base_url:
             kwargs["base_url"] = self.base_url
+        if response_schema and self.supports_response_schema:
+            kwargs["response_format"] = {"type": "json_schema", "json_schema": response_schema}
 
+        get_llm_http_client()
         response = await acompletion(**kwargs)
         content = response.choices[0].message.content
         tokens = response.usage.total_tokens if response.usage else 0
@@ -150,6 +150,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to stop subscription worker: {e}")
 
+    # Close subscription database
+    try:
+        from .core.subscription_store import close_subscription_store
+        close_subscription_store()
+    except Exception as e:
+        logger.error(f"Failed to close subscription store: {e}")
+
+    # Close shared feed HTTP client
+    try:
+        from .core.subscription_fetcher import close_feed_http_client
+        await close_feed_http_client()
+    except Exception as e:
+        logger.error(f"Failed to close feed HTTP client: {e}")
+
+    # Close shared LLM HTTP client
+    try:
+        from .core.summarizer import close_llm_http_client
+        await close_llm_http_client()
+    except Exception as e:
+        logger.error(f"Failed to close LLM HTTP client: {e}")
+
+    # Close shared sentiment availability probe client
+    try:
+        from .core.sentiment_analyzer import SentimentAnalyzer
+        SentimentAnalyzer.close_probe_client()
+    except Exception as e:
+        logger.error(f"Failed to close sentiment probe client: {e}")
+
     # Cleanup on shutdown
     logger.info("Shutting down AudioGrab API")
     try:
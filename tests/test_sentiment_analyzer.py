@@ -0,0 +1,539 @@
+"""Tests for sentiment analysis parsing and aggregation."""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+import pytest
+
+from app.core.sentiment_analyzer import (
+    EMOTION_NAMES,
+    EMOTIONAL_ARC_SCHEMA,
+    SEGMENT_ANALYSIS_SCHEMA,
+    EmotionalArc,
+    SegmentSentiment,
+    SentimentAnalysisResult,
+    SentimentAnalyzer,
+    TimeWindowAggregate,
+    _parse_json_response,
+    _top_k_indices,
+)
+
+
+class FakeProvider:
+    """Stand-in LLM provider that records prompts and replays responses."""
+
+    name = "fake"
+    model_name = "fake-model"
+
+    def __init__(self, arc_response='{"overall_sentiment": "neutral"}'):
+        self.prompts: list[str] = []
+        self.schemas: list[dict | None] = []
+        self.arc_response = arc_response
+
+    def is_available(self) -> bool:
+        return True
+
+    async def generate(
+        self, prompt: str, system_prompt: str = "", response_schema: dict | None = None
+    ) -> tuple[str, int]:
+        self.prompts.append(prompt)
+        self.schemas.append(response_schema)
+        if prompt.startswith("Based on the sentiment analysis"):
+            return self.arc_response, 5
+        # Echo one neutral analysis per "[index]" line in the prompt
+        indices = [
+            int(line[1:line.index("]")])
+            for line in prompt.splitlines()
+            if line.startswith("[") and "]" in line
+        ]
+        segments = [{"segment_index": i, "heat_score": 0.5} for i in indices]
+        return json.dumps({"segments": segments}), 10
+
+
+def make_segment(index, start, end, polarity=0.0, heat=0.3, emotions=None):
+    """Build a SegmentSentiment with sensible defaults."""
+    return SegmentSentiment(
+        segment_index=index,
+        start=start,
+        end=end,
+        text=f"segment {index}",
+        polarity=polarity,
+        energy="neutral",
+        energy_score=0.5,
+        excitement=50,
+        emotions=np.array([(emotions or {}).get(name, 0.0) for name in EMOTION_NAMES]),
+        heat_score=heat,
+    )
+
+
+class TestAggregateTimeWindows:
+    """Tests for SentimentAnalyzer._aggregate_time_windows."""
+
+    def test_empty_segments(self):
+        """Test that no segments produce no windows."""
+        assert SentimentAnalyzer()._aggregate_time_windows([], 30) == []
+
+    def test_windows_average_overlapping_segments(self):
+        """Test averages, counts and dominant emotion per window."""
+        segments = [
+            make_segment(0, 0.0, 10.0, polarity=0.5, heat=0.2,
+                         emotions={"joy": 0.9, "anger": 0.1, "fear": 0.0, "surprise": 0.0, "sadness": 0.0}),
+            make_segment(1, 20.0, 40.0, polarity=-0.5, heat=0.8,
+                         emotions={"joy": 0.0, "anger": 0.9, "fear": 0.0, "surprise": 0.0, "sadness": 0.0}),
+            make_segment(2, 45.0, 50.0, polarity=0.0, heat=0.5,
+                         emotions={"joy": 0.0, "anger": 0.0, "fear": 0.0, "surprise": 0.0, "sadness": 0.7}),
+        ]
+
+        windows = SentimentAnalyzer()._aggregate_time_windows(segments, 30)
+
+        assert [w.window_index for w in windows] == [0, 1]
+        first, second = windows
+        assert (first.start, first.end) == (0.0, 30.0)
+        assert first.segment_count == 2
+        assert first.avg_polarity == 0.0
+        assert first.avg_heat_score == 0.5
+        assert first.dominant_emotion == "anger"
+        assert (second.start, second.end) == (30.0, 50.0)
+        assert second.segment_count == 2
+        assert second.avg_heat_score == 0.65
+        assert second.dominant_emotion == "anger"
+
+    def test_empty_windows_are_skipped(self):
+        """Test that windows with no overlapping segments are omitted."""
+        segments = [
+            make_segment(0, 0.0, 5.0),
+            make_segment(1, 95.0, 100.0),
+        ]
+
+        windows = SentimentAnalyzer()._aggregate_time_windows(segments, 30)
+
+        assert [w.window_index for w in windows] == [0, 3]
+        assert windows[-1].end == 100.0
+
+
+class TestParseJsonResponse:
+    """Tests for extracting JSON from LLM responses."""
+
+    def test_plain_json(self):
+        """Test a bare JSON array."""
+        assert _parse_json_response('[{"segment_index": 0}]') == [{"segment_index": 0}]
+
+    def test_fenced_json(self):
+        """Test JSON wrapped in a markdown code fence with prose."""
+        response = 'Here you go [sic]:\n```json\n{"overall_sentiment": "mixed"}\n```\nDone.'
+        assert _parse_json_response(response) == {"overall_sentiment": "mixed"}
+
+    def test_unlabelled_fence(self):
+        """Test JSON inside a fence without a language tag."""
+        assert _parse_json_response("```\n[1, 2]\n```") == [1, 2]
+
+    def test_no_json_raises(self):
+        """Test that responses without JSON raise a decode error."""
+        with pytest.raises(json.JSONDecodeError):
+            _parse_json_response("I cannot analyze this.")
+
+
+class TestTopKIndices:
+    """Tests for the partial top-k selection helper."""
+
+    def test_matches_stable_sort_with_ties(self):
+        """Test ordering against sorted(..., reverse=True) including ties."""
+        values = [0.5, 0.9, 0.5, 0.1, 0.9, 0.5, 0.3]
+        expected = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+
+        for k in range(len(values) + 2):
+            assert _top_k_indices(np.array(values), k) == expected[:k]
+
+    def test_empty(self):
+        """Test that empty input yields no indices."""
+        assert _top_k_indices(np.array([]), 5) == []
+
+
+class TestParseSegmentAnalysis:
+    """Tests for SentimentAnalyzer._parse_segment_analysis."""
+
+    def test_matches_by_segment_index(self):
+        """Test that results are matched by index regardless of order."""
+        batch = [
+            {"start": 0.0, "end": 1.0, "text": "a"},
+            {"start": 1.0, "end": 2.0, "text": "b"},
+        ]
+        response = json.dumps([
+            {"segment_index": 11, "polarity": -0.4, "heat_score": 0.9},
+            {"segment_index": 10, "polarity": 0.4, "heat_score": 0.1},
+        ])
+
+        results = SentimentAnalyzer()._parse_segment_analysis(response, batch, 10)
+
+        assert [r.segment_index for r in results] == [10, 11]
+        assert [r.polarity for r in results] == [0.4, -0.4]
+        assert [r.heat_score for r in results] == [0.1, 0.9]
+
+    def test_bare_array_response(self):
+        """Test that providers without schema support may still return a plain array."""
+        batch = [{"start": 0.0, "end": 1.0, "text": "a"}]
+        response = '```json\n[{"segment_index": 0, "polarity": 0.7}]\n```'
+
+        result = SentimentAnalyzer()._parse_segment_analysis(response, batch, 0)[0]
+
+        assert result.polarity == 0.7
+
+    def test_values_are_clamped(self):
+        """Test that out-of-range and malformed values are clamped or defaulted."""
+        batch = [{"start": 0.0, "end": 1.0, "text": "a"}]
+        response = json.dumps([
+            {"polarity": 3, "excitement": "lots", "emotions": {"joy": 2.0}, "heat_score": -1},
+        ])
+
+        result = SentimentAnalyzer()._parse_segment_analysis(response, batch, 0)[0]
+
+        assert result.polarity == 1.0
+        assert result.excitement == 50
+        assert result.emotions_dict["joy"] == 1.0
+        assert result.heat_score == 0.0
+
+    def test_unparseable_response_uses_defaults(self):
+        """Test that a non-JSON response yields default values."""
+        batch = [{"start": 0.0, "end": 1.0, "text": "a", "speaker": "A"}]
+
+        result = SentimentAnalyzer()._parse_segment_analysis("no json here", batch, 0)[0]
+
+        assert result.polarity == 0.0
+        assert result.heat_score == 0.3
+        assert result.speaker == "A"
+
+
+class TestSentimentAnalysisResult:
+    """Tests for result serialization."""
+
+    def test_round_trip(self):
+        """Test that to_dict/from_dict preserve all fields."""
+        result = SentimentAnalysisResult(
+            success=True,
+            job_id="job-1",
+            segments=[make_segment(0, 0.0, 5.0, polarity=0.2, heat=0.7)],
+            time_windows=[
+                TimeWindowAggregate(
+                    window_index=0,
+                    start=0.0,
+                    end=5.0,
+                    avg_polarity=0.2,
+                    avg_heat_score=0.7,
+                    dominant_emotion="joy",
+                    segment_count=1,
+                )
+            ],
+            emotional_arc=EmotionalArc(
+                overall_sentiment="positive",
+                avg_heat_score=0.7,
+                peak_moments=[{"timestamp": 0.0, "description": "segment 0", "heat_score": 0.7}],
+                dominant_emotions=["joy"],
+                emotional_journey="Upbeat throughout.",
+                total_heated_segments=1,
+                heated_percentage=100.0,
+            ),
+            model="test-model",
+            provider="test",
+            tokens_used=42,
+        )
+
+        data = result.to_dict()
+        restored = SentimentAnalysisResult.from_dict(data)
+
+        assert restored.to_dict() == data
+        assert data["segments"][0]["is_heated"] is True
+
+    def test_is_heated_follows_heat_score(self):
+        """Test that is_heated is derived from heat_score, not stored state."""
+        data = make_segment(0, 0.0, 1.0, heat=0.2).to_dict()
+        data["is_heated"] = True
+
+        segment = SegmentSentiment.from_dict(data)
+
+        assert segment.is_heated is False
+        segment.heat_score = SentimentAnalyzer.HEAT_THRESHOLD
+        assert segment.is_heated is True
+
+    def test_heated_count(self):
+        """Test counting segments at or above the heat threshold."""
+        result = SentimentAnalysisResult(
+            success=True,
+            job_id="job-1",
+            segments=[make_segment(i, float(i), float(i + 1), heat=h) for i, h in enumerate([0.6, 0.59, 0.9])],
+        )
+
+        assert result.heated_count == 2
+
+    def test_segments_use_slots(self):
+        """Test that segment instances do not carry a per-instance __dict__."""
+        assert not hasattr(make_segment(0, 0.0, 1.0), "__dict__")
+
+
+class TestBuildBatches:
+    """Tests for token-budgeted batching."""
+
+    def test_short_segments_share_a_batch(self):
+        """Test that short segments are packed up to the segment cap."""
+        analyzer = SentimentAnalyzer()
+        segments = [{"start": 0, "end": 1, "text": "yeah"}] * (analyzer.MAX_BATCH_SIZE + 5)
+
+        batches = analyzer._build_batches(segments)
+
+        assert [(start, len(batch)) for start, batch in batches] == [
+            (0, analyzer.MAX_BATCH_SIZE),
+            (analyzer.MAX_BATCH_SIZE, 5),
+        ]
+
+    def test_long_segments_split_by_token_budget(self):
+        """Test that long segments close batches early."""
+        analyzer = SentimentAnalyzer()
+        long_text = "x" * (analyzer.TARGET_PROMPT_TOKENS * 4)
+        segments = [{"start": 0, "end": 1, "text": long_text}, {"start": 1, "end": 2, "text": "ok"}]
+
+        batches = analyzer._build_batches(segments)
+
+        assert [start for start, _ in batches] == [0, 1]
+
+
+class TestAnalyzeSentiment:
+    """Tests for SentimentAnalyzer.analyze_sentiment."""
+
+    async def test_batches_segments_into_prompts(self):
+        """Test that every segment is sent to the provider with its index and timing."""
+        provider = FakeProvider()
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": f"line {i}", "speaker": None}
+            for i in range(25)
+        ]
+
+        result = await SentimentAnalyzer(provider=provider).analyze_sentiment(segments, "job-1")
+
+        assert result.success
+        assert [s.segment_index for s in result.segments] == list(range(25))
+        assert all(s.heat_score == 0.5 for s in result.segments)
+        segment_prompts = provider.prompts[:-1]
+        assert "[0] (0.0s - 1.0s): line 0" in segment_prompts[0]
+        assert sum(p.count("): line ") for p in segment_prompts) == 25
+        assert result.emotional_arc is not None
+        assert result.tokens_used == 10 * len(segment_prompts)
+        assert provider.schemas[0] is SEGMENT_ANALYSIS_SCHEMA
+        assert provider.schemas[-1] is EMOTIONAL_ARC_SCHEMA
+
+    async def test_repeated_texts_are_analyzed_once(self):
+        """Test that duplicate utterances share one analysis but keep their own timing."""
+        provider = FakeProvider()
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "yeah", "speaker": "A"},
+            {"start": 1.0, "end": 5.0, "text": "That was a great point", "speaker": "B"},
+            {"start": 5.0, "end": 6.0, "text": " yeah ", "speaker": "B"},
+        ]
+
+        result = await SentimentAnalyzer(provider=provider).analyze_sentiment(segments, "job-1")
+
+        assert sum(p.count("): ") for p in provider.prompts[:-1]) == 2
+        assert [s.segment_index for s in result.segments] == [0, 1, 2]
+        repeat = result.segments[2]
+        assert (repeat.start, repeat.end, repeat.text, repeat.speaker) == (5.0, 6.0, " yeah ", "B")
+        assert repeat.heat_score == result.segments[0].heat_score
+
+    async def test_emotional_arc_fallback_uses_emotion_totals(self):
+        """Test the statistical arc when the LLM summary cannot be parsed."""
+        analyzer = SentimentAnalyzer(provider=FakeProvider(arc_response="not json"))
+        segments = [
+            make_segment(0, 0.0, 1.0, polarity=0.5, heat=0.9,
+                         emotions={"joy": 0.2, "anger": 0.0, "fear": 0.1, "surprise": 0.6, "sadness": 0.0}),
+            make_segment(1, 1.0, 2.0, polarity=0.5, heat=0.1,
+                         emotions={"joy": 0.3, "anger": 0.0, "fear": 0.0, "surprise": 0.0, "sadness": 0.0}),
+        ]
+
+        arc = await analyzer._generate_emotional_arc(segments, 0)
+
+        assert arc.overall_sentiment == "positive"
+        assert arc.dominant_emotions == ["surprise", "joy", "fear"]
+        arc_prompt = analyzer.provider.prompts[-1]
+        assert arc_prompt.index("- surprise: 0.6") < arc_prompt.index("- joy: 0.5") < arc_prompt.index("- anger: 0.0")
+        assert arc.peak_moments[0]["heat_score"] == 0.9
+        assert arc.total_heated_segments == 1
+        assert arc.heated_percentage == 50.0
+
+    async def test_emotional_arc_fallback_negative_polarity(self):
+        """Test that the statistical arc classifies sentiment from mean polarity."""
+        analyzer = SentimentAnalyzer(provider=FakeProvider(arc_response="not json"))
+        segments = [
+            make_segment(0, 0.0, 1.0, polarity=-0.9),
+            make_segment(1, 1.0, 2.0, polarity=0.1),
+            make_segment(2, 2.0, 3.0, polarity=0.2),
+        ]
+
+        arc = await analyzer._generate_emotional_arc(segments, 0)
+
+        assert arc.overall_sentiment == "negative"
+        assert arc.total_heated_segments == 0
+
+    def test_heated_moments_hottest_first(self):
+        """Test that only heated segments are returned, hottest first, up to the limit."""
+        segments = [
+            make_segment(i, float(i), float(i + 1), heat=heat)
+            for i, heat in enumerate([0.7, 0.2, 0.95, 0.6, 0.8])
+        ]
+
+        moments = SentimentAnalyzer().get_heated_moments(segments, limit=3)
+
+        assert [s.segment_index for s in moments] == [2, 4, 0]
+
+    async def test_no_provider(self):
+        """Test that a missing provider returns an error result."""
+        result = await SentimentAnalyzer().analyze_sentiment([{"start": 0, "end": 1, "text": "a"}], "job-1")
+
+        assert not result.success
+        assert result.error == "No AI provider configured"
+
+
+class TestIsAvailable:
+    """Tests for the cached availability check."""
+
+    def test_result_is_cached(self, monkeypatch):
+        """Test that repeated checks reuse the cached probe result."""
+        calls = []
+
+        def fake_check(cls):
+            calls.append(1)
+            return True
+
+        monkeypatch.setattr(SentimentAnalyzer, "_check_availability", classmethod(fake_check))
+        SentimentAnalyzer._availability_cache.clear()
+
+        try:
+            assert SentimentAnalyzer.is_available()
+            assert SentimentAnalyzer.is_available()
+        finally:
+            SentimentAnalyzer._availability_cache.clear()
+
+        assert len(calls) == 1
+
+    def test_concurrent_checks_probe_once(self, monkeypatch):
+        """Test that threads checking at once share a single probe."""
+        calls = []
+
+        def fake_check(cls):
+            calls.append(1)
+            time.sleep(0.05)
+            return True
+
+        monkeypatch.setattr(SentimentAnalyzer, "_check_availability", classmethod(fake_check))
+        SentimentAnalyzer._availability_cache.clear()
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: SentimentAnalyzer.is_available(), range(4)))
+        finally:
+            SentimentAnalyzer._availability_cache.clear()
+
+        assert results == [True] * 4
+        assert len(calls) == 1
+
+    def test_close_does_not_wait_for_probe(self, monkeypatch):
+        """Test that closing the probe client is not blocked by an in-flight probe."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_check(cls):
+            started.set()
+            release.wait(5)
+            return True
+
+        monkeypatch.setattr(SentimentAnalyzer, "_check_availability", classmethod(slow_check))
+        SentimentAnalyzer._availability_cache.clear()
+
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pending = pool.submit(SentimentAnalyzer.is_available)
+                assert started.wait(5)
+
+                closer = threading.Thread(target=SentimentAnalyzer.close_probe_client)
+                closer.start()
+                closer.join(1)
+                closed_during_probe = not closer.is_alive()
+
+                release.set()
+                assert pending.result(5)
+        finally:
+            release.set()
+            SentimentAnalyzer._availability_cache.clear()
+
+        assert closed_during_probe
+
+    def test_probe_client_closed(self):
+        """Test that closing the shared probe client releases it."""
+        client = httpx.Client()
+        SentimentAnalyzer._probe_client = client
+
+        SentimentAnalyzer.close_probe_client()
+
+        assert client.is_closed
+        assert SentimentAnalyzer._probe_client is None
+
+
+class TestFromSettings:
+    """Tests for building the analyzer from environment settings."""
+
+    @pytest.fixture
+    def env_settings(self, monkeypatch):
+        """Patch settings lookup and make the database config unavailable."""
+        from types import SimpleNamespace
+
+        import app.config
+        import app.core.job_store
+
+        settings = SimpleNamespace(
+            llm_provider="ollama",
+            ollama_model="llama3.2",
+            ollama_base_url="http://ollama:11434",
+            openai_api_key=None,
+            openai_model="gpt-4o-mini",
+            openai_base_url="http://proxy/v1",
+            groq_api_key=None,
+            groq_model="llama-3.1-70b-versatile",
+        )
+
+        def no_job_store():
+            raise RuntimeError("no database")
+
+        monkeypatch.setattr(app.config, "get_settings", lambda: settings)
+        monkeypatch.setattr(app.core.job_store, "get_job_store", no_job_store)
+        return settings
+
+    def test_ollama_needs_no_key(self, env_settings):
+        """Test the keyless Ollama provider."""
+        provider = SentimentAnalyzer.from_settings().provider
+
+        assert provider.model == "ollama/llama3.2"
+        assert provider.base_url == "http://ollama:11434"
+        assert provider.name == "ollama"
+
+    def test_openai_compatible_uses_prefix_and_base_url(self, env_settings):
+        """Test that OpenAI-compatible endpoints get the openai/ prefix."""
+        env_settings.llm_provider = "openai_compatible"
+        env_settings.openai_api_key = "sk-test"
+
+        provider = SentimentAnalyzer.from_settings().provider
+
+        assert provider.model == "openai/gpt-4o-mini"
+        assert provider.api_key == "sk-test"
+        assert provider.base_url == "http://proxy/v1"
+        assert provider.name == "custom"
+
+    def test_missing_key_yields_no_provider(self, env_settings):
+        """Test that cloud providers without a key are not configured."""
+        env_settings.llm_provider = "groq"
+
+        assert SentimentAnalyzer.from_settings().provider is None
+
+    def test_build_litellm_model(self):
+        """Test database provider names map to LiteLLM model strings."""
+        assert SentimentAnalyzer._build_litellm_model("groq", "m") == "groq/m"
+        assert SentimentAnalyzer._build_litellm_model("custom", "m") == "openai/m"
+        assert SentimentAnalyzer._build_litellm_model("anthropic", "m") == "m"
@@ -0,0 +1,240 @@
+"""Tests for storage statistics and cleanup."""
+
+import os
+import time
+
+import pytest
+
+from app.core import storage_manager
+from app.core.storage_manager import StorageManager
+
+
+def write_file(path, size, age_hours=0.0):
+    """Create a file of the given size and backdate its mtime."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def download_dir(tmp_path):
+    """A download directory with nested files of different ages."""
+    root = tmp_path / "downloads"
+    write_file(root / "old.mp3", 100, age_hours=48)
+    write_file(root / "new.mp3", 200, age_hours=1)
+    write_file(root / "yt" / "channel" / "mid.m4a", 300, age_hours=10)
+    write_file(root / "jobs.db", 50, age_hours=100)
+    return root
+
+
+class TestGetStats:
+    """Tests for StorageManager.get_stats."""
+
+    def test_counts_nested_files(self, download_dir):
+        """Test that files in nested directories are counted and sized."""
+        stats = StorageManager(download_dir).get_stats()
+
+        assert stats.download_file_count == 4
+        assert stats.download_dir_bytes == 650
+        assert stats.total_bytes > 0
+
+    def test_missing_directory(self, tmp_path):
+        """Test that a missing download directory reports no files."""
+        stats = StorageManager(tmp_path / "missing").get_stats()
+
+        assert stats.download_file_count == 0
+        assert stats.download_dir_bytes == 0
+
+    def test_cached_until_forced(self, download_dir):
+        """Test that stats are reused within the TTL unless forced."""
+        manager = StorageManager(download_dir)
+        first = manager.get_stats()
+        write_file(download_dir / "extra.mp3", 1000)
+
+        assert manager.get_stats() is first
+        assert manager.get_stats(force=True).download_dir_bytes == 1650
+
+    def test_deletion_invalidates_cache(self, download_dir):
+        """Test that cleanup deletions invalidate cached stats."""
+        manager = StorageManager(download_dir)
+        manager.get_stats()
+
+        manager.cleanup_by_age(max_age_hours=24)
+
+        assert manager.get_stats().download_dir_bytes == 550
+
+
+class TestCleanup:
+    """Tests for cleanup policies."""
+
+    def test_files_by_age_oldest_first(self, download_dir):
+        """Test that cleanup candidates are sorted oldest first and skip databases."""
+        files = StorageManager(download_dir).get_files_by_age()
+
+        assert [p.name for p, _, _ in files] == ["old.mp3", "mid.m4a", "new.mp3"]
+        assert files[0][1] == pytest.approx(48, abs=0.1)
+
+    def test_scan_without_dir_fd_matches(self, download_dir, monkeypatch):
+        """Test that the path-based fallback scan finds the same files."""
+        (download_dir / "empty").mkdir()
+        with_fd = StorageManager(download_dir)._scan_tree()
+
+        monkeypatch.setattr(storage_manager, "_SCANDIR_FD", False)
+        without_fd = StorageManager(download_dir)._scan_tree()
+
+        assert sorted((p, size) for p, _, size in with_fd[0]) == sorted(
+            (p, size) for p, _, size in without_fd[0]
+        )
+        assert with_fd[1:] == without_fd[1:] == (650, [download_dir / "empty"])
+
+    def test_files_by_age_min_age(self, download_dir):
+        """Test filtering by minimum age."""
+        files = StorageManager(download_dir).get_files_by_age(min_age_hours=5)
+
+        assert [p.name for p, _, _ in files] == ["old.mp3", "mid.m4a"]
+
+    def test_iter_oldest_matches_stable_sort(self):
+        """Test that lazy ordering matches a stable oldest-first sort."""
+        files = [("a", 1.0, 1), ("b", 5.0, 1), ("c", 1.0, 1), ("d", 5.0, 1), ("e", 3.0, 1)]
+
+        expected = sorted(files, key=lambda x: x[1], reverse=True)
+
+        assert list(storage_manager._iter_oldest(files)) == expected
+
+    def test_cleanup_by_age(self, download_dir):
+        """Test that files older than the limit are deleted."""
+        result = StorageManager(download_dir).cleanup_by_age(max_age_hours=24)
+
+        assert result.files_deleted == 1
+        assert result.bytes_freed == 100
+        assert not (download_dir / "old.mp3").exists()
+        assert (download_dir / "jobs.db").exists()
+
+    def test_cleanup_by_size_deletes_oldest_first(self, download_dir):
+        """Test that size cleanup removes the oldest files until under the limit."""
+        limit_gb = 300 / (1024**3)
+
+        result = StorageManager(download_dir).cleanup_by_size(limit_gb)
+
+        assert result.files_deleted == 2
+        assert result.bytes_freed == 400
+        assert (download_dir / "new.mp3").exists()
+
+    def test_cleanup_by_size_under_limit(self, download_dir):
+        """Test that nothing is deleted when under the size limit."""
+        result = StorageManager(download_dir).cleanup_by_size(1.0)
+
+        assert result.files_deleted == 0
+
+    def test_cleanup_by_size_under_limit_uses_cached_stats(self, download_dir, monkeypatch):
+        """Test that fresh cached stats within the limit skip the scan."""
+        manager = StorageManager(download_dir)
+        manager.get_stats()
+        monkeypatch.setattr(manager, "_scan_tree", lambda: pytest.fail("unexpected scan"))
+
+        assert manager.cleanup_by_size(1.0).files_deleted == 0
+
+    def test_cleanup_by_size_walks_once(self, download_dir, monkeypatch):
+        """Test that an over-limit cleanup sizes and lists the tree in one scan."""
+        manager = StorageManager(download_dir)
+        walks = []
+        walk_files = storage_manager._walk_files
+
+        def counting_walk(*args):
+            walks.append(args[0])
+            return walk_files(*args)
+
+        monkeypatch.setattr(storage_manager, "_walk_files", counting_walk)
+
+        result = manager.cleanup_by_size(300 / (1024**3))
+
+        assert result.files_deleted == 2
+        assert walks == [download_dir]
+
+    def test_scan_refreshes_stats(self, download_dir, monkeypatch):
+        """Test that a cleanup scan leaves fresh stats for get_stats."""
+        manager = StorageManager(download_dir)
+        manager._scan_tree()
+        monkeypatch.setattr(storage_manager, "_walk_files", lambda *args: pytest.fail("unexpected walk"))
+
+        stats = manager.get_stats()
+
+        assert (stats.download_dir_bytes, stats.download_file_count) == (650, 4)
+
+    def test_cleanup_for_free_space_enough_free(self, download_dir, monkeypatch):
+        """Test that free-space cleanup is a no-op without walking the tree."""
+        manager = StorageManager(download_dir)
+        monkeypatch.setattr(manager, "_scan_tree", lambda: pytest.fail("unexpected scan"))
+        monkeypatch.setattr(storage_manager, "_walk_files", lambda *args: pytest.fail("unexpected walk"))
+
+        assert manager.cleanup_for_free_space(0.0).files_deleted == 0
+
+    @pytest.mark.parametrize("dir_fd", [True, False], ids=["dir-fd", "paths"])
+    def test_cleanup_empty_dirs_removes_nested(self, download_dir, monkeypatch, dir_fd):
+        """Test that directories containing only empty directories are removed."""
+        monkeypatch.setattr(storage_manager, "_SCANDIR_FD", dir_fd and storage_manager._SCANDIR_FD)
+        (download_dir / "empty" / "deeper").mkdir(parents=True)
+        (download_dir / "yt" / "channel" / "mid.m4a").unlink()
+
+        removed = StorageManager(download_dir).cleanup_empty_dirs()
+
+        assert removed == 4
+        assert not (download_dir / "empty").exists()
+        assert not (download_dir / "yt").exists()
+        assert download_dir.exists()
+
+    async def test_run_cleanup_removes_emptied_dirs(self, download_dir):
+        """Test that directories emptied by deletions are removed in the same run."""
+        result = await StorageManager(download_dir).run_cleanup(max_age_hours=5)
+
+        assert result.files_deleted == 2
+        assert not (download_dir / "yt").exists()
+        assert (download_dir / "new.mp3").exists()
+
+    def test_cleanup_reports_unlink_errors(self, download_dir):
+        """Test that failed deletions are reported without aborting the run."""
+        manager = StorageManager(download_dir)
+        files = manager._files_older_than(0)
+        files.insert(0, (str(download_dir / "gone.mp3"), 99.0, 10))
+
+        deleted, freed, errors = manager._delete_files(files, bytes_to_free=250)
+
+        assert deleted == 2
+        assert freed == 400
+        assert len(errors) == 1
+        assert "gone.mp3" in errors[0]
+
+    async def test_run_cleanup_removes_preexisting_empty_dirs(self, download_dir):
+        """Test that empty directories found by the policy scan are removed."""
+        (download_dir / "empty" / "deeper").mkdir(parents=True)
+
+        result = await StorageManager(download_dir).run_cleanup(max_age_hours=1000)
+
+        assert result.files_deleted == 0
+        assert not (download_dir / "empty").exists()
+        assert (download_dir / "yt" / "channel").exists()
+
+
+class TestBackgroundCleanup:
+    """Tests for the background cleanup schedule."""
+
+    def test_idle_runs_back_off(self):
+        """Test that idle runs double the interval up to the cap."""
+        intervals, current = [], 60
+        for _ in range(6):
+            current = StorageManager._next_interval(current, 60, threshold_hit=False)
+            intervals.append(current)
+
+        assert intervals == [120, 240, 480, 960, 960, 960]
+
+    def test_threshold_hits_halve_to_floor(self):
+        """Test that hits halve from the base interval and stop at the floor."""
+        intervals, current = [], 3600 * 16
+        for _ in range(8):
+            current = StorageManager._next_interval(current, 3600, threshold_hit=True)
+            intervals.append(current)
+
+        assert intervals == [1800, 900, 450, 225, 112.5, 60, 60, 60]
+        assert StorageManager._next_interval(30, 30, threshold_hit=True) == 30
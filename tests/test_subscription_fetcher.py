@@ -0,0 +1,632 @@
+"""Tests for subscription fetchers."""
+
+import asyncio
+import sys
+import textwrap
+import threading
+
+import httpx
+import pytest
+
+from app.core import subscription_fetcher
+from app.core.subscription_fetcher import (
+    RSSFetcher,
+    YouTubeChannelFetcher,
+    YouTubePlaylistFetcher,
+    _fast_feed_entries,
+    _parse_feed,
+    get_feed_http_client,
+    get_fetcher,
+)
+
+RSS_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Test Podcast</title>
+    <item>
+      <guid>ep-2</guid>
+      <title>Episode 2</title>
+      <pubDate>Tue, 02 Jan 2024 10:30:00 GMT</pubDate>
+      <enclosure url="https://cdn.example.com/ep2.mp3" type="audio/mpeg" length="1"/>
+    </item>
+    <item>
+      <guid>ep-video</guid>
+      <title>Video only</title>
+      <enclosure url="https://cdn.example.com/ep.mp4" type="video/mp4" length="1"/>
+    </item>
+    <item>
+      <guid>ep-1</guid>
+      <title>Episode 1</title>
+      <pubDate>Mon, 01 Jan 2024 08:00:00 GMT</pubDate>
+      <enclosure url="https://cdn.example.com/ep1.m4a" type="audio/x-m4a" length="1"/>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+  <title>Atom Show</title>
+  <entry>
+    <id>urn:uuid:atom-1</id>
+    <title type="html">Tom &amp;amp; Jerry</title>
+    <itunes:title>Ignored extension title</itunes:title>
+    <published>2024-03-05T12:00:00+02:00</published>
+    <link rel="alternate" type="text/html" href="https://example.com/atom-1"/>
+    <link rel="enclosure" type="audio/mpeg" href="https://cdn.example.com/atom-1.mp3"/>
+  </entry>
+  <entry>
+    <id>urn:uuid:atom-2</id>
+    <title>Linked audio</title>
+    <updated>2024-03-04T08:00:00Z</updated>
+    <link rel="alternate" type="audio/ogg" href="https://cdn.example.com/atom-2.ogg"/>
+  </entry>
+</feed>
+"""
+
+
+def audio_items(entries):
+    """Reduce entries to what fetch_items reads from them."""
+    fetcher = RSSFetcher()
+    return [
+        (
+            e.get("id") or e.get("guid") or e.get("link", ""),
+            fetcher._get_audio_url(e),
+            e.get("title"),
+            tuple(e["published_parsed"][:6]) if e.get("published_parsed") else None,
+        )
+        for e in entries
+    ]
+
+
+@pytest.fixture
+async def feed_server():
+    """Route the shared feed client through a mock transport; yields the request log."""
+    requests: list[httpx.Request] = []
+    routes: dict[str, httpx.Response] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        key = f"{request.url.host}{request.url.path}"
+        if key in routes:
+            route = routes[key]
+            return route(request) if callable(route) else route
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    subscription_fetcher._feed_http_client = client
+    subscription_fetcher._feed_cache.clear()
+    subscription_fetcher._itunes_cache.clear()
+    yield routes, requests
+    subscription_fetcher._feed_http_client = None
+    subscription_fetcher._feed_cache.clear()
+    subscription_fetcher._itunes_cache.clear()
+    await client.aclose()
+
+
+@pytest.fixture
+def fake_yt_dlp(tmp_path):
+    """An executable standing in for yt-dlp that prints canned flat-playlist output."""
+    script = tmp_path / "yt-dlp"
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent("""
+        import json, sys, time
+        args = sys.argv[1:]
+        if "--print" in args:
+            print("Fake Channel")
+            sys.exit(0)
+        if "fail" in args[-1]:
+            sys.stderr.write("ERROR: unavailable\\n")
+            sys.exit(1)
+        if "hang" in args[-1]:
+            print("{}", flush=True)
+            time.sleep(60)
+        end = int(args[args.index("--playlist-end") + 1])
+        videos = [
+            {"id": "vid1", "title": "First", "upload_date": "20240102"},
+            {"id": "", "title": "No id"},
+            {"id": "vid2", "title": "Second"},
+        ]
+        print("not json")
+        for video in videos[:end]:
+            print(json.dumps(video))
+    """))
+    script.chmod(0o755)
+    return str(script)
+
+
+@pytest.fixture
+def fake_youtube_dl(monkeypatch):
+    """Install a stand-in for yt-dlp's YoutubeDL class; yields the class."""
+
+    class FakeYoutubeDL:
+        instances: list = []
+        calls: list = []
+        barrier = None
+
+        def __init__(self, params):
+            self.params = params
+            self.instances.append(self)
+
+        def extract_info(self, url, download):
+            self.calls.append((url, self.params["playlistend"]))
+            if self.barrier:
+                self.barrier.wait()
+            return {
+                "title": "Fake Playlist",
+                "channel": "Fake Channel",
+                "entries": iter([{"id": "a", "title": "A"}, {"id": "b"}, {"id": "c"}]),
+            }
+
+    monkeypatch.setattr(subscription_fetcher, "YoutubeDL", FakeYoutubeDL)
+    subscription_fetcher._youtube_dl_pool.cache_clear()
+    yield FakeYoutubeDL
+    subscription_fetcher._youtube_dl_pool.cache_clear()
+
+
+class TestFeedHttpClient:
+    """Tests for the shared feed HTTP client."""
+
+    async def test_client_is_reused_until_closed(self):
+        """Test that the client is created once and recreated after closing."""
+        client = get_feed_http_client()
+
+        assert get_feed_http_client() is client
+
+        await subscription_fetcher.close_feed_http_client()
+
+        assert client.is_closed
+        assert get_feed_http_client() is not client
+        await subscription_fetcher.close_feed_http_client()
+
+
+class TestGetFetcher:
+    """Tests for get_fetcher."""
+
+    def test_fetchers_are_shared(self):
+        """Test that each subscription type maps to one reused fetcher."""
+        assert isinstance(get_fetcher("rss"), RSSFetcher)
+        assert get_fetcher("youtube_channel") is get_fetcher("youtube_channel")
+        assert get_fetcher("youtube_playlist")._yt_dlp_path == subscription_fetcher._YT_DLP_PATH
+
+    def test_unknown_type(self):
+        """Test that unknown subscription types are rejected."""
+        with pytest.raises(ValueError):
+            get_fetcher("mastodon")
+
+
+class TestRSSFetcher:
+    """Tests for RSSFetcher."""
+
+    async def test_fetch_items(self, feed_server):
+        """Test that audio episodes are extracted and video-only entries skipped."""
+        routes, requests = feed_server
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=RSS_FEED)
+
+        items = await RSSFetcher().fetch_items("https://feeds.example.com/podcast.xml")
+
+        assert [i.content_id for i in items] == ["ep-2", "ep-1"]
+        assert items[0].content_url == "https://cdn.example.com/ep2.mp3"
+        assert items[0].title == "Episode 2"
+        assert items[0].published_at == "2024-01-02T10:30:00"
+
+    async def test_fetched_items_are_hashable(self, feed_server):
+        """Test that fetched items are immutable values usable in sets."""
+        routes, _ = feed_server
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=RSS_FEED)
+        fetcher = RSSFetcher()
+
+        first = await fetcher.fetch_items("https://feeds.example.com/podcast.xml")
+        second = await fetcher.fetch_items("https://feeds.example.com/podcast.xml")
+
+        assert len(set(first) | set(second)) == 2
+        with pytest.raises(AttributeError):
+            first[0].title = "Changed"
+
+    async def test_fetch_items_uses_declared_encoding(self, feed_server):
+        """Test that the feed body is decoded using its XML encoding declaration."""
+        routes, _ = feed_server
+        body = RSS_FEED.replace('encoding="UTF-8"', 'encoding="ISO-8859-1"').replace(
+            "Episode 2", "Épisode 2"
+        )
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(
+            200, content=body.encode("latin-1"), headers={"Content-Type": "application/xml"}
+        )
+
+        items = await RSSFetcher().fetch_items("https://feeds.example.com/podcast.xml")
+
+        assert items[0].title == "Épisode 2"
+
+    async def test_fetch_items_limit(self, feed_server):
+        """Test that only the first limit entries are considered."""
+        routes, _ = feed_server
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=RSS_FEED)
+
+        items = await RSSFetcher().fetch_items("https://feeds.example.com/podcast.xml", limit=1)
+
+        assert [i.content_id for i in items] == ["ep-2"]
+
+    async def test_fetch_items_conditional_poll(self, feed_server):
+        """Test that an unchanged feed is answered from cache after a 304."""
+        routes, requests = feed_server
+
+        def conditional(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=RSS_FEED, headers={"ETag": '"v1"'})
+
+        routes["feeds.example.com/podcast.xml"] = conditional
+        fetcher = RSSFetcher()
+
+        first = await fetcher.fetch_items("https://feeds.example.com/podcast.xml")
+        second = await fetcher.fetch_items("https://feeds.example.com/podcast.xml")
+        other_limit = await fetcher.fetch_items("https://feeds.example.com/podcast.xml", limit=1)
+
+        assert "If-None-Match" not in requests[0].headers
+        assert requests[1].headers["If-None-Match"] == '"v1"'
+        assert "If-None-Match" not in requests[2].headers
+        assert second == first
+        assert [i.content_id for i in other_limit] == ["ep-2"]
+
+    async def test_fetch_items_http_error(self, feed_server):
+        """Test that HTTP errors yield no items."""
+        items = await RSSFetcher().fetch_items("https://feeds.example.com/missing.xml")
+
+        assert items == []
+
+    async def test_validate_source(self, feed_server):
+        """Test that a valid feed returns its title."""
+        routes, _ = feed_server
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=RSS_FEED)
+
+        result = await RSSFetcher().validate_source("https://feeds.example.com/podcast.xml")
+
+        assert result == (True, "https://feeds.example.com/podcast.xml", "Test Podcast")
+
+    async def test_validate_source_reads_prefix(self, feed_server):
+        """Test that validation reads the title from a ranged prefix of the feed."""
+        routes, requests = feed_server
+        body = RSS_FEED.encode("utf-8")
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(206, content=body[:200])
+
+        result = await RSSFetcher().validate_source("https://feeds.example.com/podcast.xml")
+
+        assert result == (True, "https://feeds.example.com/podcast.xml", "Test Podcast")
+        assert len(requests) == 1
+        assert requests[0].headers["Range"] == "bytes=0-16383"
+
+    async def test_validate_source_falls_back_to_full_feed(self, feed_server):
+        """Test that titles the prefix parser cannot read are taken from feedparser."""
+        routes, requests = feed_server
+        body = ATOM_FEED.replace("<title>Atom Show</title>", '<title type="html">Atom &amp;amp; Show</title>')
+
+        def ranged(request):
+            if "Range" in request.headers:
+                return httpx.Response(
+                    206,
+                    content=body.encode("utf-8")[:300],
+                    headers={"Content-Range": f"bytes 0-299/{len(body.encode('utf-8'))}"},
+                )
+            return httpx.Response(200, text=body)
+
+        routes["feeds.example.com/atom.xml"] = ranged
+
+        result = await RSSFetcher().validate_source("https://feeds.example.com/atom.xml")
+
+        assert result == (True, "https://feeds.example.com/atom.xml", "Atom &amp; Show")
+        assert len(requests) == 2
+
+    @pytest.mark.parametrize("content_range", [True, False], ids=["content-range", "short"])
+    async def test_validate_source_whole_feed_in_range(self, feed_server, content_range):
+        """Test that a range response holding the whole feed is parsed without a second GET."""
+        routes, requests = feed_server
+        body = ATOM_FEED.replace("<title>Atom Show</title>", '<title type="html">Atom &amp;amp; Show</title>')
+        data = body.encode("utf-8")
+        headers = {"Content-Range": f"bytes 0-{len(data) - 1}/{len(data)}"} if content_range else {}
+        routes["feeds.example.com/atom.xml"] = httpx.Response(206, content=data, headers=headers)
+
+        result = await RSSFetcher().validate_source("https://feeds.example.com/atom.xml")
+
+        assert result == (True, "https://feeds.example.com/atom.xml", "Atom &amp; Show")
+        assert len(requests) == 1
+
+    async def test_validate_source_long_prolog(self, feed_server):
+        """Test that feeds whose root comes after a long prolog are still accepted."""
+        routes, _ = feed_server
+        licence = "<!-- " + "Licensed under the terms below. " * 100 + "-->\n"
+        body = RSS_FEED.replace("<rss ", licence + "<rss ", 1)
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=body)
+
+        result = await RSSFetcher().validate_source("https://feeds.example.com/podcast.xml")
+
+        assert result == (True, "https://feeds.example.com/podcast.xml", "Test Podcast")
+
+    async def test_validate_source_rejects_non_feed(self, feed_server):
+        """Test that a page without a feed root is rejected without a second request."""
+        routes, requests = feed_server
+        routes["example.com/page"] = httpx.Response(200, text="<!DOCTYPE html><html><body>Hi</body></html>")
+
+        result = await RSSFetcher().validate_source("https://example.com/page")
+
+        assert result == (False, None, None)
+        assert len(requests) == 1
+
+    async def test_validate_apple_podcasts(self, feed_server):
+        """Test that Apple Podcasts URLs are resolved through the iTunes lookup."""
+        routes, requests = feed_server
+        routes["itunes.apple.com/lookup"] = httpx.Response(200, json={
+            "resultCount": 1,
+            "results": [{"collectionId": 42, "feedUrl": "https://feeds.example.com/p.xml",
+                         "collectionName": "Apple Show"}],
+        })
+
+        result = await RSSFetcher().validate_source(
+            "https://podcasts.apple.com/us/podcast/apple-show/id42"
+        )
+
+        assert result == (True, "https://feeds.example.com/p.xml", "Apple Show")
+        assert requests[0].url.params["id"] == "42"
+
+    async def test_apple_podcasts_batch_lookup(self, feed_server):
+        """Test that several Apple Podcasts URLs are resolved in one lookup."""
+        routes, requests = feed_server
+        routes["itunes.apple.com/lookup"] = httpx.Response(200, json={
+            "resultCount": 2,
+            "results": [
+                {"collectionId": 7, "feedUrl": "https://feeds.example.com/7.xml", "collectionName": "Seven"},
+                {"collectionId": 42, "feedUrl": "https://feeds.example.com/42.xml", "collectionName": "Answer"},
+            ],
+        })
+
+        results = await RSSFetcher()._apple_podcasts_to_rss_batch([
+            "https://podcasts.apple.com/us/podcast/answer/id42",
+            "https://example.com/not-apple",
+            "https://podcasts.apple.com/us/podcast/seven/id7",
+            "https://podcasts.apple.com/us/podcast/gone/id99",
+            "https://podcasts.apple.com/gb/podcast/answer/id42",
+        ])
+
+        assert results == [
+            ("https://feeds.example.com/42.xml", "Answer"),
+            (None, None),
+            ("https://feeds.example.com/7.xml", "Seven"),
+            (None, None),
+            ("https://feeds.example.com/42.xml", "Answer"),
+        ]
+        assert len(requests) == 1
+        assert requests[0].url.params["id"] == "42,7,99"
+
+    async def test_apple_podcasts_lookup_is_cached(self, feed_server):
+        """Test that repeated validation of a podcast skips the iTunes lookup."""
+        routes, requests = feed_server
+        routes["itunes.apple.com/lookup"] = httpx.Response(200, json={
+            "resultCount": 1,
+            "results": [{"collectionId": 42, "feedUrl": "https://feeds.example.com/p.xml",
+                         "collectionName": "Apple Show"}],
+        })
+        fetcher = RSSFetcher()
+
+        first = await fetcher.validate_source("https://podcasts.apple.com/us/podcast/a/id42")
+        second = await fetcher.validate_source("https://podcasts.apple.com/gb/podcast/a/id42")
+
+        assert first == second == (True, "https://feeds.example.com/p.xml", "Apple Show")
+        assert len(requests) == 1
+
+
+    async def test_fetch_items_batch(self, feed_server, monkeypatch):
+        """Test that batched fetches keep input order, bound concurrency and isolate failures."""
+        routes, _ = feed_server
+        routes["feeds.example.com/podcast.xml"] = httpx.Response(200, text=RSS_FEED)
+        fetcher = RSSFetcher()
+        fetcher.MAX_CONCURRENT_FETCHES = 2
+        active = peak = 0
+        fetch_items = fetcher.fetch_items
+
+        async def tracked(source_url, source_id=None, limit=50):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                await asyncio.sleep(0.01)
+                if "broken" in source_url:
+                    raise RuntimeError("boom")
+                return await fetch_items(source_url, source_id=source_id, limit=limit)
+            finally:
+                active -= 1
+
+        monkeypatch.setattr(fetcher, "fetch_items", tracked)
+
+        results = await fetcher.fetch_items_batch([
+            ("https://feeds.example.com/podcast.xml", None, 1),
+            ("https://feeds.example.com/broken.xml", None, 10),
+            ("https://feeds.example.com/missing.xml", None, 10),
+            ("https://feeds.example.com/podcast.xml", None, 10),
+        ])
+
+        assert [[i.content_id for i in items] for items in results] == [
+            ["ep-2"], [], [], ["ep-2", "ep-1"]
+        ]
+        assert peak == 2
+
+
+class TestFastFeedEntries:
+    """Tests for the ElementTree feed fast path."""
+
+    @pytest.mark.parametrize("feed", [RSS_FEED, ATOM_FEED], ids=["rss", "atom"])
+    def test_matches_feedparser(self, feed):
+        """Test that the fast path extracts the same fields as feedparser."""
+        content = feed.encode("utf-8")
+
+        fast = _fast_feed_entries(content, limit=50)
+
+        assert audio_items(fast) == audio_items(_parse_feed(content).entries)
+
+    def test_stops_at_limit(self):
+        """Test that only the first limit entries are returned."""
+        entries = _fast_feed_entries(RSS_FEED.encode("utf-8"), limit=2)
+
+        assert [e["id"] for e in entries] == ["ep-2", "ep-video"]
+
+    def test_malformed_feed_falls_back(self):
+        """Test that feeds that are not well-formed XML are left to feedparser."""
+        broken = RSS_FEED.replace("Episode 1", "Episode&nbsp;1").encode("utf-8")
+
+        assert _fast_feed_entries(broken, limit=50) is None
+        assert _parse_feed(broken).entries
+
+    @pytest.mark.parametrize("feed,title", [(RSS_FEED, "Test Podcast"), (ATOM_FEED, "Atom Show")],
+                             ids=["rss", "atom"])
+    def test_feed_title_from_prefix(self, feed, title):
+        """Test that the feed title is read from a truncated prefix."""
+        content = feed.encode("utf-8")
+        cut = content.index(b"</title>") + 20
+
+        assert subscription_fetcher._fast_feed_title(content[:cut]) == title
+
+    def test_feed_title_not_a_feed(self):
+        """Test that non-feed documents yield no title."""
+        assert subscription_fetcher._fast_feed_title(b"<html><title>Page</title></html>") is None
+
+    @pytest.mark.parametrize("prefix,root", [
+        (RSS_FEED.encode("utf-8"), "rss"),
+        (ATOM_FEED.encode("utf-8"), "feed"),
+        (b'<?xml version="1.0"?><rdf:RDF xmlns:rdf="x">', "RDF"),
+        (b"<!DOCTYPE html><html><head><title>x</title>", None),
+        (RSS_FEED.encode("utf-16"), ""),
+    ], ids=["rss", "atom", "rdf", "html", "utf-16"])
+    def test_sniff_feed(self, prefix, root):
+        """Test that the feed root is identified from the first bytes."""
+        assert subscription_fetcher._sniff_feed(prefix) == root
+
+    def test_no_entries_falls_back(self):
+        """Test that documents without entries are left to feedparser."""
+        assert _fast_feed_entries(b"<html><body>Not a feed</body></html>", limit=50) is None
+
+
+class TestYouTubeFetchers:
+    """Tests for the yt-dlp based fetchers."""
+
+    async def test_channel_fetch_items(self, fake_yt_dlp):
+        """Test that channel videos are parsed from yt-dlp JSON lines."""
+        fetcher = YouTubeChannelFetcher()
+        fetcher._yt_dlp_path = fake_yt_dlp
+
+        items = await fetcher.fetch_items("https://www.youtube.com/@someone")
+
+        assert [i.content_id for i in items] == ["vid1", "vid2"]
+        assert items[0].content_url == "https://www.youtube.com/watch?v=vid1"
+        assert items[0].published_at == "2024-01-02T00:00:00"
+        assert items[1].published_at is None
+
+    async def test_channel_fetch_error(self, fake_yt_dlp):
+        """Test that a failing yt-dlp run yields no items."""
+        fetcher = YouTubeChannelFetcher()
+        fetcher._yt_dlp_path = fake_yt_dlp
+
+        assert await fetcher.fetch_items("https://www.youtube.com/@fail") == []
+
+    async def test_cancelled_listing_reaps_cli(self, fake_yt_dlp, monkeypatch):
+        """Test that cancelling a listing kills and waits for the yt-dlp process."""
+        processes = []
+        create = asyncio.create_subprocess_exec
+
+        async def capture(*args, **kwargs):
+            processes.append(await create(*args, **kwargs))
+            return processes[-1]
+
+        monkeypatch.setattr(subscription_fetcher.asyncio, "create_subprocess_exec", capture)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                subscription_fetcher._list_playlist_entries(
+                    fake_yt_dlp, "https://www.youtube.com/@hang", 5
+                ),
+                timeout=1,
+            )
+
+        assert processes[0].returncode is not None
+
+    async def test_drain_head_keeps_prefix(self):
+        """Test that a drained stream keeps only its first bytes."""
+        stream = asyncio.StreamReader()
+        stream.feed_data(b"x" * 100_000)
+        stream.feed_data(b"tail")
+        stream.feed_eof()
+
+        assert await subscription_fetcher._drain_head(stream, 500) == b"x" * 500
+        assert stream.at_eof()
+
+    async def test_playlist_fetch_items(self, fake_yt_dlp):
+        """Test that playlist videos are parsed without dates."""
+        fetcher = YouTubePlaylistFetcher()
+        fetcher._yt_dlp_path = fake_yt_dlp
+
+        items = await fetcher.fetch_items("https://www.youtube.com/playlist?list=PL1", limit=1)
+
+        assert [(i.content_id, i.published_at) for i in items] == [("vid1", None)]
+
+    async def test_channel_validate_source(self, fake_yt_dlp):
+        """Test channel URL validation and name lookup."""
+        fetcher = YouTubeChannelFetcher()
+        fetcher._yt_dlp_path = fake_yt_dlp
+
+        assert await fetcher.validate_source("https://www.youtube.com/@someone") == (
+            True, "https://www.youtube.com/@someone", "Fake Channel"
+        )
+        for url in (
+            "https://www.youtube.com/channel/UC_x-1",
+            "https://youtube.com/c/name",
+            "https://www.youtube.com/user/name",
+        ):
+            assert (await fetcher.validate_source(url))[0]
+        assert await fetcher.validate_source("https://example.com/@someone") == (False, None, None)
+        assert await fetcher.validate_source("https://www.youtube.com/watch?v=x") == (False, None, None)
+
+    async def test_playlist_validate_source(self, fake_yt_dlp):
+        """Test playlist URL validation returns the playlist ID."""
+        fetcher = YouTubePlaylistFetcher()
+        fetcher._yt_dlp_path = fake_yt_dlp
+
+        assert await fetcher.validate_source("https://www.youtube.com/playlist?list=PL_a-1") == (
+            True, "PL_a-1", "Fake Channel"
+        )
+
+    async def test_in_process_yt_dlp_is_preferred(self, fake_youtube_dl):
+        """Test that yt-dlp's Python API is used when importable, without the CLI."""
+        fetcher = YouTubePlaylistFetcher()
+        fetcher._yt_dlp_path = None
+
+        items = await fetcher.fetch_items("https://www.youtube.com/playlist?list=PL1", limit=2)
+
+        assert [i.content_id for i in items] == ["a", "b"]
+        assert fake_youtube_dl.instances[0].params["extract_flat"] is True
+        assert fake_youtube_dl.calls == [("https://www.youtube.com/playlist?list=PL1", 2)]
+
+    async def test_in_process_yt_dlp_is_shared(self, fake_youtube_dl):
+        """Test that sequential fetches and validation reuse one YoutubeDL instance."""
+        channel = YouTubeChannelFetcher()
+        playlist = YouTubePlaylistFetcher()
+        channel._yt_dlp_path = playlist._yt_dlp_path = None
+
+        await playlist.fetch_items("https://www.youtube.com/playlist?list=PL1", limit=3)
+        assert await playlist.validate_source("https://www.youtube.com/playlist?list=PL1") == (
+            True, "PL1", "Fake Playlist"
+        )
+        assert await channel.validate_source("https://www.youtube.com/@someone") == (
+            True, "https://www.youtube.com/@someone", "Fake Channel"
+        )
+
+        assert len(fake_youtube_dl.instances) == 1
+        assert [limit for _, limit in fake_youtube_dl.calls] == [3, 1, 1]
+
+    async def test_in_process_yt_dlp_runs_concurrently(self, fake_youtube_dl):
+        """Test that concurrent listings each borrow an instance instead of queueing."""
+        fake_youtube_dl.barrier = threading.Barrier(2, timeout=5)
+        fetcher = YouTubePlaylistFetcher()
+        fetcher._yt_dlp_path = None
+
+        await asyncio.gather(
+            fetcher.fetch_items("https://www.youtube.com/playlist?list=PL1"),
+            fetcher.fetch_items("https://www.youtube.com/playlist?list=PL2"),
+        )
+
+        assert len(fake_youtube_dl.instances) == 2
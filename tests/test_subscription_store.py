@@ -0,0 +1,418 @@
+"""Tests for the SQLite subscription store."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.core import subscription_store
+from app.core.subscription_store import (
+    SubscriptionItemStatus,
+    SubscriptionPlatform,
+    SubscriptionStore,
+    SubscriptionType,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A subscription store backed by a temporary database."""
+    store = SubscriptionStore(tmp_path / "subscriptions.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def subscription(store):
+    """An RSS subscription in the store."""
+    return store.create_subscription(
+        subscription_id="sub-1",
+        name="Test Podcast",
+        subscription_type=SubscriptionType.RSS,
+        platform=SubscriptionPlatform.PODCAST,
+        source_url="https://feeds.example.com/podcast.xml",
+    )
+
+
+class TestConnection:
+    """Tests for database connection settings."""
+
+    def test_wal_mode(self, store):
+        """Test that the database uses write-ahead logging."""
+        with store._get_conn() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_sql_trace_only_at_debug(self, tmp_path, caplog):
+        """Test that executed SQL is logged only when the SQL logger is at DEBUG."""
+        quiet = SubscriptionStore(tmp_path / "quiet.db")
+        quiet.count_items("sub-1")
+        quiet.close()
+        assert not caplog.records
+
+        caplog.set_level("DEBUG", logger="app.core.subscription_store.sql")
+        traced = SubscriptionStore(tmp_path / "traced.db")
+        traced.count_items("sub-1")
+        traced.close()
+
+        assert any("SELECT COUNT(*)" in r.getMessage() for r in caplog.records)
+
+    def test_checkpoint_truncates_wal(self, store, subscription):
+        """Test that a checkpoint empties the write-ahead log file."""
+        wal = store.db_path.with_name(store.db_path.name + "-wal")
+        assert wal.stat().st_size > 0
+
+        assert store.checkpoint()
+
+        assert wal.stat().st_size == 0
+
+    def test_connection_is_reused(self, store):
+        """Test that every call shares the store's single connection."""
+        with store._get_conn() as first:
+            pass
+        with store._get_conn() as second:
+            pass
+
+        assert first is second is store._conn
+
+    def test_failed_block_rolls_back(self, store, subscription):
+        """Test that a failing write block leaves no partial changes behind."""
+        with pytest.raises(sqlite3.IntegrityError):
+            with store._get_conn() as conn:
+                conn.execute("UPDATE subscriptions SET name = 'Renamed' WHERE id = 'sub-1'")
+                conn.execute("INSERT INTO subscriptions (id) VALUES ('bad')")
+
+        assert store.get_subscription("sub-1")["name"] == "Test Podcast"
+
+    def test_usable_from_other_threads(self, store, subscription):
+        """Test that the shared connection can be used from worker threads."""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(store.get_subscription("sub-1")["id"]))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["sub-1"] * 4
+
+    def test_transaction_commits_once(self, store, subscription):
+        """Test that calls inside a transaction share a single commit."""
+        commits = []
+        store._conn.set_trace_callback(lambda sql: sql == "COMMIT" and commits.append(sql))
+
+        with store.transaction():
+            store.create_item("item-1", "sub-1", "ep-1", "u1")
+            store.set_last_checked("sub-1")
+            assert not commits
+
+        assert commits == ["COMMIT"]
+
+    def test_transaction_rolls_back_all_calls(self, store, subscription):
+        """Test that an error in a transaction undoes every call in it, cached or not."""
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.create_item("item-1", "sub-1", "ep-1", "u1")
+                store.update_subscription("sub-1", name="Renamed")
+                raise RuntimeError("boom")
+
+        assert store.get_item_by_content_id("sub-1", "ep-1") is None
+        assert store.get_subscription("sub-1")["name"] == "Test Podcast"
+
+    def test_pending_query_uses_partial_index(self, store):
+        """Test that the pending-items query is answered from its index without sorting."""
+        with store._get_conn() as conn:
+            plan = " ".join(
+                row[3] for row in conn.execute(
+                    f"EXPLAIN QUERY PLAN {subscription_store._LIST_ITEMS_BY_STATUS}",
+                    ("sub-1", SubscriptionItemStatus.PENDING.value, 10, 0),
+                )
+            )
+
+        assert "idx_items_pending" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_pending_items_read_from_covering_index(self, store):
+        """Test that the worker's pending-items query never reads the table."""
+        with store._get_conn() as conn:
+            plan = " ".join(
+                row[3] for row in conn.execute(
+                    f"EXPLAIN QUERY PLAN {subscription_store._LIST_PENDING_ITEMS}", ("sub-1", 10)
+                )
+            )
+
+        assert "COVERING INDEX idx_items_pending_covering" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_items_deleted_with_subscription(self, store, subscription):
+        """Test that deleting a subscription cascades to its items."""
+        store.create_item("item-1", "sub-1", "ep-1", "https://cdn.example.com/ep1.mp3")
+
+        assert store.delete_subscription("sub-1")
+
+        assert store.get_item("item-1") is None
+
+
+class TestWrites:
+    """Tests for writes returning the written row."""
+
+    @pytest.mark.parametrize("returning", [True, False], ids=["returning", "select"])
+    def test_writes_return_rows(self, store, monkeypatch, returning):
+        """Test that writes return the stored row with and without RETURNING support."""
+        monkeypatch.setattr(subscription_store, "_HAS_RETURNING", returning)
+
+        sub = store.create_subscription(
+            "sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST,
+            auto_transcribe=True,
+        )
+        updated = store.update_subscription("sub-1", name="Renamed", enabled=False)
+        item = store.create_item("item-1", "sub-1", "ep-1", "u1")
+        failed = store.set_item_status("item-1", SubscriptionItemStatus.FAILED, error="boom")
+
+        assert sub["auto_transcribe"] is True and sub["total_downloaded"] == 0
+        assert updated["name"] == "Renamed" and updated["enabled"] is False
+        assert item["status"] == "pending"
+        assert failed == store.get_item("item-1")
+        assert failed["error"] == "boom"
+        assert store.update_subscription("missing", name="x") is None
+        assert store.update_item("missing", title="x") is None
+
+    def test_enum_and_bool_fields_stored_as_values(self, store, subscription):
+        """Test that enum and bool arguments are stored as plain text and integers."""
+        store.update_subscription(
+            "sub-1", platform=SubscriptionPlatform.YOUTUBE, auto_transcribe=True
+        )
+
+        with store._get_conn() as conn:
+            row = conn.execute(
+                "SELECT platform, typeof(platform), auto_transcribe, typeof(auto_transcribe) "
+                "FROM subscriptions WHERE id = 'sub-1'"
+            ).fetchone()
+
+        assert tuple(row) == ("youtube", "text", 1, "integer")
+        assert store.list_subscriptions(platform=SubscriptionPlatform.YOUTUBE)[0]["auto_transcribe"] is True
+
+    def test_updated_at_maintained_by_trigger(self, store, subscription):
+        """Test that single-column updates still advance updated_at."""
+        with store._get_conn() as conn:
+            conn.execute("UPDATE subscriptions SET updated_at = '2000-01-01T00:00:00' WHERE id = 'sub-1'")
+        store._subscription_cache.clear()
+
+        store.set_last_checked("sub-1")
+        sub = store.get_subscription("sub-1")
+
+        assert sub["updated_at"] > "2000-01-01T00:00:00"
+        assert len(sub["updated_at"]) == len("2024-01-01T00:00:00.000000")
+
+        renamed = store.update_subscription("sub-1", name="Renamed")
+        assert renamed == store.get_subscription("sub-1")
+
+
+    @pytest.mark.parametrize(
+        ("enabled_only", "platform", "expected"),
+        [
+            (False, None, ["yt-off", "yt-on", "sub-1"]),
+            (True, None, ["yt-on", "sub-1"]),
+            (False, SubscriptionPlatform.YOUTUBE, ["yt-off", "yt-on"]),
+            (True, SubscriptionPlatform.YOUTUBE, ["yt-on"]),
+        ],
+    )
+    def test_list_subscriptions_filters(self, store, subscription, enabled_only, platform, expected):
+        """Test every combination of the enabled and platform filters."""
+        for sub_id, enabled in (("yt-on", True), ("yt-off", False)):
+            store.create_subscription(
+                sub_id, sub_id, SubscriptionType.YOUTUBE_CHANNEL, SubscriptionPlatform.YOUTUBE
+            )
+            store.update_subscription(sub_id, enabled=enabled)
+
+        subs = store.list_subscriptions(enabled_only=enabled_only, platform=platform)
+
+        assert [s["id"] for s in subs] == expected
+
+
+class TestItems:
+    """Tests for subscription item CRUD."""
+
+    def test_create_and_get_item(self, store, subscription):
+        """Test that created items start pending and can be looked up by content ID."""
+        created = store.create_item(
+            "item-1", "sub-1", "ep-1", "https://cdn.example.com/ep1.mp3",
+            title="Episode 1", published_at="2024-01-01T08:00:00",
+        )
+
+        assert created["status"] == SubscriptionItemStatus.PENDING.value
+        assert store.get_item_by_content_id("sub-1", "ep-1") == created
+
+    @pytest.mark.parametrize("returning", [True, False], ids=["returning", "select"])
+    def test_duplicate_item(self, store, subscription, monkeypatch, returning):
+        """Test that an item with a known content ID or item ID is not created twice."""
+        monkeypatch.setattr(subscription_store, "_HAS_RETURNING", returning)
+        store.create_item("item-1", "sub-1", "ep-1", "https://cdn.example.com/ep1.mp3")
+
+        assert store.create_item("item-2", "sub-1", "ep-1", "https://cdn.example.com/ep1.mp3") is None
+        assert store.create_item("item-1", "sub-1", "ep-9", "https://cdn.example.com/ep9.mp3") is None
+        assert store.count_items("sub-1") == 1
+
+    def test_get_existing_content_ids(self, store, subscription):
+        """Test that only content IDs stored for the subscription are returned."""
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        store.create_item("item-2", "sub-1", "ep-2", "u2")
+
+        assert store.get_existing_content_ids("sub-1", ["ep-2", "ep-3", "ep-1"]) == {"ep-1", "ep-2"}
+        assert store.get_existing_content_ids("sub-2", ["ep-1"]) == set()
+        assert store.get_existing_content_ids("sub-1", []) == set()
+
+    @pytest.mark.parametrize("returning", [True, False], ids=["returning", "select"])
+    def test_mark_item_completed(self, store, subscription, monkeypatch, returning):
+        """Test that completing an item records the file and bumps the download count."""
+        monkeypatch.setattr(subscription_store, "_HAS_RETURNING", returning)
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        store.get_subscription("sub-1")
+
+        item = store.mark_item_completed("item-1", file_path="/tmp/ep1.mp3")
+
+        assert item["status"] == SubscriptionItemStatus.COMPLETED.value
+        assert item["file_path"] == "/tmp/ep1.mp3"
+        assert item["downloaded_at"] is not None
+        assert store.get_item_by_content_id("sub-1", "ep-1") == item
+        assert store.get_subscription("sub-1")["total_downloaded"] == 1
+        assert store.mark_item_completed("missing") is None
+        assert store.get_subscription("sub-1")["total_downloaded"] == 1
+
+    def test_create_items_bulk(self, store, subscription):
+        """Test that bulk creation skips known content IDs and keeps input order."""
+        store.create_item("item-0", "sub-1", "ep-1", "u1")
+
+        created = store.create_items_bulk("sub-1", [
+            {"item_id": "item-3", "content_id": "ep-3", "content_url": "u3", "title": "Three"},
+            {"item_id": "item-1", "content_id": "ep-1", "content_url": "u1"},
+            {"item_id": "item-2", "content_id": "ep-2", "content_url": "u2"},
+            {"item_id": "item-2b", "content_id": "ep-2", "content_url": "u2"},
+        ])
+
+        assert [i["id"] for i in created] == ["item-3", "item-2"]
+        assert created[0]["title"] == "Three"
+        assert store.count_items("sub-1") == 3
+        assert store.create_items_bulk("sub-1", []) == []
+
+    def test_pending_items_newest_first(self, store, subscription):
+        """Test that pending items are listed by publish date, newest first."""
+        store.create_item("item-1", "sub-1", "ep-1", "u1", published_at="2024-01-01T00:00:00")
+        store.create_item("item-2", "sub-1", "ep-2", "u2", published_at="2024-01-02T00:00:00")
+        store.create_item("item-3", "sub-1", "ep-3", "u3", published_at="2024-01-03T00:00:00")
+        store.set_item_status("item-3", SubscriptionItemStatus.COMPLETED)
+
+        pending = store.get_pending_items("sub-1")
+
+        assert [i["id"] for i in pending] == ["item-2", "item-1"]
+        assert store.get_item("item-3")["downloaded_at"] is not None
+
+    def test_list_and_count_items(self, store, subscription):
+        """Test listing and counting items with and without a status filter."""
+        for n in range(1, 5):
+            store.create_item(f"item-{n}", "sub-1", f"ep-{n}", f"u{n}", published_at=f"2024-01-0{n}")
+        store.set_item_status("item-4", SubscriptionItemStatus.FAILED)
+
+        assert [i["id"] for i in store.list_items("sub-1", limit=2, offset=1)] == ["item-3", "item-2"]
+        assert [i["id"] for i in store.list_items("sub-1", SubscriptionItemStatus.FAILED)] == ["item-4"]
+        assert store.count_items("sub-1") == 4
+        assert store.count_items("sub-1", SubscriptionItemStatus.PENDING) == 3
+
+    @pytest.mark.parametrize("returning", [True, False], ids=["returning", "select"])
+    def test_prune_completed_items(self, store, subscription, monkeypatch, returning):
+        """Test that only the most recently downloaded completed items are kept."""
+        monkeypatch.setattr(subscription_store, "_HAS_RETURNING", returning)
+        for n in range(1, 6):
+            store.create_item(f"item-{n}", "sub-1", f"ep-{n}", f"u{n}")
+            if n != 5:
+                store.update_item(
+                    f"item-{n}", status="completed", downloaded_at=f"2024-01-0{n}", file_path=f"/f{n}"
+                )
+
+        pruned = store.prune_completed_items("sub-1", keep_last=2)
+
+        assert sorted(i["file_path"] for i in pruned) == ["/f1", "/f2"]
+        assert store.get_item_by_content_id("sub-1", "ep-1") is None
+        assert store.count_items("sub-1", SubscriptionItemStatus.COMPLETED) == 2
+        assert store.count_items("sub-1", SubscriptionItemStatus.PENDING) == 1
+        assert store.prune_completed_items("sub-1", keep_last=2) == []
+
+
+class TestCaches:
+    """Tests for the in-memory subscription and item caches."""
+
+    def test_lookups_served_from_cache(self, store, subscription):
+        """Test that repeated lookups do not query the database."""
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+
+        store.get_subscription("sub-1")
+        store.get_item_by_content_id("sub-1", "ep-1")
+        store.get_item_by_content_id("sub-1", "ep-1")
+
+        assert not any(s.lstrip().startswith("SELECT") for s in statements)
+
+    def test_cached_values_follow_writes(self, store, subscription):
+        """Test that the store's own writes keep cached values current."""
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        store.get_item_by_content_id("sub-1", "ep-1")["title"] = "mutated by caller"
+
+        store.set_item_status("item-1", SubscriptionItemStatus.COMPLETED)
+        store.increment_total_downloaded("sub-1")
+
+        item = store.get_item_by_content_id("sub-1", "ep-1")
+        assert item["status"] == "completed"
+        assert item["title"] is None
+        assert store.get_subscription("sub-1")["total_downloaded"] == 1
+
+    def test_deletes_invalidate(self, store, subscription):
+        """Test that deleted items and subscriptions are no longer returned."""
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        store.create_item("item-2", "sub-1", "ep-2", "u2")
+        store.get_item_by_content_id("sub-1", "ep-2")
+
+        assert store.delete_item("item-1")
+        assert not store.delete_item("item-1")
+        assert store.get_item_by_content_id("sub-1", "ep-1") is None
+
+        store.delete_subscription("sub-1")
+        assert store.get_subscription("sub-1") is None
+        assert store.get_item_by_content_id("sub-1", "ep-2") is None
+
+
+class TestGlobalStore:
+    """Tests for the process-wide store accessor."""
+
+    def test_created_once_across_threads(self, monkeypatch):
+        """Test that concurrent first calls share a single store."""
+        created = []
+
+        class SlowStore:
+            def __init__(self):
+                threading.Event().wait(0.05)
+                created.append(self)
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(subscription_store, "SubscriptionStore", SlowStore)
+        monkeypatch.setattr(subscription_store, "_subscription_store", None)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(subscription_store.get_subscription_store()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1
+        assert all(r is created[0] for r in results)
+
+        subscription_store.close_subscription_store()
+        assert subscription_store._subscription_store is None
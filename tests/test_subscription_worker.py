@@ -0,0 +1,440 @@
+"""Tests for the subscription background worker."""
+
+import asyncio
+import json
+import os
+import sys
+import textwrap
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core import subscription_worker
+from app.core.converter import AudioConverter
+from app.core.subscription_fetcher import FetchedItem
+from app.core.subscription_store import SubscriptionPlatform, SubscriptionStore, SubscriptionType
+from app.core.subscription_worker import SubscriptionWorker
+
+
+@pytest.fixture
+async def cdn():
+    """Route the shared download client through a mock transport; yields the request log."""
+    requests: list[httpx.Request] = []
+    routes: dict[str, httpx.Response] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return routes.get(f"{request.url.host}{request.url.path}", httpx.Response(404))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    subscription_worker._download_http_client = client
+    yield routes, requests
+    subscription_worker._download_http_client = None
+    await client.aclose()
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """Put an ffmpeg stand-in on PATH that prefixes its input; fails if FAKE_FFMPEG_FAIL is set."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent("""
+        import os, sys
+        args = sys.argv[1:]
+        src = args[args.index("-i") + 1]
+        if os.environ.get("FAKE_FFMPEG_FAIL"):
+            sys.stderr.write("Invalid data found when processing input\\n")
+            sys.exit(1)
+        data = sys.stdin.buffer.read() if src == "pipe:0" else open(src, "rb").read()
+        with open(args[-1], "wb") as f:
+            f.write(b"converted:" + data)
+    """))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A temporary subscription store used as the worker's global store."""
+    store = SubscriptionStore(tmp_path / "subscriptions.db")
+    monkeypatch.setattr(subscription_worker, "get_subscription_store", lambda: store)
+    yield store
+    store.close()
+
+
+class TestCheckAllSubscriptions:
+    """Tests for the worker's poll cycle."""
+
+    async def test_checks_bounded_by_max_concurrent(self, store, monkeypatch):
+        """Test that subscriptions are checked concurrently, at most max_concurrent at once."""
+        for n in range(5):
+            store.create_subscription(
+                f"sub-{n}", f"Show {n}", SubscriptionType.RSS, SubscriptionPlatform.PODCAST
+            )
+        worker = SubscriptionWorker(max_concurrent=2)
+        worker._running = True
+        active, peak, checked = 0, 0, []
+
+        async def fake_fetch_all(subscriptions):
+            return {}
+
+        async def fake_check(sub, store, items=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            checked.append(sub["id"])
+
+        monkeypatch.setattr(worker, "_fetch_all", fake_fetch_all)
+        monkeypatch.setattr(worker, "_check_subscription", fake_check)
+
+        await worker._check_all_subscriptions()
+
+        assert sorted(checked) == [f"sub-{n}" for n in range(5)]
+        assert peak == 2
+
+
+class TestCheckSubscription:
+    """Tests for recording fetched items."""
+
+    async def test_only_unknown_items_created(self, store, monkeypatch):
+        """Test that known content IDs are skipped and new ones queued for download."""
+        sub = store.create_subscription(
+            "sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST
+        )
+        store.create_item("item-1", "sub-1", "ep-1", "u1")
+        processed = []
+
+        async def fake_process(subscription_id, limit=10, sub=None):
+            processed.append(subscription_id)
+
+        monkeypatch.setattr(subscription_worker, "process_subscription_items", fake_process)
+        items = [FetchedItem("ep-2", "u2", "Two"), FetchedItem("ep-1", "u1", "One")]
+
+        await SubscriptionWorker()._check_subscription(sub, store, items)
+        await SubscriptionWorker()._check_subscription(sub, store, items)
+
+        assert store.get_item_by_content_id("sub-1", "ep-2")["title"] == "Two"
+        assert store.count_items("sub-1") == 2
+        assert processed == ["sub-1"]
+        assert store.get_subscription("sub-1")["last_new_content_at"] is not None
+
+
+class TestProcessSubscriptionItems:
+    """Tests for downloading a subscription's pending items."""
+
+    async def test_rows_passed_to_each_item(self, store, monkeypatch):
+        """Test that the subscription and pending rows are handed down, not re-read."""
+        sub = store.create_subscription(
+            "sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST
+        )
+        store.create_item("item-1", "sub-1", "ep-1", "https://cdn.example.com/ep1.mp3", title="One")
+        calls = []
+
+        async def fake_single(subscription_id, item_id, sub=None, item=None):
+            calls.append((subscription_id, item_id, sub, item))
+
+        monkeypatch.setattr(subscription_worker, "process_single_item", fake_single)
+        monkeypatch.setattr(store, "get_subscription", lambda _: pytest.fail("unexpected read"))
+
+        await subscription_worker.process_subscription_items("sub-1", sub=sub)
+
+        [(subscription_id, item_id, passed_sub, passed_item)] = calls
+        assert (subscription_id, item_id, passed_sub) == ("sub-1", "item-1", sub)
+        assert passed_item["content_url"] == "https://cdn.example.com/ep1.mp3"
+
+    async def test_items_processed_concurrently(self, store, monkeypatch):
+        """Test that items download in parallel up to the limit and failures stay isolated."""
+        sub = store.create_subscription(
+            "sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST
+        )
+        for n in range(5):
+            store.create_item(f"item-{n}", "sub-1", f"ep-{n}", f"u{n}")
+        monkeypatch.setattr(
+            subscription_worker, "get_settings",
+            lambda: SimpleNamespace(subscription_item_concurrency=2),
+        )
+        active, peak, done = 0, 0, []
+
+        async def fake_single(subscription_id, item_id, sub=None, item=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if item_id == "item-0":
+                raise RuntimeError("boom")
+            done.append(item_id)
+
+        monkeypatch.setattr(subscription_worker, "process_single_item", fake_single)
+
+        await subscription_worker.process_subscription_items("sub-1", sub=sub)
+
+        assert sorted(done) == ["item-1", "item-2", "item-3", "item-4"]
+        assert peak == 2
+
+    async def test_same_title_items_keep_separate_files(self, store, cdn, tmp_path, monkeypatch):
+        """Test that concurrent items sharing a title and URL basename don't collide."""
+        routes, _ = cdn
+        sub = store.create_subscription(
+            "sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST
+        )
+        for name in ("a", "b"):
+            url = f"https://cdn.example.com/{name}/audio.mp3"
+            routes[f"cdn.example.com/{name}/audio.mp3"] = httpx.Response(200, content=name.encode() * 1000)
+            store.create_item(f"item-{name}", "sub-1", f"ep-{name}", url, title="Trailer")
+        monkeypatch.setattr(
+            subscription_worker, "get_settings",
+            lambda: SimpleNamespace(
+                download_dir=str(tmp_path),
+                subscription_item_concurrency=2,
+                subscription_webhook_url=None,
+            ),
+        )
+
+        await subscription_worker.process_subscription_items("sub-1", sub=sub)
+
+        paths = [Path(store.get_item(f"item-{name}")["file_path"]) for name in ("a", "b")]
+        assert paths[0] != paths[1]
+        assert [p.read_bytes() for p in paths] == [b"a" * 1000, b"b" * 1000]
+
+
+class TestProcessSingleItem:
+    """Tests for downloading one subscription item."""
+
+    @pytest.fixture
+    def platform_item(self, store, tmp_path, monkeypatch):
+        """A pending item served by a fake platform downloader writing outside the target dir."""
+        store.create_subscription(
+            "sub-1", "Channel", SubscriptionType.YOUTUBE_CHANNEL, SubscriptionPlatform.YOUTUBE
+        )
+        store.create_item("item-1", "sub-1", "vid-1", "https://www.youtube.com/watch?v=vid-1")
+        monkeypatch.setattr(
+            subscription_worker, "get_settings",
+            lambda: SimpleNamespace(download_dir=str(tmp_path / "downloads"), subscription_webhook_url=None),
+        )
+        staged = tmp_path / "staging" / "vid-1.m4a"
+        staged.parent.mkdir()
+        staged.write_bytes(b"audio")
+
+        class FakeDownloader:
+            async def download(self, url, output_format, quality):
+                return SimpleNamespace(success=True, file_path=staged, error=None)
+
+        monkeypatch.setattr(
+            subscription_worker.DownloaderFactory, "get_downloader", lambda url: FakeDownloader()
+        )
+        return staged
+
+    @pytest.mark.parametrize("cross_device", [False, True], ids=["rename", "copy"])
+    async def test_moves_download_into_subscription_dir(
+        self, store, platform_item, tmp_path, monkeypatch, cross_device
+    ):
+        """Test that downloads are moved into the subscription directory and recorded."""
+        if cross_device:
+            def fail_replace(src, dst):
+                raise OSError(18, "Invalid cross-device link")
+            monkeypatch.setattr(subscription_worker.os, "replace", fail_replace)
+
+        await subscription_worker.process_single_item("sub-1", "item-1")
+
+        moved = tmp_path / "downloads" / "subscriptions" / "sub-1" / "vid-1.m4a"
+        item = store.get_item("item-1")
+        assert moved.read_bytes() == b"audio"
+        assert not platform_item.exists()
+        assert item["status"] == "completed"
+        assert item["file_path"] == str(moved)
+        assert store.get_subscription("sub-1")["total_downloaded"] == 1
+
+
+class TestTranscribeItem:
+    """Tests for auto-transcription of downloads."""
+
+    async def test_transcript_saved_next_to_audio(self, tmp_path, monkeypatch):
+        """Test that the transcript text is written beside the audio file."""
+        class FakeTranscriber:
+            def __init__(self, model_size):
+                self.model_size = model_size
+
+            @staticmethod
+            def is_available():
+                return True
+
+            async def transcribe(self, audio_path, language, output_format):
+                return SimpleNamespace(success=True, text="Hello there")
+
+        monkeypatch.setattr(subscription_worker, "AudioTranscriber", FakeTranscriber)
+
+        path = await subscription_worker._transcribe_item(tmp_path / "ep1.mp3")
+
+        assert path == tmp_path / "ep1.txt"
+        assert path.read_text(encoding="utf-8") == "Hello there"
+
+
+class TestCleanupOldItems:
+    """Tests for pruning completed items over the download limit."""
+
+    async def test_prunes_rows_and_files(self, store, tmp_path):
+        """Test that the oldest completed items lose their rows and files."""
+        store.create_subscription("sub-1", "Show", SubscriptionType.RSS, SubscriptionPlatform.PODCAST)
+        files = []
+        for n in range(3):
+            audio = tmp_path / f"ep{n}.mp3"
+            audio.write_bytes(b"audio")
+            files.append(audio)
+            store.create_item(f"item-{n}", "sub-1", f"ep-{n}", f"u{n}")
+            store.mark_item_completed(
+                f"item-{n}",
+                file_path=str(audio),
+                # The first transcript is already gone
+                transcription_path=str(tmp_path / f"ep{n}.txt"),
+            )
+            if n:
+                audio.with_suffix(".txt").write_text("words")
+
+        await subscription_worker._cleanup_old_items("sub-1", limit=1)
+
+        assert [i["id"] for i in store.list_items("sub-1")] == ["item-2"]
+        assert [p.exists() for p in files] == [False, False, True]
+        assert not (tmp_path / "ep1.txt").exists()
+
+
+class TestNotification:
+    """Tests for completion webhooks."""
+
+    async def test_posts_completed_item(self, cdn, monkeypatch, tmp_path):
+        """Test that the webhook receives the item with a UTC timestamp."""
+        routes, requests = cdn
+        routes["hooks.example.com/audiograb"] = httpx.Response(204)
+        monkeypatch.setattr(
+            subscription_worker, "get_settings",
+            lambda: SimpleNamespace(subscription_webhook_url="https://hooks.example.com/audiograb"),
+        )
+        sub = {"id": "sub-1", "name": "Show"}
+        item = {"id": "item-1", "title": "One", "content_url": "u1"}
+
+        await subscription_worker._send_notification(sub, item, tmp_path / "ep1.mp3", None)
+
+        payload = json.loads(requests[0].content)
+        assert payload["item_id"] == "item-1"
+        assert payload["file_path"] == str(tmp_path / "ep1.mp3")
+        assert datetime.fromisoformat(payload["timestamp"]).utcoffset() == timedelta(0)
+
+
+class TestDownloadHttpClient:
+    """Tests for the shared download HTTP client."""
+
+    async def test_client_is_reused_until_worker_stops(self):
+        """Test that the client is created once and closed with the worker."""
+        client = subscription_worker.get_download_http_client()
+
+        assert subscription_worker.get_download_http_client() is client
+
+        await subscription_worker.stop_subscription_worker()
+
+        assert client.is_closed
+        assert subscription_worker._download_http_client is None
+
+
+class TestDirectDownload:
+    """Tests for downloading enclosure URLs directly."""
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("https://cdn.example.com/ep1.mp3", True),
+            ("https://cdn.example.com/EP1.M4A?token=a.b", True),
+            ("https://cdn.example.com/archive.tar.opus", True),
+            ("https://cdn.example.com/ep1.mp4", False),
+            ("https://www.youtube.com/watch?v=abc.mp3", False),
+            ("https://cdn.example.com/mp3", False),
+        ],
+    )
+    def test_is_direct_audio_url(self, url, expected):
+        """Test that only URLs whose path ends in an audio extension are direct."""
+        assert subscription_worker._is_direct_audio_url(url) is expected
+
+    def test_sanitize_filename(self):
+        """Test that unsafe characters are dropped and whitespace collapsed."""
+        assert subscription_worker._sanitize_filename('Ep 1: "Why?"\t<Part  2>') == "Ep_1_Why_Part_2"
+
+    async def test_downloads_through_shared_client(self, cdn, tmp_path):
+        """Test that the enclosure is written under a name built from the title."""
+        routes, requests = cdn
+        routes["cdn.example.com/ep1.mp3"] = httpx.Response(200, content=b"ID3 audio")
+
+        path = await subscription_worker._download_direct_audio(
+            "https://cdn.example.com/ep1.mp3?token=1", tmp_path, title="Episode: One"
+        )
+
+        assert path == tmp_path / "Episode_One.mp3"
+        assert path.read_bytes() == b"ID3 audio"
+        assert len(requests) == 1
+
+    async def test_large_body_written_intact(self, cdn, tmp_path):
+        """Test that bodies spanning several chunks are written in full."""
+        routes, _ = cdn
+        body = bytes(range(256)) * (subscription_worker._DOWNLOAD_CHUNK_SIZE // 100)
+        routes["cdn.example.com/long.m4a"] = httpx.Response(200, content=body)
+
+        path = await subscription_worker._download_direct_audio(
+            "https://cdn.example.com/long.m4a", tmp_path
+        )
+
+        assert path == tmp_path / "long.m4a"
+        assert path.read_bytes() == body
+
+    async def test_converts_while_streaming(self, cdn, fake_ffmpeg, tmp_path):
+        """Test that pipeable enclosures are transcoded without saving the original."""
+        routes, _ = cdn
+        routes["cdn.example.com/ep1.ogg"] = httpx.Response(200, content=b"OggS audio")
+
+        path = await subscription_worker._download_direct_audio(
+            "https://cdn.example.com/ep1.ogg", tmp_path, output_format="mp3"
+        )
+
+        assert path == tmp_path / "ep1.mp3"
+        assert path.read_bytes() == b"converted:OggS audio"
+        assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == ["ep1.mp3"]
+
+    async def test_failed_stream_conversion_keeps_original(self, cdn, fake_ffmpeg, tmp_path, monkeypatch):
+        """Test that a failed conversion keeps the streamed original without downloading again."""
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+        routes, requests = cdn
+        body = b"OggS" * subscription_worker._DOWNLOAD_CHUNK_SIZE
+        routes["cdn.example.com/ep1.ogg"] = httpx.Response(200, content=body)
+
+        path = await subscription_worker._download_direct_audio(
+            "https://cdn.example.com/ep1.ogg", tmp_path, output_format="mp3"
+        )
+
+        assert path == tmp_path / "ep1.ogg"
+        assert path.read_bytes() == body
+        assert not (tmp_path / "ep1.mp3").exists()
+        assert len(requests) == 1
+
+    async def test_failed_stream_removes_partial_output(self, fake_ffmpeg, tmp_path):
+        """Test that an input stream failing mid-conversion leaves no output file."""
+        output = tmp_path / "ep1.mp3"
+        output.write_bytes(b"partial")
+
+        async def broken_stream():
+            yield b"OggS"
+            raise httpx.ReadError("connection reset")
+
+        with pytest.raises(httpx.ReadError):
+            await AudioConverter().convert_stream(broken_stream(), output, output_format="mp3")
+
+        assert not output.exists()
+
+    async def test_http_error_returns_none(self, cdn, tmp_path):
+        """Test that a failed download is reported as None."""
+        assert await subscription_worker._download_direct_audio(
+            "https://cdn.example.com/missing.mp3", tmp_path
+        ) is None